@@ -0,0 +1,174 @@
+"""
+--date-range over a synthetic full season.
+
+Replaces the api with a fake one (fixed latency per request, requests still
+go through REQUEST_QUEUE) serving a 1,312 game regular season, and game
+objects with light stand-ins, so no database or network access is needed.
+
+Compares
+    single request   one schedule request for the range then every feed at
+                     once, how --date-range used to work
+    chunked, cold    games.stream_date_range with an empty FeedCache
+    chunked, cached  the same range again, every day is final and cached
+
+reporting wall clock, time to the first game, requests sent and peak
+traced memory.
+
+Usage: python benchmarks/date_range.py [--latency 30] [--chunk-days 7]
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import arrow
+
+# run from a checkout without installing puck, see startup.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import puck.games as games  # noqa
+from puck.feed_cache import FeedCache  # noqa
+from puck.request_queue import REQUEST_QUEUE, Priority  # noqa
+from puck.urls import Url  # noqa
+
+SEASON = ('2023-10-10', '2024-04-18')
+NUM_GAMES = 1312
+# plays in a synthetic feed, the bulk of a real one
+NUM_PLAYS = 300
+
+
+class FakeApi(object):
+    def __init__(self, latency):
+        self.latency = latency
+        self.requests = 0
+
+        days = [
+            day.format('YYYY-MM-DD') for day in arrow.Arrow.range(
+                'day', arrow.get(SEASON[0]), arrow.get(SEASON[1])
+            )
+        ]
+        ids = iter(range(2023020001, 2023020001 + NUM_GAMES))
+        per_day = -(-NUM_GAMES // len(days))
+
+        self.schedule = {
+            day: list(itertools.islice(ids, per_day)) for day in days
+        }
+
+    async def request(self, url, session, url_mods=None, params=None, priority=Priority.INTERACTIVE):  # noqa
+        async with REQUEST_QUEUE.slot(priority):
+            self.requests += 1
+            await asyncio.sleep(self.latency)
+
+        if url == Url.SCHEDULE:
+            return {'dates': [
+                {'date': day, 'games': [{'gamePk': _id} for _id in _ids]}
+                for day, _ids in self.schedule.items()
+                if params['startDate'] <= day <= params['endDate'] and _ids
+            ]}
+
+        return feed(url_mods['game_id'])
+
+
+def feed(game_id) -> dict:
+    return {
+        'gamePk': game_id,
+        'gameData': {
+            'game': {'season': '20232024'},
+            'status': {'statusCode': '7'},
+            'datetime': {'dateTime': '2023-10-10T23:00:00Z'},
+            'teams': {'home': {'id': 1}, 'away': {'id': 2}},
+        },
+        'liveData': {
+            'plays': {'allPlays': [
+                {'result': {'event': 'Shot', 'description': 'x' * 80},
+                 'about': {'period': i % 3 + 1, 'periodTime': '12:34'},
+                 'coordinates': {'x': i, 'y': -i}}
+                for i in range(NUM_PLAYS)
+            ]},
+            'linescore': {'currentPeriod': 3},
+            'boxscore': {'teams': {'home': {}, 'away': {}}},
+        }
+    }
+
+
+class StandIn(object):
+    """Takes the place of a BannerGame, keeps the feed like one does."""
+    __slots__ = ('game_id', 'is_final', 'data')
+
+    def __init__(self, db_conn, game_id, class_type, data=None):
+        self.game_id = game_id
+        self.is_final = True
+        self.data = data
+
+
+async def single_request(api):
+    # one schedule request then batch_game_create's gather
+    info = await api.request(
+        Url.SCHEDULE, None,
+        params={'startDate': SEASON[0], 'endDate': SEASON[1]}
+    )
+    _ids = games._schedule_ids(info)
+
+    async def build(_id):
+        data = await api.request(Url.GAME, None, url_mods={'game_id': _id})
+        return StandIn(None, _id, 'banner', data)
+
+    for game in await asyncio.gather(*[build(_id) for _id in _ids]):
+        yield None, game
+
+
+async def measure(name, api, stream):
+    api.requests = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    count = 0
+
+    async for _, game in stream:
+        if first is None:
+            first = time.perf_counter() - start
+        count += 1
+
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert count == NUM_GAMES, count
+    print('{:<18} | {:>8.2f} | {:>8.2f} | {:>8} | {:>8.1f}'.format(
+        name, wall, first, api.requests, peak / 2 ** 20
+    ))
+
+
+async def main(latency, chunk_days):
+    api = FakeApi(latency / 1000)
+    games.async_request = api.request
+    games.create_game = StandIn
+
+    print(f'{NUM_GAMES} games, {latency}ms per request, '
+          f'{chunk_days} day chunks')
+    print('{:<18} | {:>8} | {:>8} | {:>8} | {:>8}'.format(
+        'Run', 'wall s', 'first s', 'requests', 'peak MB'
+    ))
+
+    await measure('single request', api, single_request(api))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FeedCache(tmp)
+        for name in ('chunked, cold', 'chunked, cached'):
+            await measure(name, api, games.stream_date_range(
+                None, SEASON[0], SEASON[1], cache=cache, chunk_days=chunk_days
+            ))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--latency', type=int, default=30)
+    parser.add_argument('--chunk-days', type=int, default=7)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.latency, args.chunk_days))
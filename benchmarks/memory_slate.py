@@ -0,0 +1,142 @@
+"""
+Memory benchmark for a 16 game FullGame slate.
+
+Compares the fixed layout (__slots__) game, team, period and player classes
+against the same records stored in per-instance __dict__s. Objects are
+filled with synthetic values so no database or network access is needed.
+
+Usage: python benchmarks/memory_slate.py
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+# run from a checkout without installing puck, see startup.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from puck.games import FullGame  # noqa
+from puck.player import GamePlayer  # noqa
+from puck.teams import GameStatsTeam, TeamSeasonStats  # noqa
+from puck.utils import slot_names  # noqa
+
+NUM_GAMES = 16
+NUM_PERIODS = 3
+SKATERS = 18
+GOALIES = 2
+RANKED_STATS = 34
+
+Period = GameStatsTeam.PeriodStats.Period
+ShootoutStats = GameStatsTeam.ShootoutStats
+ValueRank = TeamSeasonStats.ValueRank
+
+SLOTTED = [FullGame, GameStatsTeam, Period, ShootoutStats, GamePlayer,
+           ValueRank]
+
+
+def slotted_factory(cls, **attrs):
+    obj = cls.__new__(cls)
+    for key, val in attrs.items():
+        setattr(obj, key, val)
+    return obj
+
+
+# dict backed stand-ins for the slotted classes
+DICT_CLASSES = {
+    cls: type(cls.__name__ + 'Dict', (object,), {}) for cls in SLOTTED
+}
+
+
+def dict_factory(cls, **attrs):
+    obj = DICT_CLASSES[cls]()
+    for key, val in attrs.items():
+        setattr(obj, key, val)
+    return obj
+
+
+def _fill(cls, skip=(), **attrs):
+    """Synthetic value for every declared field of cls."""
+    values = {
+        name: i for i, name in enumerate(slot_names(cls))
+        if name not in skip
+    }
+    values.update(attrs)
+    return values
+
+
+def build_slate(factory):
+    slate = []
+    for game_id in range(NUM_GAMES):
+        game = factory(FullGame, **_fill(FullGame, skip=('home', 'away')))
+
+        for team_type in ('home', 'away'):
+            periods = GameStatsTeam.PeriodStats.__new__(
+                GameStatsTeam.PeriodStats
+            )
+            periods.data = [
+                factory(Period, name=str(i), goals=i, shots=i * 10)
+                for i in range(NUM_PERIODS)
+            ]
+
+            team = factory(
+                GameStatsTeam, **_fill(
+                    GameStatsTeam, game=game, team_type=team_type,
+                    periods=periods, shootout=factory(ShootoutStats),
+                    id_list=list(range(SKATERS + GOALIES)), players=None
+                )
+            )
+
+            team.players = [
+                factory(GamePlayer, **_fill(GamePlayer))
+                for _ in range(SKATERS + GOALIES)
+            ]
+
+            # season ranks shown alongside the game
+            ranks = [
+                factory(ValueRank, name='wins', value=i, rank=i)
+                for i in range(RANKED_STATS)
+            ]
+
+            setattr(game, team_type, team)
+            slate.append(ranks)
+
+        slate.append(game)
+
+    return slate
+
+
+def measure(factory):
+    gc.collect()
+    before = len(gc.get_objects())
+
+    tracemalloc.start()
+    slate = build_slate(factory)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    objects = len(gc.get_objects()) - before
+
+    return slate, objects, size
+
+
+def main():
+    print(f'{NUM_GAMES} game FullGame slate')
+    print('{:<10} | {:>10} | {:>12}'.format('Layout', 'Objects', 'Bytes'))
+
+    results = {}
+    for name, factory in (('__dict__', dict_factory),
+                          ('__slots__', slotted_factory)):
+        # keep the slate alive until measured
+        slate, objects, size = measure(factory)
+        results[name] = size
+        print('{:<10} | {:>10} | {:>12}'.format(name, objects, size))
+        del slate
+
+    saved = results['__dict__'] - results['__slots__']
+    print(f'Saved: {saved} bytes '
+          f'({100 * saved / results["__dict__"]:.1f}%)')
+
+
+if __name__ == '__main__':
+    main()
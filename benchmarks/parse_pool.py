@@ -0,0 +1,181 @@
+"""
+`puck backfill` parsing throughput by number of parse processes.
+
+Replaces the api with a fake one (fixed latency per request, requests still
+go through REQUEST_QUEUE) serving synthetic final game feeds the size of
+real ones, and the database writes with a no-op, so only fetching and
+parsing are measured. Runs backfill.backfill_season with 0 parse workers
+(parsing on the event loop) then 1, 2, 4 ... up to the number of cores.
+
+Usage: python benchmarks/parse_pool.py [--games 400] [--latency 20]
+    [--plays 1000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# run from a checkout without installing puck, see startup.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import puck.backfill as backfill  # noqa
+import puck.boxscore as boxscore  # noqa
+from puck.request_queue import REQUEST_QUEUE, Priority  # noqa
+
+FIRST_ID = 2023020001
+
+
+def skater_stats(i) -> dict:
+    return {
+        'timeOnIce': '17:12', 'assists': i % 2, 'goals': i % 3 // 2,
+        'penaltyMinutes': 2, 'shots': 3, 'hits': 1, 'powerPlayGoals': 0,
+        'shortHandedGoals': 0, 'powerPlayAssists': 0,
+        'shortHandedAssists': 0, 'faceOffPct': 50.0, 'faceOffWins': 5,
+        'faceoffTaken': 10, 'takeaways': 1, 'giveaways': 1, 'blocked': 2,
+        'plusMinus': 1, 'evenTimeOnIce': '14:10', 'powerPlayTimeOnIce': '2:01',
+        'shortHandedTimeOnIce': '1:01'
+    }
+
+
+def goalie_stats() -> dict:
+    return {
+        'timeOnIce': '60:00', 'assists': 0, 'goals': 0, 'pim': 0,
+        'shots': 30, 'saves': 28, 'powerPlaySaves': 5, 'shortHandedSaves': 1,
+        'evenSaves': 22, 'shortHandedShotsAgainst': 1, 'evenShotsAgainst': 23,
+        'powerPlayShotsAgainst': 6, 'decision': 'W', 'savePercentage': 93.3
+    }
+
+
+def team_box(team_id) -> dict:
+    players = {}
+    for i in range(20):
+        player_id = team_id * 1000 + i
+        position = 'G' if i < 2 else 'C'
+        if i == 1:
+            stats = {}
+        elif position == 'G':
+            stats = {'goalieStats': goalie_stats()}
+        else:
+            stats = {'skaterStats': skater_stats(i)}
+
+        players[f'ID{player_id}'] = {
+            'person': {'id': player_id, 'fullName': f'Player {player_id}'},
+            'position': {'abbreviation': position},
+            'stats': stats
+        }
+
+    return {
+        'teamStats': {'teamSkaterStats': {
+            'goals': 3, 'pim': 8, 'shots': 31, 'powerPlayPercentage': '25.0',
+            'powerPlayGoals': 1, 'powerPlayOpportunities': 4,
+            'faceOffWinPercentage': '51.2', 'blocked': 14, 'takeaways': 7,
+            'giveaways': 9, 'hits': 22
+        }},
+        'players': players,
+        'goalies': [team_id * 1000, team_id * 1000 + 1],
+        'skaters': [team_id * 1000 + i for i in range(2, 20)],
+        'scratches': []
+    }
+
+
+def feed(game_id, num_plays) -> bytes:
+    return json.dumps({
+        'gamePk': game_id,
+        'gameData': {
+            'game': {'season': '20232024'},
+            'status': {'statusCode': '7'},
+            'datetime': {'dateTime': '2023-10-10T23:00:00Z'},
+            'teams': {'home': {'id': 1}, 'away': {'id': 2}},
+        },
+        'liveData': {
+            # the bulk of a real feed, decoded then thrown away
+            'plays': {'allPlays': [
+                {'result': {'event': 'Shot', 'description': 'x' * 120},
+                 'about': {'period': i % 3 + 1, 'periodTime': '12:34',
+                           'dateTime': '2023-10-10T23:41:12Z'},
+                 'players': [{'player': {'id': 8470000 + i, 'fullName': 'y'},
+                              'playerType': 'Shooter'}] * 3,
+                 'coordinates': {'x': i, 'y': -i}}
+                for i in range(num_plays)
+            ]},
+            'linescore': {
+                'currentPeriodOrdinal': '3rd',
+                'currentPeriodTimeRemaining': 'Final',
+                'intermissionInfo': {'inIntermission': False},
+                'periods': [{'num': n, 'home': {'goals': 1, 'shotsOnGoal': 10},
+                             'away': {'goals': 1, 'shotsOnGoal': 10}}
+                            for n in (1, 2, 3)],
+                'hasShootout': False,
+                'shootoutInfo': {}
+            },
+            'boxscore': {'teams': {'home': team_box(1), 'away': team_box(2)}},
+        }
+    }).encode()
+
+
+class FakeApi(object):
+    def __init__(self, num_games, latency, num_plays):
+        self.latency = latency
+        self.ids = list(range(FIRST_ID, FIRST_ID + num_games))
+        # one body reused for every game, the id is patched in
+        self.body = feed(FIRST_ID, num_plays)
+
+    async def game_ids(self, params=None, priority=Priority.INTERACTIVE):
+        return self.ids
+
+    async def request(self, url, session, url_mods=None, params=None, priority=Priority.INTERACTIVE, raw=False):  # noqa
+        async with REQUEST_QUEUE.slot(priority):
+            await asyncio.sleep(self.latency)
+
+        return self.body.replace(
+            str(FIRST_ID).encode(), str(url_mods['game_id']).encode(), 1
+        )
+
+
+def main(num_games, latency, num_plays):
+    api = FakeApi(num_games, latency / 1000, num_plays)
+    backfill.async_get_game_ids = api.game_ids
+    backfill.async_request = api.request
+    boxscore.stored_game_ids = lambda db_conn, _ids: set()
+    boxscore.save_rows = lambda db_conn, rows: None
+
+    cores = os.cpu_count() or 1
+    runs = [0] + [n for n in (1, 2, 4, 8, 16, 32) if n <= cores]
+    if cores not in runs:
+        runs.append(cores)
+
+    print(f'{num_games} games, {len(api.body) / 2 ** 20:.2f} MB per feed, '
+          f'{latency}ms per request, {cores} core(s)')
+
+    results = []
+    for workers in runs:
+        start = time.perf_counter()
+        counts = asyncio.run(backfill.backfill_season(
+            None, 20232024, window=32, parse_workers=workers
+        ))
+        wall = time.perf_counter() - start
+
+        assert counts['stored'] == num_games, counts
+        results.append((workers, wall))
+
+    print('{:<14} | {:>8} | {:>8} | {:>8}'.format(
+        'Parse workers', 'wall s', 'games/s', 'speedup'
+    ))
+    for workers, wall in results:
+        print('{:<14} | {:>8.2f} | {:>8.1f} | {:>7.2f}x'.format(
+            workers or 'main process', wall, num_games / wall,
+            results[0][1] / wall
+        ))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--games', type=int, default=400)
+    parser.add_argument('--latency', type=int, default=20)
+    parser.add_argument('--plays', type=int, default=1000)
+    args = parser.parse_args()
+
+    main(args.games, args.latency, args.plays)
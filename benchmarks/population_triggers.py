@@ -0,0 +1,196 @@
+"""
+Writing player seasons with per-row triggers vs generated columns.
+
+Creates the base tables in a scratch database twice:
+    triggers   skater points splits as plain columns filled by a
+               compute_points trigger and last_updated by update_time
+               triggers, BEFORE INSERT/UPDATE FOR EACH ROW
+    generated  the current schema, generated columns and last_updated set
+               by update_stmt
+
+then writes the same synthetic players through db.handle_player_season the
+way populate_initial_tables does (every season of a player in bulk), and
+refreshes every season again the way `puck sync` does. The triggers
+variant is what the old triggers were meant to do, as shipped they were
+statement level and never changed a row.
+
+THE DATABASE IS WIPED. Point it at a database made for this, never the one
+puck uses.
+
+Usage: python benchmarks/population_triggers.py DBNAME [--user USER]
+    [--players 1000] [--seasons 3]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import psycopg2 as pg
+import psycopg2.extras as pgext
+
+# run from a checkout without installing puck, see startup.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import puck.database.db as db  # noqa
+import puck.database.db_constants as db_const  # noqa
+from puck.dispatcher import Dispatch  # noqa
+
+DROP = """
+DROP TABLE IF EXISTS game_player_stats, game_team_stats, game,
+    team_season_stats, team_season, skater_season_stats, goalie_season_stats,
+    player_season, player, team, league CASCADE;
+DROP FUNCTION IF EXISTS compute_points, update_time CASCADE;
+"""
+
+ROW_TRIGGERS = """
+CREATE FUNCTION compute_points() RETURNS trigger AS
+    $$
+    BEGIN
+        NEW.ev_points  = (NEW.points - NEW.pp_points - NEW.sh_points);
+        NEW.ev_goals   = (NEW.goals - NEW.pp_goals - NEW.sh_goals);
+        NEW.pp_assists = (NEW.pp_points - NEW.pp_goals);
+        NEW.ev_assists = (NEW.ev_points - NEW.ev_goals);
+        NEW.sh_assists = (NEW.sh_points - NEW.sh_goals);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE PLPGSQL;
+
+CREATE FUNCTION update_time() RETURNS trigger AS
+    $$
+    BEGIN
+        NEW.last_updated = CURRENT_TIMESTAMP;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE PLPGSQL;
+
+CREATE TRIGGER comp_points BEFORE INSERT OR UPDATE ON skater_season_stats
+FOR EACH ROW EXECUTE PROCEDURE compute_points();
+
+CREATE TRIGGER s_stats_last_update BEFORE UPDATE ON skater_season_stats
+FOR EACH ROW EXECUTE PROCEDURE update_time();
+
+CREATE TRIGGER g_stat_last_update BEFORE UPDATE ON goalie_season_stats
+FOR EACH ROW EXECUTE PROCEDURE update_time();
+"""
+
+
+def create(db_conn, triggers):
+    cursor = db_conn.cursor()
+    cursor.execute(DROP)
+
+    for table, ddl in db_const.BASE_TABLES.items():
+        if triggers:
+            ddl = re.sub(
+                r'SMALLINT GENERATED ALWAYS AS \(.*?\) STORED', 'SMALLINT',
+                ddl, flags=re.DOTALL
+            )
+        cursor.execute(ddl)
+
+    if triggers:
+        cursor.execute(ROW_TRIGGERS)
+
+    for query in db_const.PRIMARY_DATA:
+        cursor.execute(query)
+
+    cursor.close()
+    db_conn.commit()
+
+    db.insert_many_stmt(db_conn, 'team', [
+        {'team_id': t, 'full_name': f'Team {t}', 'league_id': 133}
+        for t in range(1, 33)
+    ])
+    db.insert_many_stmt(db_conn, 'player', [
+        {'player_id': _id, 'team_id': _id % 32 + 1, 'first_name': 'F',
+         'last_name': 'L', 'position': 'C', 'handedness': 'L'}
+        for _id in PLAYERS
+    ])
+    db_conn.commit()
+
+
+def seasons(player_id, num_seasons) -> list:
+    """What player_season_data hands handle_player_season."""
+    return [{
+        'league_data': {'league_id': 133,
+                        'league_name': 'National Hockey League'},
+        'team_data': {'team_id': player_id % 32 + 1, 'full_name': 'Team',
+                      'league_id': 133},
+        'season_data': {'season': 20232024 - 10001 * i, 'league_id': 133,
+                        'league_name': 'National Hockey League',
+                        'team_id': player_id % 32 + 1, 'team_name': 'Team'},
+        'time_on_ice': '1200:00', 'assists': 30, 'goals': 20, 'points': 50,
+        'pims': 12, 'shots': 180, 'games': 82, 'hits': 40, 'pp_goals': 6,
+        'pp_points': 15, 'pp_toi': '200:00', 'sh_goals': 1, 'sh_points': 2,
+        'sh_toi': '30:00', 'ev_toi': '970:00', 'faceoff_pct': 50.0,
+        'shooting_pct': 11.1, 'gwg': 3, 'ot_goals': 1, 'plus_minus': 4,
+        'blocked': 20, 'shifts': 1600
+    } for i in range(num_seasons)]
+
+
+def write(db_conn, num_seasons, refresh) -> float:
+    known = db.KnownIds(db_conn)
+
+    start = time.perf_counter()
+    for _id in PLAYERS:
+        db.handle_player_season(
+            db_conn, Dispatch.skater_stats(_id), seasons(_id, num_seasons),
+            refresh=refresh, known=known
+        )
+    db_conn.commit()
+
+    return time.perf_counter() - start
+
+
+def check(db_conn):
+    cursor = db_conn.cursor()
+    cursor.execute(
+        'SELECT ev_points, ev_goals, pp_assists, ev_assists, sh_assists, '
+        'last_updated IS NOT NULL FROM skater_season_stats LIMIT 1'
+    )
+    row = tuple(cursor.fetchone())
+    cursor.close()
+    db_conn.rollback()
+
+    assert row == (33, 13, 9, 20, 1, True), row
+
+
+def main(db_name, user, num_players, num_seasons):
+    global PLAYERS
+    PLAYERS = list(range(8470000, 8470000 + num_players))
+
+    db_conn = pg.connect(
+        database=db_name, user=user, cursor_factory=pgext.DictCursor
+    )
+
+    print(f'{num_players} players, {num_seasons} season(s) each')
+    print('{:<10} | {:>10} | {:>10}'.format('Schema', 'insert s', 'refresh s'))
+
+    for name, triggers in (('triggers', True), ('generated', False)):
+        create(db_conn, triggers)
+        inserted = write(db_conn, num_seasons, False)
+        refreshed = write(db_conn, num_seasons, True)
+        check(db_conn)
+
+        print('{:<10} | {:>10.2f} | {:>10.2f}'.format(
+            name, inserted, refreshed
+        ))
+
+    cursor = db_conn.cursor()
+    cursor.execute(DROP)
+    cursor.close()
+    db_conn.commit()
+    db_conn.close()
+
+
+PLAYERS = []
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('db_name', help='scratch database, it is wiped')
+    parser.add_argument('--user', default=os.environ.get('dbUser'))
+    parser.add_argument('--players', type=int, default=1000)
+    parser.add_argument('--seasons', type=int, default=3)
+    args = parser.parse_args()
+
+    main(args.db_name, args.user, args.players, args.seasons)
@@ -0,0 +1,186 @@
+"""
+Load test for `puck serve`.
+
+Runs a PuckServer in process against a fixture stand-in: a 16 game slate of
+synthetic FullGame objects registered up front, so no database or network
+access is needed. A ticker changes one game's score every second to keep
+invalidation and the long-polls busy. Each scenario hammers the server
+with concurrent clients and reports throughput and latency.
+
+Usage: python benchmarks/serve_load.py [--clients 50] [--seconds 10]
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+
+# run from a checkout without installing puck, see startup.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from puck.games import FullGame  # noqa
+from puck.server import PuckServer  # noqa
+from puck.teams import GameStatsTeam  # noqa
+from puck.utils import Change, slot_names  # noqa
+
+NUM_GAMES = 16
+HOST = '127.0.0.1'
+PORT = 8089
+
+
+class FixtureSource(object):
+    """Stands in for a daemon, every game is already registered."""
+    closed = False
+
+    def __init__(self, game_ids):
+        self.game_ids = game_ids
+
+    def subscribe(self, callback):
+        pass
+
+    async def game_feeds(self, game_ids):
+        raise ConnectionError('fixture games are never requested')
+
+    async def schedule_ids(self, url_mods=None, params=None):
+        return self.game_ids
+
+
+def _stand_in(cls, **attrs):
+    obj = cls.__new__(cls)
+    for i, name in enumerate(slot_names(cls)):
+        setattr(obj, name, i)
+    for key, val in attrs.items():
+        setattr(obj, key, val)
+    return obj
+
+
+def build_slate(registry):
+    for game_id in range(NUM_GAMES):
+        game = _stand_in(
+            FullGame, db_conn=None, game_id=game_id, game_date=None,
+            is_final=False, is_live=True, in_intermission=False,
+            period='2nd', time='12:34'
+        )
+
+        for team_type in ('home', 'away'):
+            periods = GameStatsTeam.PeriodStats.__new__(
+                GameStatsTeam.PeriodStats
+            )
+            periods.data = [
+                _stand_in(GameStatsTeam.PeriodStats.Period, name=str(i))
+                for i in range(3)
+            ]
+            periods.total_shots = 30
+
+            setattr(game, team_type, _stand_in(
+                GameStatsTeam, game=game, team_type=team_type, goals=0,
+                periods=periods, shootout=None, id_list=[], players=None
+            ))
+
+        registry.games[game_id] = game
+
+
+async def ticker(server):
+    """Score a goal in a random game every second."""
+    for game_id in itertools.cycle(range(NUM_GAMES)):
+        await asyncio.sleep(1)
+        team = server.registry.get(game_id).home
+        team.goals += 1
+
+        changes = {game_id: [Change('home.goals', team.goals - 1, team.goals)]}
+        for callback in server.registry.subscribers:
+            callback(changes)
+
+
+async def hammer(session, path, seconds, etag=False):
+    """One client requesting path back to back. Returns latencies."""
+    url = f'http://{HOST}:{PORT}{path}'
+    headers = {}
+    latencies = []
+    end = time.monotonic() + seconds
+
+    while time.monotonic() < end:
+        start = time.monotonic()
+        async with session.get(url, headers=headers) as resp:
+            await resp.read()
+            if etag:
+                headers['If-None-Match'] = resp.headers['ETag']
+        latencies.append(time.monotonic() - start)
+
+    return latencies
+
+
+async def long_poll(session, game_id, seconds):
+    """One client following a game's changes. Returns the wake ups."""
+    url = f'http://{HOST}:{PORT}/games/{game_id}/changes'
+    headers = {}
+    wakes = 0
+    end = time.monotonic() + seconds
+
+    while time.monotonic() < end:
+        async with session.get(url, headers=headers) as resp:
+            await resp.read()
+            if resp.status == 200:
+                wakes += 1
+            headers['If-None-Match'] = resp.headers['ETag']
+
+    return wakes
+
+
+async def main(clients, seconds):
+    server = PuckServer(None, source=FixtureSource(list(range(NUM_GAMES))))
+    build_slate(server.registry)
+
+    runner = web.AppRunner(server.app())
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+    tick = asyncio.ensure_future(ticker(server))
+
+    scenarios = [
+        ('/games', '/games', False),
+        ('/games/{id}', '/games/3', False),
+        ('/games/{id} + ETag', '/games/3', True),
+    ]
+
+    print(f'{clients} clients, {seconds}s per scenario')
+    print('{:<20} | {:>10} | {:>10} | {:>10}'.format(
+        'Scenario', 'req/s', 'p50 ms', 'p99 ms'
+    ))
+
+    connector = aiohttp.TCPConnector(limit=clients)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        for name, path, etag in scenarios:
+            results = await asyncio.gather(*[
+                hammer(session, path, seconds, etag) for _ in range(clients)
+            ])
+            latencies = sorted(itertools.chain.from_iterable(results))
+
+            print('{:<20} | {:>10.0f} | {:>10.2f} | {:>10.2f}'.format(
+                name, len(latencies) / seconds,
+                statistics.median(latencies) * 1000,
+                latencies[int(len(latencies) * 0.99)] * 1000
+            ))
+
+        wakes = await asyncio.gather(*[
+            long_poll(session, i % NUM_GAMES, seconds)
+            for i in range(clients)
+        ])
+        print(f'long-poll: {sum(wakes)} change notifications delivered')
+
+    tick.cancel()
+    await runner.cleanup()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--seconds', type=int, default=10)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.clients, args.seconds))
@@ -0,0 +1,204 @@
+"""
+Round trip of a fixture database through `puck snapshot`.
+
+Fills the base tables of a scratch database with a synthetic league (teams,
+players, three seasons of player and team stats), exports a snapshot,
+drops every table, imports the snapshot and compares every row with what
+was written. Also checks that the SERIAL sequences were moved past the
+loaded rows. Reports the export and import time and the snapshot size.
+
+THE DATABASE IS WIPED. Point it at a database made for this, never the one
+puck uses.
+
+Usage: python benchmarks/snapshot_roundtrip.py DBNAME [--user USER]
+    [--players 900]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import psycopg2 as pg
+import psycopg2.extras as pgext
+
+# run from a checkout without installing puck, see startup.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import puck.database.db_constants as db_const  # noqa
+from puck.database.db import (create_base_tables, create_base_triggers,  # noqa
+                              insert_many_stmt)
+from puck.database.snapshot import export_snapshot, import_snapshot  # noqa
+
+SEASONS = (20212022, 20222023, 20232024)
+NUM_TEAMS = 32
+
+DROP = """
+DROP TABLE IF EXISTS game_player_stats, game_team_stats, game,
+    team_season_stats, team_season, skater_season_stats, goalie_season_stats,
+    player_season, player, team, league, schema_version CASCADE;
+DROP FUNCTION IF EXISTS compute_points, update_time_goalie_stats,
+    update_time_player, update_time_skater_stats, update_time_team_stats
+    CASCADE;
+"""
+
+
+def drop(db_conn):
+    cursor = db_conn.cursor()
+    cursor.execute(DROP)
+    cursor.close()
+    db_conn.commit()
+
+
+def create(db_conn):
+    drop(db_conn)
+    cursor = db_conn.cursor()
+    create_base_tables(cursor, list(db_const.BASE_TABLES))
+    create_base_triggers(cursor)
+    cursor.close()
+    db_conn.commit()
+
+
+def fill(db_conn, num_players):
+    insert_many_stmt(db_conn, 'league', [
+        {'league_id': 133, 'league_name': 'National Hockey League'},
+        {'league_id': 153, 'league_name': 'American Hockey League'}
+    ])
+    insert_many_stmt(db_conn, 'team', [
+        {'team_id': t, 'full_name': f'Team {t}', 'abbreviation': f'T{t}',
+         'division': t % 4, 'conference': t % 2, 'active': True,
+         'franchise_id': t, 'league_id': 133}
+        for t in range(1, NUM_TEAMS + 1)
+    ])
+    insert_many_stmt(db_conn, 'player', [
+        {'player_id': 8470000 + p, 'team_id': p % NUM_TEAMS + 1,
+         'first_name': f'First{p}', 'last_name': f'Last{p}',
+         'number': str(p % 99), 'position': 'G' if p % 15 == 0 else 'C',
+         'handedness': 'L' if p % 3 else 'R', 'rookie': p % 7 == 0,
+         'age': 20 + p % 15, 'birth_date': '1999-01-01',
+         'birth_city': 'City', 'birth_state': None, 'birth_country': 'CAN',
+         'height': "6' 1\"", 'weight': 190}
+        for p in range(num_players)
+    ])
+
+    for season in SEASONS:
+        players = [8470000 + p for p in range(num_players)]
+        uids = insert_many_stmt(db_conn, 'player_season', [
+            {'player_id': _id, 'season': season, 'league_id': 133,
+             'league_name': 'National Hockey League',
+             'team_id': _id % NUM_TEAMS + 1, 'team_name': 'Team'}
+            for _id in players
+        ], on_conflict=None, returning='unique_id')
+
+        skaters, goalies = [], []
+        for uid, _id in zip(uids, players):
+            if (_id - 8470000) % 15 == 0:
+                goalies.append({
+                    'unique_id': uid, 'wins': uid % 40, 'losses': uid % 30,
+                    'saves': uid % 1500, 'save_pct': 0.91, 'gaa': 2.8
+                })
+            else:
+                skaters.append({
+                    'unique_id': uid, 'goals': uid % 50, 'assists': uid % 60,
+                    'points': uid % 50 + uid % 60, 'pp_goals': 0,
+                    'pp_points': 0, 'sh_goals': 0, 'sh_points': 0,
+                    'time_on_ice': '1200:00', 'shooting_pct': 10.5
+                })
+
+        insert_many_stmt(db_conn, 'skater_season_stats', skaters)
+        insert_many_stmt(db_conn, 'goalie_season_stats', goalies)
+
+        uids = insert_many_stmt(db_conn, 'team_season', [
+            {'team_id': t, 'season': season, 'franchise_id': t,
+             'division_id': t % 4, 'conference_id': t % 2}
+            for t in range(1, NUM_TEAMS + 1)
+        ], on_conflict=None, returning='unique_id')
+        insert_many_stmt(db_conn, 'team_season_stats', [
+            {'unique_id': uid, 'games_played': 82, 'wins': uid % 60,
+             'losses': uid % 30}
+            for uid in uids
+        ])
+
+    db_conn.commit()
+
+
+def contents(db_conn) -> dict:
+    cursor = db_conn.cursor()
+    rows = {}
+    for table in db_const.BASE_TABLES:
+        cursor.execute(f'SELECT * FROM {table} ORDER BY 1, 2')
+        rows[table] = [tuple(row) for row in cursor.fetchall()]
+    cursor.close()
+    db_conn.rollback()
+
+    return rows
+
+
+def main(db_name, user, num_players):
+    db_conn = pg.connect(
+        database=db_name, user=user, cursor_factory=pgext.DictCursor
+    )
+
+    create(db_conn)
+    fill(db_conn, num_players)
+    before = contents(db_conn)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'puck.snapshot')
+
+        start = time.perf_counter()
+        meta = export_snapshot(db_conn, path)
+        exported = time.perf_counter() - start
+        size = os.path.getsize(path)
+
+        # import creates the tables again
+        drop(db_conn)
+
+        start = time.perf_counter()
+        import_snapshot(db_conn, path)
+        imported = time.perf_counter() - start
+
+    after = contents(db_conn)
+
+    ok = True
+    for table in db_const.BASE_TABLES:
+        if before[table] != after[table]:
+            print(f'{table}: rows differ', file=sys.stderr)
+            ok = False
+
+    if meta['seasons']['player_season'] != list(SEASONS):
+        print(f'seasons: {meta["seasons"]}', file=sys.stderr)
+        ok = False
+
+    # a new row must get a unique_id past the loaded ones
+    try:
+        insert_many_stmt(db_conn, 'player_season', [{
+            'player_id': 8470000, 'season': 20242025, 'league_id': 133,
+            'league_name': 'National Hockey League', 'team_id': 1,
+            'team_name': 'Team'
+        }], on_conflict=None)
+        db_conn.commit()
+    except pg.Error as err:
+        print(f'sequence not moved: {err}', file=sys.stderr)
+        ok = False
+
+    rows = sum(meta['tables'].values())
+    print(f'{rows} rows, snapshot {size / 2 ** 20:.2f} MB')
+    print(f'export {exported:.2f}s, import {imported:.2f}s')
+    print('round trip OK' if ok else 'round trip FAILED')
+
+    drop(db_conn)
+    db_conn.close()
+
+    return ok
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('db_name', help='scratch database, it is wiped')
+    parser.add_argument('--user', default=os.environ.get('dbUser'))
+    parser.add_argument('--players', type=int, default=900)
+    args = parser.parse_args()
+
+    sys.exit(0 if main(args.db_name, args.user, args.players) else 1)
@@ -0,0 +1,94 @@
+"""
+Startup budget for the puck CLI.
+
+Measures the import time of puck.cli (python -X importtime) and the wall
+clock of `puck --help`. With --games, the wall clock of `puck games` is
+measured as well, which needs the config file and database set up.
+
+Exits with a non-zero status if any measurement is over its budget, so it
+can gate changes that pull heavy imports back into startup.
+
+Usage: python benchmarks/startup.py [--runs 5] [--games]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# milliseconds
+BUDGET = {
+    'import puck.cli': 100,
+    'puck --help': 300,
+    'puck games': 1500,
+}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENV = {**os.environ, 'PYTHONPATH': ROOT}
+
+
+def import_time(module) -> float:
+    """Cumulative import time of module in milliseconds."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        env=ENV, stderr=subprocess.PIPE, universal_newlines=True, check=True
+    )
+
+    # import time: self [us] | cumulative | imported package
+    for line in proc.stderr.splitlines():
+        _, cumulative, name = line.split('|')
+        if name.strip() == module:
+            return int(cumulative) / 1000
+
+    raise RuntimeError(f'{module} was not imported')
+
+
+def wall_clock(args, runs) -> float:
+    """Median wall clock of a command in milliseconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            args, env=ENV, stdout=subprocess.DEVNULL, check=True
+        )
+        times.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(times)
+
+
+def main(runs, games):
+    results = {
+        'import puck.cli': statistics.median(
+            import_time('puck.cli') for _ in range(runs)
+        ),
+        'puck --help': wall_clock(
+            [sys.executable, '-c', 'from puck.cli import main; main()',
+             '--help'], runs
+        ),
+    }
+
+    if games:
+        results['puck games'] = wall_clock(
+            [sys.executable, '-m', 'puck', 'games'], runs
+        )
+
+    print('{:<16} | {:>10} | {:>10}'.format('Measure', 'ms', 'Budget'))
+
+    over = []
+    for name, ms in results.items():
+        print('{:<16} | {:>10.1f} | {:>10}'.format(name, ms, BUDGET[name]))
+        if ms > BUDGET[name]:
+            over.append(name)
+
+    if over:
+        sys.exit(f'Over budget: {", ".join(over)}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--games', action='store_true')
+    args = parser.parse_args()
+
+    main(args.runs, args.games)
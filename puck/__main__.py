@@ -1,12 +1,10 @@
 #! /usr/bin/env python3.7
-import puck.cli
 import json
 import os
 import sys
 from pathlib import Path
 
-import puck.database.db
-from puck.utils import ConfigError
+import puck.cli
 
 
 CONFIG_PATH = Path(Path.home().joinpath('.puck/config.json'))
@@ -14,6 +12,8 @@ CONFIG = ''
 
 # check if config file exists
 if not CONFIG_PATH.exists():
+    # puck.utils pulls in aiohttp and requests, only import it to fail
+    from puck.utils import ConfigError
     raise ConfigError('No config file detected.')
 
 # open config and load the data
@@ -28,6 +28,7 @@ try:
     CONFIG['dbName']
     CONFIG['dbUser']
 except KeyError as err:
+    from puck.utils import ConfigError
     raise ConfigError(f'Key: {err} was not found in config file.')
 
 # set up environment
@@ -0,0 +1,117 @@
+"""
+`puck backfill`, stores the box score of every final game of a season.
+
+Games go through a fetch -> parse -> write Pipeline. BACKFILL_WINDOW feeds
+are requested at once at Priority.BULK, parsed into rows, by PARSE_WORKERS
+processes if any (see parse_pool), and written BACKFILL_BATCH games per
+transaction. A stored game is its own checkpoint: a run that is
+interrupted, or run again, skips every game already in the game table and
+carries on with the rest.
+"""
+import sys
+
+import aiohttp
+
+import puck.boxscore as boxscore
+import puck.constants as const
+from puck.games import async_get_game_ids
+from puck.parse_pool import ParsePool, game_record
+from puck.pipeline import Pipeline, Stage
+from puck.request_queue import Priority
+from puck.urls import Url
+from puck.utils import ProgressBar, async_request
+
+
+async def backfill_season(db_conn, season, window=const.BACKFILL_WINDOW, batch=const.BACKFILL_BATCH, parse_workers=const.PARSE_WORKERS) -> dict:  # noqa
+    """
+    Store every final game of season that is not stored yet.
+
+    Args:
+        db_conn (psycopg2.Connection): Database connection
+        season (int): Season identifier i.e. 20232024
+        window (int, optional): feeds in flight.
+            Defaults to const.BACKFILL_WINDOW.
+        batch (int, optional): games per transaction.
+            Defaults to const.BACKFILL_BATCH.
+        parse_workers (int, optional): parsing processes, 0 parses on the
+            event loop. Defaults to const.PARSE_WORKERS.
+
+    Returns:
+        dict: number of games 'scheduled', 'already_stored' (by an earlier
+            run), 'stored' (by this run) and 'not_final'
+    """
+    _ids = list(dict.fromkeys(await async_get_game_ids(
+        params={'season': season}, priority=Priority.BULK
+    )))
+
+    done = boxscore.stored_game_ids(db_conn, _ids)
+    todo = [_id for _id in _ids if _id not in done]
+
+    counts = {
+        'scheduled': len(_ids), 'already_stored': len(done), 'stored': 0,
+        'not_final': 0
+    }
+
+    progress = ProgressBar(
+        end=len(todo), prefix=f'{season}:', suffix='', unit='games'
+    )
+
+    pending = []
+
+    def flush():
+        if pending:
+            boxscore.save_rows(db_conn, pending)
+            counts['stored'] += len(pending)
+            pending.clear()
+
+    with ParsePool(parse_workers) as pool:
+        async with aiohttp.ClientSession() as session:
+            async def fetch(_id):
+                # bytes only, decoding is left to parse
+                return [await async_request(
+                    Url.GAME, session, url_mods={'game_id': _id},
+                    priority=Priority.BULK, raw=True
+                )]
+
+            async def parse(raw):
+                return [await pool.run(game_record, raw)]
+
+            async def write(record):
+                _, rows = record
+
+                if rows is not None:
+                    pending.append(rows)
+                    if len(pending) >= batch:
+                        flush()
+                else:
+                    # postponed or not played yet, picked up by a later run
+                    counts['not_final'] += 1
+
+                progress.increment()
+
+            pipeline = Pipeline([
+                Stage('fetch', fetch, window, window),
+                Stage('parse', parse, max(parse_workers, 1), window),
+                Stage('write', write, 1, batch)
+            ])
+
+            try:
+                await pipeline.run(todo)
+            except BaseException as err:
+                # keep everything fetched before an interruption, the
+                # interruption is what gets reported
+                try:
+                    flush()
+                except Exception as flush_err:
+                    print(
+                        f'Games fetched before {err!r} were not stored: '
+                        f'{flush_err}', file=sys.stderr
+                    )
+                raise
+
+            flush()
+
+    progress.completed()
+    pipeline.print_stats()
+
+    return counts
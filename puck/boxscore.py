@@ -0,0 +1,252 @@
+"""
+Stored box scores of final games (the game, game_team_stats and
+game_player_stats tables). A game is written once when it is seen final,
+after that BannerGame, FullGame and their players are built from these rows
+without requesting or parsing the game's feed.
+"""
+from collections import namedtuple
+
+import arrow
+import psycopg2 as pg
+import psycopg2.extras as pgext
+
+import puck.constants as const
+import puck.database.db_constants as db_const
+import puck.parser as parser
+from puck.database.db import insert_many_stmt, select_any_stmt, select_stmt
+
+# game: DictRow of game, teams: team_type -> DictRow of game_team_stats
+GameRows = namedtuple('GameRows', ['game', 'teams'])
+
+
+def game_rows(data) -> tuple:
+    """
+    Rows of a final game's feed.
+
+    Args:
+        data (dict): Url.GAME JSON feed
+
+    Returns:
+        tuple: (game row, list of game_team_stats rows,
+            list of game_player_stats rows)
+    """
+    parsed_data = parser.game(data)
+    linescore = data['liveData']['linescore']
+    teams = data['gameData']['teams']
+    game_id = data['gamePk']
+
+    game = {
+        'game_id': game_id,
+        # from the feed, the date alone misplaces games played in October
+        'season': int(data['gameData']['game']['season']),
+        'game_date': parsed_data['game_date'].datetime,
+        'game_status': parsed_data['game_status'],
+        'period': parsed_data['period'],
+        'time': parsed_data['time'],
+        'home_team_id': teams['home']['id'],
+        'away_team_id': teams['away']['id'],
+        'periods': pgext.Json(linescore['periods']),
+        'has_shootout': linescore['hasShootout']
+    }
+
+    team_rows = []
+    player_rows = []
+    for team_type in ('home', 'away'):
+        box = data['liveData']['boxscore']['teams'][team_type]
+        shootout = linescore['shootoutInfo'][team_type] \
+            if linescore['hasShootout'] else {}
+
+        team_rows.append({
+            'game_id': game_id,
+            'team_type': team_type,
+            'team_id': teams[team_type]['id'],
+            **parser.teams_skater_stats(data, team_type, True),
+            'so_goals': shootout.get('scores'),
+            'so_attempts': shootout.get('attempts'),
+            'player_ids': box['goalies'] + box['skaters'] + box['scratches']
+        })
+
+        for player in box['players'].values():
+            player_rows.append(_player_row(game_id, team_type, player))
+
+    return game, team_rows, player_rows
+
+
+def _player_row(game_id, team_type, data) -> dict:
+    position = data['position']['abbreviation']
+    stats = parser.player_stats_game(data) or {}
+
+    row = {
+        'game_id': game_id,
+        'player_id': data['person']['id'],
+        'team_type': team_type,
+        'position': position,
+        'played': bool(stats)
+    }
+
+    # every row has every column, execute_values needs the same keys
+    for col in _STAT_COLUMNS:
+        row[col] = stats.get(col)
+
+    return row
+
+
+# union of both stat layouts in table order
+_STAT_COLUMNS = list(dict.fromkeys(
+    db_const.TableColumns.SKATER_GAME_STATS.value +
+    db_const.TableColumns.GOALIE_GAME_STATS.value
+))
+
+
+def save_game(db_conn, data):
+    """
+    Store a final game from its feed. Games already stored are left as they
+    are, a game that is not final is ignored.
+
+    Args:
+        db_conn (psycopg2.Connection): Database connection
+        data (dict): Url.GAME JSON feed
+
+    Raises:
+        psycopg2.Error: the game was not stored, see save_rows
+    """
+    if not is_final(data):
+        return
+
+    save_rows(db_conn, [game_rows(data)])
+
+
+def save_rows(db_conn, rows):
+    """
+    Store many games in one transaction, three statements no matter how
+    many games. Nothing is stored if any insert fails.
+
+    Args:
+        db_conn (psycopg2.Connection): Database connection
+        rows (list of tuple): game_rows of each game
+
+    Raises:
+        psycopg2.Error: the transaction was rolled back
+    """
+    try:
+        insert_many_stmt(db_conn, 'game', [game for game, _, _ in rows])
+        insert_many_stmt(db_conn, 'game_team_stats', [
+            row for _, team_rows, _ in rows for row in team_rows
+        ])
+        insert_many_stmt(db_conn, 'game_player_stats', [
+            row for _, _, player_rows in rows for row in player_rows
+        ])
+        db_conn.commit()
+    except pg.Error:
+        db_conn.rollback()
+        raise
+
+
+def is_final(data) -> bool:
+    """Is the game of a Url.GAME feed final."""
+    status = int(data['gameData']['status']['statusCode'])
+
+    return status in const.GAME_STATUS['Final']
+
+
+def stored_game_ids(db_conn, game_ids) -> set:
+    """The games of game_ids that are stored."""
+    game_ids = list(game_ids)
+    if not game_ids:
+        return set()
+
+    rows = select_any_stmt(
+        db_conn, 'game', 'game_id', game_ids, columns=['game_id']
+    ) or []
+
+    return {row['game_id'] for row in rows}
+
+
+def fetch_game_rows(db_conn, game_ids) -> dict:
+    """
+    Stored rows of the games in game_ids, two queries for any number of
+    games.
+
+    Args:
+        db_conn (psycopg2.Connection): Database connection
+        game_ids (iterable of int): Game IDs
+
+    Returns:
+        dict: game_id -> GameRows, only for games that are stored
+    """
+    game_ids = list(game_ids)
+    if not game_ids:
+        return {}
+
+    games = select_any_stmt(db_conn, 'game', 'game_id', game_ids) or []
+    if not games:
+        return {}
+
+    teams = {}
+    for row in select_any_stmt(
+            db_conn, 'game_team_stats', 'game_id',
+            [game['game_id'] for game in games]) or []:
+        teams.setdefault(row['game_id'], {})[row['team_type']] = row
+
+    return {
+        game['game_id']: GameRows(game, teams[game['game_id']])
+        for game in games if len(teams.get(game['game_id'], ())) == 2
+    }
+
+
+def fetch_player_stat_rows(db_conn, game_id, team_type) -> dict:
+    """
+    Stored player rows of one team in a game.
+
+    Returns:
+        dict: player_id -> DictRow of game_player_stats, empty if the game
+            is not stored
+    """
+    rows = select_stmt(
+        db_conn, 'game_player_stats',
+        where=[('game_id', game_id), ('team_type', team_type)]
+    ) or []
+
+    return {row['player_id']: row for row in rows}
+
+
+def game_attrs(row) -> dict:
+    """Attributes of a BannerGame from a game row, see parser.game."""
+    game_date = arrow.get(row['game_date']).to('local')
+
+    return {
+        'game_status': row['game_status'],
+        'start_time': game_date.strftime('%I:%M %p %Z'),
+        'game_date': game_date,
+        'period': row['period'],
+        'time': row['time'],
+        'in_intermission': False,
+        'is_preview': None,
+        'is_final': True,
+        'is_live': False
+    }
+
+
+def team_attrs(row, full_team=False) -> dict:
+    """Attributes of a team from a game_team_stats row, see
+    parser.teams_skater_stats."""
+    if not full_team:
+        return {'goals': row['goals']}
+
+    return {
+        col: row[col] for col in db_const.TableColumns.GAME_TEAM_STATS.value
+    }
+
+
+def player_stats(row):
+    """Stats of a game_player_stats row the way parser.player_stats_game
+    returns them, None for a player that did not play."""
+    if not row['played']:
+        return None
+
+    if row['position'] == 'G':
+        cols = db_const.TableColumns.GOALIE_GAME_STATS.value
+    else:
+        cols = db_const.TableColumns.SKATER_GAME_STATS.value
+
+    return {col: row[col] for col in cols}
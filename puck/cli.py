@@ -1,10 +1,8 @@
-import arrow
 import click
 
-from puck.database.db import connect_db, simple_conn
-from puck.games_handler import games_handler
-from puck.utils import style
-import puck.app
+# NOTE: Each command imports what it uses inside of the command.
+# Importing the database, aiohttp or urwid at module level makes every
+# invocation, even --help, pay for all of them.
 
 
 class Config(object):
@@ -25,7 +23,8 @@ class MutuallyExclusiveOption(click.Option):
     Thanks to this Stack Overflow Answer:
     https://stackoverflow.com/questions/37310718/mutually-exclusive-option-groups-in-python-click   # noqa
 
-    Additional thanks to the Watson CLI program for help in adding the _exclusive_error function
+    Additional thanks to the Watson CLI program for help in adding the
+    _exclusive_error function
     https://github.com/TailorDev/Watson/blob/master/watson/cli.py
     """
 
@@ -42,6 +41,8 @@ class MutuallyExclusiveOption(click.Option):
         )
 
     def _exclusive_error(self):
+        from puck.utils import style
+
         self.mutually_exclusive.add(self.opts[-1].strip('-'))
         errmsg = 'The following options are mutually exclusive: '
         '{}'.format(', '.join(
@@ -65,12 +66,16 @@ class ISODateType(click.ParamType):
         if value and self._is_valid_input(value):
             return value
 
+        from puck.utils import style
+
         errmsg = f'Invalid input: {value}. Please use the ISO' \
             'Date format YYYY-MM-DD.\n       ' \
             'Please make sure input is a valid date.'
         raise click.ClickException(style(errmsg, 'error'))
 
     def _is_valid_input(self, value):
+        import arrow
+
         # simply attempt to create an arrow object with the input
         # if it fails, return false
         try:
@@ -84,16 +89,83 @@ class ISODateType(click.ParamType):
         return True
 
 
+class SeasonType(click.ParamType):
+    """
+    A season as the api identifies it i.e. 20232024. 2023-2024 and the
+    starting year 2023 are accepted as well.
+    """
+    name = 'season'
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, int):
+            return value
+
+        years = value.replace('-', '')
+        if years.isdigit():
+            if len(years) == 4:
+                return int(years) * 10000 + int(years) + 1
+            if len(years) == 8 and int(years[4:]) == int(years[:4]) + 1:
+                return int(years)
+
+        from puck.utils import style
+
+        errmsg = f'Invalid season: {value}. Please use YYYYYYYY, ' \
+            'YYYY-YYYY or the starting year YYYY.'
+        raise click.ClickException(style(errmsg, 'error'))
+
+
+class SeasonRangeType(click.ParamType):
+    """
+    An inclusive range of seasons, from the season starting in the first
+    year to the one ending in the last i.e. 2005-2024 is 20052006 through
+    20232024. 20052006-20232024 and a single season (see SeasonType) are
+    accepted as well. Converts to a list of seasons.
+    """
+    name = 'seasons'
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, list):
+            return value
+
+        from puck.utils import season_range
+
+        parts = value.split('-')
+        first = last = None
+
+        if len(parts) == 2 and all(len(p) == 4 and p.isdigit() for p in parts):
+            first = int(parts[0]) * 10001 + 1
+            last = int(parts[1]) * 10001 - 10000
+        elif len(parts) == 2 and all(len(p) == 8 and p.isdigit() for p in parts):  # noqa
+            first, last = int(parts[0]), int(parts[1])
+            if first % 10000 != first // 10000 + 1 or \
+                    last % 10000 != last // 10000 + 1:
+                first = last = None
+        else:
+            first = last = Season.convert(value, param, ctx)
+
+        if first is not None and first <= last:
+            return season_range(first, last)
+
+        from puck.utils import style
+
+        errmsg = f'Invalid seasons: {value}. Please use a range of years ' \
+            'YYYY-YYYY, seasons YYYYYYYY-YYYYYYYY or a single season.'
+        raise click.ClickException(style(errmsg, 'error'))
+
+
 # pass_config = click.make_pass_decorator(Config)
 Date = ISODateType()
-File = click.File()
+Season = SeasonType()
+SeasonRange = SeasonRangeType()
+File = click.File('w')
 
 
 @click.group()
 @click.option('-v', '--verbose', is_flag=True, help='Prints verbose output')
 @click.option(
     '-o', '--output-file', nargs=1, type=File,
-    help='Outputs results to CSV file at specified file location'
+    help='Outputs results to a CSV file at specified file location '
+    '(JSON lines when the file ends in .jsonl, .ndjson or .json)'
 )
 @click.pass_context
 def cli(ctx, verbose, output_file):
@@ -129,11 +201,22 @@ def cli(ctx, verbose, output_file):
     help='Query a date range (YYYY-MM-DD) to (YYYY-MM-DD)', cls=MutuallyExclusiveOption,  # noqa
     mutually_exclusive=['today', 'yesterday', 'tomorrow', 'date']
 )
+@click.option(
+    '-w', '--watch', is_flag=True,
+    help='Keep refreshing, printing games as they change'
+)
 @click.pass_context
-def games(ctx, team, today, yesterday, tomorrow, date, date_range):
+def games(ctx, team, today, yesterday, tomorrow, date, date_range, watch):
     """Queries the NHL schedule. To query for a specific team
      use 3-Letter abberviation TEAM.
      """
+    from puck.database.db import connect_db
+    from puck.games_handler import games_handler
+
+    # a watch never finishes writing, it only prints
+    if watch and ctx.obj.output_file is not None:
+        raise click.UsageError('--output-file cannot be used with --watch')
+
     ctx.obj.conn = connect_db()
     cmd_vals = {k: v for k, v in ctx.params.items() if v}
     games_handler(ctx.obj, cmd_vals)
@@ -143,9 +226,210 @@ def games(ctx, team, today, yesterday, tomorrow, date, date_range):
 @click.pass_context
 def tui(ctx):
     """Load the Puck TUI."""
+    import puck.app
+
     puck.app.main()
 
 
+@cli.command()
+@click.pass_context
+def daemon(ctx):
+    """Poll games for every puck client on this machine."""
+    import asyncio
+
+    from puck.daemon import DaemonError, PuckDaemon
+    from puck.database.db import connect_db
+    from puck.utils import style
+
+    ctx.obj.conn = connect_db()
+    server = PuckDaemon(ctx.obj.conn)
+
+    click.echo(f'Listening on {server.path}')
+    try:
+        asyncio.run(server.serve())
+    except DaemonError as err:
+        raise click.ClickException(style(str(err), 'error'))
+    except KeyboardInterrupt:
+        pass
+
+
+@cli.command()
+@click.option('--host', default='127.0.0.1', help='Address to listen on')
+@click.option('-p', '--port', default=8080, type=int, help='Port to listen on')
+@click.pass_context
+def serve(ctx, host, port):
+    """Serve games and team stats as JSON over HTTP."""
+    import asyncio
+
+    from puck.database.db import connect_db
+    from puck.server import run_server
+
+    ctx.obj.conn = connect_db()
+
+    click.echo(f'Serving on http://{host}:{port}')
+    try:
+        asyncio.run(run_server(ctx.obj.conn, host, port))
+    except KeyboardInterrupt:
+        pass
+
+
+@cli.command()
+@click.option(
+    '-s', '--season', type=Season, default=None,
+    help='Season to load i.e. 20232024 (Defaults to the current season)'
+)
+@click.option(
+    '-j', '--parse-workers', type=click.IntRange(min=0), default=None,
+    help='Processes parsing feeds, 0 parses on the main process'
+)
+@click.pass_context
+def backfill(ctx, season, parse_workers):
+    """Store the box score of every final game of a season.
+    An interrupted backfill resumes where it stopped."""
+    import asyncio
+
+    import puck.constants as const
+    from puck.backfill import backfill_season
+    from puck.database.db import connect_db
+    from puck.utils import get_season_number
+
+    ctx.obj.conn = connect_db()
+    season = season or get_season_number()
+
+    try:
+        counts = asyncio.run(backfill_season(
+            ctx.obj.conn, season, parse_workers=const.PARSE_WORKERS
+            if parse_workers is None else parse_workers
+        ))
+    except KeyboardInterrupt:
+        click.echo('\nInterrupted, run it again to resume.', err=True)
+        return
+
+    click.echo(
+        f'{counts["stored"]} game(s) stored, '
+        f'{counts["already_stored"]} already stored, '
+        f'{counts["not_final"]} not final '
+        f'of {counts["scheduled"]} scheduled.'
+    )
+
+
+@cli.command()
+@click.option(
+    '--seasons', type=SeasonRange, default=None, cls=MutuallyExclusiveOption,
+    mutually_exclusive=['all_seasons'],
+    help='Seasons of stats to download i.e. 2005-2024 '
+    '(Defaults to the last three)'
+)
+@click.option(
+    '--all', 'all_seasons', is_flag=True, cls=MutuallyExclusiveOption,
+    mutually_exclusive=['seasons'], help='Download every season'
+)
+@click.pass_context
+def init(ctx, seasons, all_seasons):
+    """Create the database and download teams, players and their
+    season stats."""
+    from puck.database.db import connect_db, simple_conn, undefined_tables
+
+    conn = simple_conn()
+    cursor = conn.cursor()
+    undefined = undefined_tables(cursor)
+    cursor.close()
+    conn.close()
+
+    if not undefined:
+        click.echo(
+            'The database is already set up, reset it with resetdb to '
+            'download other seasons.'
+        )
+        return
+
+    if all_seasons:
+        import puck.constants as const
+        from puck.utils import get_season_number, season_range
+
+        seasons = season_range(const.FIRST_SEASON, get_season_number())
+
+    ctx.obj.conn = connect_db(seasons)
+
+
+@cli.command()
+@click.option(
+    '-t', '--ttl', type=click.FloatRange(min=0), default=None,
+    help='Hours before season stats are refreshed (Defaults to 24)'
+)
+@click.pass_context
+def sync(ctx, ttl):
+    """Update players who are new, moved team or left every roster since
+    the last sync, and season stats that are out of date."""
+    import asyncio
+
+    import puck.constants as const
+    from puck.database.db import connect_db
+    from puck.sync import sync_rosters
+
+    ctx.obj.conn = connect_db()
+    ttl = const.SYNC_STATS_TTL if ttl is None else int(ttl * 60 * 60)
+
+    counts = asyncio.run(sync_rosters(ctx.obj.conn, ttl))
+
+    click.echo(
+        f'{counts["rostered"]} rostered player(s): {counts["new"]} new, '
+        f'{counts["moved"]} moved, {counts["unchanged"]} skipped, '
+        f'{counts["released"]} no longer rostered. '
+        f'Season stats: {counts["stats_refreshed"]} refreshed, '
+        f'{counts["stats_skipped"]} skipped.'
+    )
+
+
+@cli.group()
+def snapshot():
+    """Save or load the database in one compressed file."""
+
+
+@snapshot.command('export')
+@click.argument('path', type=click.Path(dir_okay=False, writable=True))
+@click.pass_context
+def snapshot_export(ctx, path):
+    """Write teams, players and season stats to PATH."""
+    from puck.database.db import connect_db
+    from puck.database.snapshot import export_snapshot
+
+    ctx.obj.conn = connect_db()
+    meta = export_snapshot(ctx.obj.conn, path)
+
+    click.echo(_snapshot_summary(meta))
+
+
+@snapshot.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.pass_context
+def snapshot_import(ctx, path):
+    """Load a snapshot into a new or reset database."""
+    import tarfile
+
+    from puck.database.db import simple_conn
+    from puck.database.snapshot import SnapshotError, import_snapshot
+    from puck.utils import style
+
+    ctx.obj.conn = simple_conn()
+
+    try:
+        meta = import_snapshot(ctx.obj.conn, path)
+    except (SnapshotError, tarfile.TarError, OSError) as err:
+        raise click.ClickException(style(str(err), 'error'))
+
+    click.echo(_snapshot_summary(meta))
+
+
+def _snapshot_summary(meta) -> str:
+    seasons = meta['seasons']['player_season']
+    coverage = f'{seasons[0]}-{seasons[-1]}' if seasons else 'no seasons'
+
+    return f'{sum(meta["tables"].values())} rows ' \
+        f'({meta["tables"]["player"]} players, {coverage}) ' \
+        f'written {meta["created"]}'
+
+
 @cli.command()
 @click.pass_context
 def resetdb(ctx):
@@ -157,6 +441,8 @@ def resetdb(ctx):
 y/n\n>'
         )
         if reset.lower() == 'y':
+            from puck.database.db import simple_conn
+
             conn = simple_conn()
             cursor = conn.cursor()
 
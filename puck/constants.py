@@ -1,7 +1,12 @@
+import os
+from pathlib import Path
+
 GAME_STATUS = {
     'Preview': [1, 2, 8, 9],
     'Final': [5, 6, 7],
-    'Live': [3, 4]
+    'Live': [3, 4],
+    # previews as well, the game is not played on its date
+    'Postponed': [9]
 }
 
 GAME_D_STATUS = {
@@ -11,6 +16,92 @@ GAME_D_STATUS = {
     'Final': [6, 7]
 }
 
+# seconds between polls of a single game based on its state
+# None means the game is never polled again
+POLL_INTERVAL = {
+    'live': 10,
+    'intermission': 60,
+    'pre_game': 30,         # past the scheduled start, waiting for puck drop
+    'preview_min': 60,      # preview games poll at half the time to puck drop
+    'preview_max': 1800,    # clamped to these bounds
+    'final': None,
+    'postponed': None,
+    'delayed': None         # PRE_GAME_MAX past the start without puck drop
+}
+# seconds past the scheduled start a game is still expected to start
+PRE_GAME_MAX = 3 * 60 * 60
+
+# concurrent API requests, bulk ingestion only gets a share of them so
+# requests the user is waiting on always find a free slot (request_queue)
+REQUEST_SLOTS = {
+    'max_active': 8,
+    'bulk_max': 5
+}
+
+# unix domain socket of `puck daemon`, clients use it when it exists
+# the per user runtime directory is preferred, the socket itself is 0600
+DAEMON_SOCKET = Path(
+    os.environ.get('XDG_RUNTIME_DIR') or Path.home().joinpath('.puck')
+).joinpath('puck.sock')
+# seconds a schedule response is served from the daemon's cache
+DAEMON_SCHEDULE_TTL = 60
+
+# games requested or held at once while streaming (games.stream_games)
+STREAM_WINDOW = 16
+
+# --date-range is requested this many days at a time, at most
+# DATE_CHUNK_LOOKAHEAD schedule requests run ahead of the games being output
+DATE_CHUNK_DAYS = 7
+DATE_CHUNK_LOOKAHEAD = 2
+# feeds of days with every game final, one file per day (feed_cache)
+FEED_CACHE = Path.home().joinpath('.puck/cache/feeds')
+# the parts of a game feed the game objects are built from, the rest
+# (i.e. every play) is not cached
+FEED_CACHE_KEYS = {
+    'gameData': ('status', 'datetime', 'teams'),
+    'liveData': ('linescore', 'boxscore')
+}
+
+# `puck backfill`: feeds in flight and games written per transaction
+BACKFILL_WINDOW = 16
+BACKFILL_BATCH = 50
+# processes decoding and parsing feeds during a backfill (parse_pool), with
+# 0 feeds are parsed on the main process
+PARSE_WORKERS = 0
+
+# seasons of team and player stats populate_initial_tables downloads, the
+# current one and the ones before it. `puck init --seasons` or `--all`
+# (every season from FIRST_SEASON) pick others
+INGEST_SEASONS = 3
+FIRST_SEASON = 19171918
+
+# `puck sync` refreshes a player's season stats once they are this many
+# seconds old
+SYNC_STATS_TTL = 24 * 60 * 60
+
+# stages of populate_initial_tables (see pipeline), workers running at once
+# and the most items waiting in each stage's inbox. fetch only waits on the
+# network, parse and write share the event loop and the database connection
+INGEST_STAGES = {
+    'fetch': {'workers': 8, 'queue': 32},
+    'parse': {'workers': 1, 'queue': 32},
+    'write': {'workers': 1, 'queue': 32}
+}
+
+# seconds `puck serve` keeps responses not tied to a game update
+SERVE_TTL = {
+    'schedule': 60,
+    'team': 300
+}
+# longest a long-poll request is held open, in seconds
+SERVE_LONG_POLL = 30
+# games `puck serve` holds, the least recently requested are dropped past
+# max_games and every game not requested for ttl seconds is dropped
+SERVE_GAMES = {
+    'max_games': 500,
+    'ttl': 900
+}
+
 # mapping for short name to ID
 TEAM_ID = {
     'NJD': 1, 'NYI': 2, 'NYR': 3, 'PHI': 4,
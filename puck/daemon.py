@@ -0,0 +1,441 @@
+"""
+Local fan-out daemon. `puck daemon` owns polling of the api and publishes
+game feeds over a unix domain socket, every puck client on the machine
+subscribes to it instead of polling itself. N clients cost one poll.
+
+The protocol is one JSON object per line.
+
+client -> daemon
+    {"id": 1, "op": "subscribe", "game_ids": [...]}
+    {"id": 2, "op": "schedule", "url_mods": {...}, "params": {...}}
+    {"id": 3, "op": "unsubscribe", "game_ids": [...]}
+
+daemon -> client
+    {"id": 1, "type": "snapshot", "feeds": {game_id: feed}}
+    {"id": 2, "type": "schedule", "game_ids": [...]}
+    {"id": 3, "type": "unsubscribed", "game_ids": [...]}
+    {"id": n, "type": "error", "msg": "..."}
+    {"type": "delta", "patches": {game_id: [op, ...]},
+     "changes": {game_id: [[field, old, new], ...]}}
+
+Deltas are only sent for games a client subscribed to. A feed is sent in
+full once, in the snapshot, deltas hold the registry's changes and a patch
+of the feed's changed fields only:
+
+    ["set", path, value]        the value at path
+    ["del", path]               the key at path was removed
+    ["ext", path, start, items] the list at path from index start on
+
+A path is the list of keys and indexes leading to the value. Games nobody
+subscribes to anymore, after an unsubscribe or a disconnect, are dropped
+and no longer polled.
+"""
+import asyncio
+import itertools
+import json
+import os
+import time
+from pathlib import Path
+
+import puck.constants as const
+from puck.games import GameRegistry, async_get_game_ids
+from puck.polling import PollScheduler, poll_forever
+from puck.request_queue import Priority
+from puck.utils import report_error
+
+# game feeds are far larger than asyncio's default line limit
+STREAM_LIMIT = 2 ** 24
+
+
+class DaemonError(ConnectionError):
+    pass
+
+
+class PuckDaemon(object):
+    """
+    Polls every game any client subscribed to and pushes the changes.
+
+    Attributes:
+        registry (GameRegistry): the only copy of each game, keeps feeds
+        scheduler (PollScheduler): decides when each game is polled
+        path (Path): socket path
+        clients (dict): StreamWriter -> set of subscribed game ids
+        feeds (dict): game_id -> feed as the clients hold it, the base of
+            the next patch
+        schedules (dict): query -> (monotonic time, game ids) cache
+    """
+
+    def __init__(self, db_conn, path=const.DAEMON_SOCKET):
+        self.registry = GameRegistry(db_conn, keep_feeds=True)
+        self.registry.subscribe(self.publish)
+        self.scheduler = PollScheduler(self.registry)
+        self.path = Path(path)
+        self.clients = {}
+        self.feeds = {}
+        self.schedules = {}
+        self._tasks = set()
+
+    async def serve(self):
+        """Listen on the socket and poll until cancelled."""
+        if await is_running(self.path):
+            raise DaemonError(f'A daemon is already listening on {self.path}')
+
+        if self.path.exists():
+            if not self.path.is_socket():
+                raise DaemonError(f'{self.path} exists and is not a socket')
+
+            # nothing answered the probe, left behind by a daemon that
+            # did not exit cleanly
+            self.path.unlink()
+
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+        # only the user running the daemon may connect, the socket is
+        # created 0600 rather than changed after it is already listening
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(
+                self._handle_client, path=str(self.path), limit=STREAM_LIMIT
+            )
+        finally:
+            os.umask(umask)
+
+        try:
+            async with server:
+                await poll_forever(self.scheduler)
+        finally:
+            # clients fall back to polling on their own
+            for writer in list(self.clients):
+                writer.close()
+
+            if self.path.exists():
+                self.path.unlink()
+
+    def publish(self, changes):
+        """Send the changes of each game to the clients subscribed to it.
+        Called by the registry after each update."""
+        patches = {}
+        for _id in changes:
+            feed = self.registry.feeds.get(_id)
+            if _id in self.feeds and feed is not None:
+                patches[_id] = feed_patch(self.feeds[_id], feed)
+                self.feeds[_id] = feed
+
+        for writer, subscribed in self.clients.items():
+            changed = [_id for _id in patches if _id in subscribed]
+            if not changed:
+                continue
+
+            _send(writer, {
+                'type': 'delta',
+                'patches': {_id: patches[_id] for _id in changed},
+                'changes': {
+                    _id: [list(change) for change in changes[_id]]
+                    for _id in changed
+                }
+            })
+
+    async def _handle_client(self, reader, writer):
+        self.clients[writer] = set()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                # answer concurrently, a slow request must not hold up others
+                task = asyncio.create_task(
+                    self._respond(writer, json.loads(line))
+                )
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            self._release(self.clients.pop(writer))
+            writer.close()
+
+    async def _respond(self, writer, msg):
+        try:
+            if msg['op'] == 'subscribe':
+                reply = await self._subscribe(writer, msg['game_ids'])
+            elif msg['op'] == 'schedule':
+                reply = await self._schedule(
+                    msg.get('url_mods'), msg.get('params')
+                )
+            elif msg['op'] == 'unsubscribe':
+                reply = self._unsubscribe(writer, msg['game_ids'])
+            else:
+                raise ValueError(f'Unknown op: {msg["op"]}')
+        except Exception as err:
+            reply = {'type': 'error', 'msg': str(err)}
+
+        reply['id'] = msg.get('id')
+
+        if writer in self.clients:
+            _send(writer, reply)
+
+    async def _subscribe(self, writer, game_ids) -> dict:
+        # registered games are served from the cache
+        await self.registry.fetch(game_ids, 'banner', Priority.INTERACTIVE)
+
+        for _id in game_ids:
+            if _id not in self.feeds:
+                self.feeds[_id] = self.registry.feeds[_id]
+
+        snapshot = {_id: self.feeds[_id] for _id in game_ids}
+
+        if writer in self.clients:
+            self.clients[writer].update(game_ids)
+        else:
+            # the client left while its games were requested
+            self._release(game_ids)
+
+        return {'type': 'snapshot', 'feeds': snapshot}
+
+    def _unsubscribe(self, writer, game_ids) -> dict:
+        if writer in self.clients:
+            self.clients[writer].difference_update(game_ids)
+            self._release(game_ids)
+
+        return {'type': 'unsubscribed', 'game_ids': game_ids}
+
+    def _release(self, game_ids):
+        # drop the games no client is subscribed to anymore
+        held = set().union(*self.clients.values())
+        dropped = [_id for _id in game_ids if _id not in held]
+
+        self.registry.discard(dropped)
+        self.scheduler.discard(dropped)
+        for _id in dropped:
+            self.feeds.pop(_id, None)
+
+    async def _schedule(self, url_mods, params) -> dict:
+        key = json.dumps([url_mods, params], sort_keys=True)
+        cached = self.schedules.get(key)
+
+        if cached is None or \
+                time.monotonic() - cached[0] > const.DAEMON_SCHEDULE_TTL:
+            _ids = await async_get_game_ids(url_mods, params)
+            cached = (time.monotonic(), _ids)
+            self.schedules[key] = cached
+
+        return {'type': 'schedule', 'game_ids': cached[1]}
+
+
+class DaemonClient(object):
+    """
+    Connection to a running daemon. Used as a GameRegistry source, the
+    registry's apply_feeds is subscribed to the pushed deltas.
+
+    Attributes:
+        closed (bool): the daemon went away
+        callbacks (list): called with a dict of game_id -> feed for every
+            delta received
+        feeds (dict): game_id -> feed of each subscribed game, kept up to
+            date by the patches pushed
+        on_error (function): called with the message of a callback that
+            failed, the connection stays open for the next delta
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.closed = False
+        self.callbacks = []
+        self.on_error = report_error
+        self.feeds = {}
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._reader_task = asyncio.get_event_loop().create_task(self._read())
+
+    @classmethod
+    async def connect(cls, path=const.DAEMON_SOCKET):
+        """Returns a connected client, None if no daemon is running."""
+        try:
+            reader, writer = await asyncio.open_unix_connection(
+                str(path), limit=STREAM_LIMIT
+            )
+        except OSError:
+            return None
+
+        return cls(reader, writer)
+
+    def subscribe(self, callback):
+        self.callbacks.append(callback)
+
+    async def game_feeds(self, game_ids) -> list:
+        """Feeds of game_ids, deltas of these games are pushed from now on."""
+        game_ids = list(game_ids)
+        resp = await self._request({'op': 'subscribe', 'game_ids': game_ids})
+        self.feeds.update(_int_keys(resp['feeds']))
+
+        return [self.feeds[_id] for _id in game_ids]
+
+    def unsubscribe(self, game_ids):
+        """Stop the deltas of game_ids. Called by the registry as it drops
+        them, the reply is not waited for."""
+        game_ids = [_id for _id in game_ids if _id in self.feeds]
+        if self.closed or not game_ids:
+            return
+
+        for _id in game_ids:
+            del self.feeds[_id]
+
+        _send(self.writer, {
+            'id': next(self._ids), 'op': 'unsubscribe', 'game_ids': game_ids
+        })
+
+    async def schedule_ids(self, url_mods=None, params=None) -> list:
+        resp = await self._request(
+            {'op': 'schedule', 'url_mods': url_mods, 'params': params}
+        )
+
+        return resp['game_ids']
+
+    async def close(self):
+        self.closed = True
+        self._reader_task.cancel()
+        self.writer.close()
+
+    async def _request(self, msg) -> dict:
+        if self.closed:
+            raise DaemonError('The daemon connection is closed.')
+
+        msg['id'] = next(self._ids)
+        future = asyncio.get_event_loop().create_future()
+        self._pending[msg['id']] = future
+
+        try:
+            _send(self.writer, msg)
+            await self.writer.drain()
+            resp = await future
+        finally:
+            self._pending.pop(msg['id'], None)
+
+        if resp['type'] == 'error':
+            raise DaemonError(resp['msg'])
+
+        return resp
+
+    async def _read(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+
+                msg = json.loads(line)
+
+                if msg['type'] == 'delta':
+                    feeds = {}
+                    for _id, patch in _int_keys(msg['patches']).items():
+                        if _id in self.feeds:
+                            self.feeds[_id] = apply_patch(
+                                self.feeds[_id], patch
+                            )
+                            feeds[_id] = self.feeds[_id]
+
+                    for callback in self.callbacks:
+                        try:
+                            callback(feeds)
+                        except Exception as err:
+                            self.on_error(f'Update failed: {err}')
+                else:
+                    future = self._pending.get(msg.get('id'))
+                    if future is not None and not future.done():
+                        future.set_result(msg)
+        finally:
+            self.closed = True
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(
+                        DaemonError('The daemon connection was lost.')
+                    )
+
+
+async def is_running(path=const.DAEMON_SOCKET) -> bool:
+    """Is a daemon accepting connections on path."""
+    client = await DaemonClient.connect(path)
+    if client is None:
+        return False
+
+    await client.close()
+    return True
+
+
+def feed_patch(old, new, path=None) -> list:
+    """
+    The operations turning feed old into feed new, see the module
+    docstring. Lists that only grew (i.e. the plays of a game) send the
+    new items only.
+
+    Args:
+        old (JSON): the feed as the client holds it
+        new (JSON): the latest feed
+        path (list, optional): location of old and new in the feed.
+            Defaults to the root.
+
+    Returns:
+        list: the operations, empty if nothing changed
+    """
+    path = path or []
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = [['del', path + [key]] for key in old if key not in new]
+        for key, val in new.items():
+            if key in old:
+                ops.extend(feed_patch(old[key], val, path + [key]))
+            else:
+                ops.append(['set', path + [key], val])
+
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list) and \
+            len(new) >= len(old):
+        ops = []
+        for i, (was, val) in enumerate(zip(old, new)):
+            ops.extend(feed_patch(was, val, path + [i]))
+
+        if len(new) > len(old):
+            ops.append(['ext', path, len(old), new[len(old):]])
+
+        return ops
+
+    if old != new:
+        return [['set', path, new]]
+
+    return []
+
+
+def apply_patch(feed, patch):
+    """Apply the operations of feed_patch to feed, in place where
+    possible. Returns the patched feed."""
+    for op, path, *args in patch:
+        if not path:
+            # only a value replacing the whole feed has an empty path
+            feed = args[0]
+            continue
+
+        *parents, last = path
+        target = feed
+        for key in parents:
+            target = target[key]
+
+        if op == 'set':
+            target[last] = args[0]
+        elif op == 'del':
+            del target[last]
+        elif op == 'ext':
+            target[last][args[0]:] = args[1]
+
+    return feed
+
+
+def _send(writer, msg):
+    # feeds hold nothing but JSON, changes may hold objects i.e. Period
+    writer.write(json.dumps(msg, default=str).encode() + b'\n')
+
+
+def _int_keys(feeds) -> dict:
+    # JSON object keys are always strings
+    return {int(_id): feed for _id, feed in feeds.items()}
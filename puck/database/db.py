@@ -5,14 +5,17 @@ from enum import Enum
 
 import aiohttp
 import psycopg2 as pg
+import psycopg2.errors as pgerrors
 import psycopg2.extras as pgext
 import psycopg2.sql as pgsql
 
 import puck.constants as const
 import puck.database.db_constants as db_const
 from puck.dispatcher import Dispatch
+from puck.pipeline import Pipeline, Stage
 from puck.urls import Url
-from puck.utils import ProgressBar, async_request, get_season_number
+from puck.request_queue import Priority
+from puck.utils import ProgressBar, async_request, recent_seasons
 
 
 def undefined_tables(cursor):
@@ -37,6 +40,13 @@ def create_base_tables(cursor, to_create):
         cursor.execute(db_const.BASE_TABLES[t])
 
 
+def create_game_tables(cursor):
+    """Game table creation script, existing tables are left alone."""
+
+    for t in db_const.GAME_TABLES.values():
+        cursor.execute(t)
+
+
 def create_base_triggers(cursor):
     """Base Trigger creation script."""
 
@@ -44,8 +54,25 @@ def create_base_triggers(cursor):
         cursor.execute(t)
 
 
-async def populate_initial_tables(db_conn):
-    """Async requests for Teams, Team rosters, and Players."""
+async def populate_initial_tables(db_conn, stages=const.INGEST_STAGES, seasons=None):  # noqa
+    """
+    Async requests for Teams, Team rosters, and Players.
+
+    Every request goes through a fetch -> parse -> write Pipeline. Writing a
+    row hands the requests that depend on it back to fetch: a team leads to
+    its seasons and roster, a roster to its players, a player to their
+    season stats.
+
+    Args:
+        db_conn (psycopg2.Connection): Database connection
+        stages (dict, optional): stage name -> workers and queue size.
+            Defaults to const.INGEST_STAGES.
+        seasons (list of int, optional): seasons of team and player stats.
+            Defaults to the last const.INGEST_SEASONS.
+    """
+    if seasons is None:
+        seasons = recent_seasons(const.INGEST_SEASONS)
+
     # NHL and AHL league ids/names
     for query in db_const.PRIMARY_DATA:
         cursor = db_conn.cursor()
@@ -54,123 +81,131 @@ async def populate_initial_tables(db_conn):
     cursor.close()
     db_conn.commit()
 
-    num_workers = 5
-
-    progress_bar = ProgressBar(end=1000)
-
-    team_id_q = asyncio.Queue()
-    team_r_q = asyncio.Queue()
-    player_id_q = asyncio.Queue(30)
+    # team info and each team season (counted twice) per team, each
+    # roster adds its players as it arrives
+    progress_bar = ProgressBar(
+        end=len(const.TEAM_ID) * (1 + 2 * len(seasons)), unit='records'
+    )
 
-    tasks = []
     async with aiohttp.ClientSession() as session:
-        # create workers
-        for i in range(num_workers):
-            tasks.append(
-                asyncio.create_task(
-                    generic_worker(
-                        team_id_q, session, db_conn, team_r_q, progress_bar
-                    )
-                )
-            )
-            tasks.append(
-                asyncio.create_task(
-                    generic_worker(
-                        player_id_q, session,
-                        db_conn, pb=progress_bar
-                    )
-                )
-            )
-            tasks.append(
-                asyncio.create_task(
-                    generic_worker(
-                        team_r_q, session, db_conn, player_id_q, progress_bar
-                    )
-                )
-            )
-
-        # process team ids
-        for _id in const.TEAM_ID.values():
-            team_id_q.put_nowait(Dispatch.team_info(_id))
-
-        for _id in const.TEAM_ID.values():
-            team_id_q.put_nowait(Dispatch.team_season(_id, 20172018))
-            team_id_q.put_nowait(Dispatch.team_season(_id, 20182019))
-            team_id_q.put_nowait(Dispatch.team_season(_id, 20192020))
-
-        # end of data indicators
-        for i in range(num_workers):
-            team_id_q.put_nowait(Dispatch.empty('TEAM'))
+        ingest = InitialIngest(
+            db_conn, session, progress_bar, stages, seasons
+        )
 
-        await asyncio.gather(*tasks, return_exceptions=False)
+        await ingest.pipeline.run(
+            Dispatch.team_info(_id) for _id in const.TEAM_ID.values()
+        )
 
     progress_bar.completed()
+    ingest.pipeline.print_stats()
 
 
-async def generic_worker(queue, session, db_conn, result_queue=None, pb=None):
+class InitialIngest(object):
     """
-    Generic Worker is a replacement of the old worker functions.
-    It handles its queues and result_queues based on the dispatcher.
-
-    All queues pass a Dispatch object with the required info.
+    The stages of populate_initial_tables. Items are Dispatch objects into
+    fetch, (Dispatch, JSON) into parse and (Dispatch, parsed data) into
+    write.
+
+    Attributes:
+        pipeline (Pipeline): fetch -> parse -> write
+        known (KnownIds): leagues and teams stored
+        seasons (list of int): seasons of team and player stats
     """
-    while True:
-        dispatcher = await queue.get()
-
-        # handle end of data propogation
-        if dispatcher.name in ['TEAM', 'ROSTER', 'PLAYER']:
-            # if there is a result queue means must propogate
-            if result_queue is not None:
-                # pass the correct EOD marker TEAM -> ROSTER -> PLAYER
-                if dispatcher.name == 'TEAM':
-                    await result_queue.put(Dispatch.empty('ROSTER'))
-                else:
-                    await result_queue.put(Dispatch.empty('PLAYER'))
-            break
 
+    def __init__(self, db_conn, session, progress_bar, stages=const.INGEST_STAGES, seasons=None):  # noqa
+        self.db_conn = db_conn
+        self.session = session
+        self.pb = progress_bar
+        self.known = KnownIds(db_conn)
+        self.seasons = seasons or recent_seasons(const.INGEST_SEASONS)
+
+        self.pipeline = Pipeline([
+            Stage(
+                name, handler, stages[name]['workers'], stages[name]['queue']
+            ) for name, handler in (
+                ('fetch', self.fetch), ('parse', self.parse),
+                ('write', self.write)
+            )
+        ])
+
+    async def fetch(self, dispatcher):
         data = await async_request(
-            dispatcher.url, session, {dispatcher.id_type: dispatcher.id},
-            dispatcher.params
+            dispatcher.url, self.session,
+            {dispatcher.id_type: dispatcher.id}, dispatcher.params,
+            priority=Priority.BULK
         )
 
-        # Handle the dispatcher type based on name
+        return [(dispatcher, data)]
+
+    async def parse(self, item):
+        dispatcher, data = item
+
         if dispatcher.name == 'team_season_stats':
-            # dedicated function to handle complexity
-            handle_team_season(db_conn, data, dispatcher)
-            pb.increment(2)
+            if not data['teams'][0]['teamStats'][0]['splits']:
+                # the team did not play that season
+                self.pb.increment(2)
+                return []
+
+            # the parser will have the ids embedded
+            parsed_data = dispatcher.parser(
+                data, True, dispatcher.params['season']
+            )
         elif dispatcher.name == 'roster':
+            # the team is written, its players can follow
             parsed_data = dispatcher.parser(data)
-            # put each player in the PLAYER queue
+            self.pb.add_total(len(parsed_data))
+
             for person in parsed_data:
-                await result_queue.put(
-                    Dispatch.player_info(person)
-                )
-        elif dispatcher.name == 'team_info':
+                self.pipeline.submit(Dispatch.player_info(person))
+
+            return []
+        elif dispatcher.name in ('skater_season_stats', 'goalie_season_stats'):  # noqa
+            parsed_data = player_season_data(dispatcher, data, self.seasons)
+        else:
             parsed_data = dispatcher.parser(data)
+
+        return [(dispatcher, parsed_data)]
+
+    async def write(self, item):
+        dispatcher, parsed_data = item
+
+        if dispatcher.name == 'team_season_stats':
+            # dedicated function to handle complexity
+            handle_team_season(self.db_conn, parsed_data, dispatcher)
+            self.pb.increment(2)
+        elif dispatcher.name == 'team_info':
             # insert team_info into the database
-            insert_stmt(db_conn, dispatcher.table, parsed_data)
-            # propogate the id to ROSTER queue
-            await result_queue.put(
-                Dispatch.roster(parsed_data['team_id'])
-            )
-            pb.increment()
+            insert_stmt(self.db_conn, dispatcher.table, parsed_data)
+            self.known.add('team', parsed_data['team_id'])
+
+            # requests that need the team row
+            team_id = parsed_data['team_id']
+            for season in self.seasons:
+                self.pipeline.submit(Dispatch.team_season(team_id, season))
+            self.pipeline.submit(Dispatch.roster(team_id))
+            self.pb.increment()
         elif dispatcher.name == 'player_info':
-            parsed_data = dispatcher.parser(data)
             # insert a players info
-            insert_stmt(db_conn, dispatcher.table, parsed_data)
+            insert_stmt(self.db_conn, dispatcher.table, parsed_data)
+
+            if parsed_data['position'] == 'G':
+                self.pipeline.submit(Dispatch.goalie_stats(dispatcher.id))
+            else:
+                self.pipeline.submit(Dispatch.skater_stats(dispatcher.id))
+            self.pb.increment()
+        else:
             # complex logic for handling player season data
-            await handle_player_season(db_conn, dispatcher, parsed_data['position'], session)  # noqa
-            pb.increment()
+            handle_player_season(
+                self.db_conn, dispatcher, parsed_data, known=self.known
+            )
+
+        return []
 
 
-def handle_team_season(db_conn, data, dispatcher):
+def handle_team_season(db_conn, parsed_data, dispatcher):
     """This is a complex case for populating initial tables."""
     # we need the season number nested in the dispatcher params
     season = dispatcher.params['season']
-    # the parser will have the ids embedded
-    parsed_data = dispatcher.parser(
-        data, True, season
-    )
 
     # pop that data out so we can insert into teams_season
     ts_data = parsed_data.pop('team_season')
@@ -190,98 +225,132 @@ def handle_team_season(db_conn, data, dispatcher):
     insert_stmt(db_conn, 'team_season_stats', parsed_data)
 
 
-async def handle_player_season(db_conn, dispatcher, pos, session):
-    """Complex Handling of dealing with player stats"""
-
-    # insert to the proper table
-    if pos == 'G':
-        new_disp = Dispatch.goalie_stats(dispatcher.id)
-    else:
-        new_disp = Dispatch.skater_stats(dispatcher.id)
-
-    data = await async_request(
-        new_disp.url, session, {new_disp.id_type: new_disp.id}
-    )
+def player_season_data(dispatcher, data, seasons) -> list:
+    """Parsed splits of seasons from a player's Url.PLAYER_STATS_ALL JSON,
+    in a single pass over them."""
+    seasons = set(seasons)
 
-    data = data['stats'][0]['splits']
-
-    # past three years
-    season_nums = [
-        get_season_number(),
-        get_season_number() - 10001,
-        get_season_number() - 20002
+    return [
+        dispatcher.parser(split) for split in data['stats'][0]['splits']
+        if int(split['season']) in seasons
     ]
 
-    # loop through the list backwards
-    for year in range(len(data) - 1, -1, -1):
-        # only get the past two years
-        if int(data[year]['season']) not in season_nums:
-            break
-        # parse the data from year
-        parsed_data = new_disp.parser(data[year])
-
-        # check if league is in the database
-        resp = select_stmt(
-            db_conn, 'league',
-            where=('league_id', parsed_data['league_data']['league_id'])
-        )
 
-        # if its not insert it using metadata
-        if not resp:
-            insert_stmt(db_conn, 'league', parsed_data.pop('league_data'))
-        else:
-            # remove this key
-            del parsed_data['league_data']
-
-        # check if team is in the database
-        resp = select_stmt(
-            db_conn, 'team',
-            where=('team_id', parsed_data['team_data']['team_id'])
-        )
+class KnownIds(object):
+    """
+    Ids stored in the league and team tables for the length of an
+    ingestion. Seeded with one query per table so the metadata of each
+    season row is checked against a set, ids are added as they are
+    inserted.
 
-        # if not insert using metadata
-        if not resp:
-            insert_stmt(db_conn, 'team', parsed_data.pop('team_data'))
-        else:
-            del parsed_data['team_data']
+    Attributes:
+        ids (dict): table -> set of ids
+    """
+    # table -> id column
+    TABLES = {'league': 'league_id', 'team': 'team_id'}
+
+    def __init__(self, db_conn):
+        self.db_conn = db_conn
+        self.ids = {
+            table: {
+                row[0] for row in
+                select_stmt(db_conn, table, columns=[column]) or []
+            } for table, column in self.TABLES.items()
+        }
+
+    def add(self, table, _id):
+        """Record an id inserted elsewhere."""
+        self.ids[table].add(_id)
+
+    def insert_missing(self, table, row):
+        """Insert row into table unless its id is already stored."""
+        _id = row[self.TABLES[table]]
+
+        if _id not in self.ids[table]:
+            insert_stmt(self.db_conn, table, row)
+            self.ids[table].add(_id)
+
+
+def handle_player_season(db_conn, dispatcher, seasons, refresh=False, known=None):  # noqa
+    """Complex Handling of dealing with player stats
+
+    Every season is inserted in bulk, one statement for player_season and
+    one for the stats table however many seasons there are. With refresh,
+    seasons that are already stored have their stats updated instead of
+    being inserted a second time. known (KnownIds) should be shared by
+    every call of an ingestion, one is seeded when it is None."""
+    if known is None:
+        known = KnownIds(db_conn)
+
+    # (player_season row, stats row) of each season to insert
+    to_insert = []
+
+    for parsed_data in seasons:
+        # insert the league and team using metadata if they are not stored
+        known.insert_missing('league', parsed_data.pop('league_data'))
+        known.insert_missing('team', parsed_data.pop('team_data'))
 
         # pop the season metadata for insertion into db
         season_data = parsed_data.pop('season_data')
         season_data['player_id'] = dispatcher.id
-        season = season_data['season']
-
-        insert_stmt(db_conn, 'player_season', season_data)
-
-        # get the unique id of column just inserted
-        resp = select_stmt(
-            db_conn, 'player_season', columns=['unique_id'],
-            where=[
-                (new_disp.id_type, new_disp.id), ('season', season),
-                ('league_id', season_data['league_id']),
-                ('team_id', season_data['team_id'])
-            ]
+
+        if refresh:
+            resp = select_stmt(
+                db_conn, 'player_season', columns=['unique_id'],
+                where=[
+                    (dispatcher.id_type, dispatcher.id),
+                    ('season', season_data['season']),
+                    ('league_id', season_data['league_id']),
+                    ('team_id', season_data['team_id'])
+                ]
+            )
+
+            if resp:
+                update_stmt(
+                    db_conn, dispatcher.table, parsed_data,
+                    where=('unique_id', resp[0]['unique_id'])
+                )
+                continue
+
+        to_insert.append((season_data, parsed_data))
+
+    if not to_insert:
+        return
+
+    try:
+        # the unique ids come back in the order of the rows
+        uids = insert_many_stmt(
+            db_conn, 'player_season', [row for row, _ in to_insert],
+            on_conflict=None, returning='unique_id'
         )
 
-        uid = resp[0]['unique_id']
-        parsed_data['unique_id'] = uid
+        for uid, (_, parsed_data) in zip(uids, to_insert):
+            parsed_data['unique_id'] = uid
 
-        insert_stmt(db_conn, new_disp.table, parsed_data)
+        insert_many_stmt(
+            db_conn, dispatcher.table, [row for _, row in to_insert],
+            on_conflict=None
+        )
+        db_conn.commit()
+    except pg.Error as err:
+        db_conn.rollback()
+        print(err)
 
 
-async def batch_update_db(_ids, db_conn, dispatcher):
+async def batch_update_db(_ids, db_conn, dispatcher, priority=Priority.PREFETCH):  # noqa
     async with aiohttp.ClientSession() as session:
         workers = []
         for _id in _ids:
             workers.append(
                 update_db(
-                    db_conn, session, dispatcher(_id)
+                    db_conn, session, dispatcher(_id), priority=priority
                 )
             )
 
         await asyncio.gather(*workers)
 
 
-async def update_db(db_conn, session, dispatcher, params=None):
+async def update_db(db_conn, session, dispatcher, params=None, priority=Priority.PREFETCH):  # noqa
     """Async update function.
 
     Args:
@@ -289,10 +358,13 @@ async def update_db(db_conn, session, dispatcher, params=None):
         session (aiohttp.ClientSession): aiohttp ClientSession
         dispatcher (Dispatch): Dispatch object holding all relevant details
         params (dict, optional): Url parameters. Defaults to None.
+        priority (Priority, optional): request class.
+            Defaults to Priority.PREFETCH.
     """
 
     data = await async_request(
-        dispatcher.url, session, {dispatcher.id_type: dispatcher.id}, params
+        dispatcher.url, session, {dispatcher.id_type: dispatcher.id}, params,
+        priority=priority
     )
     parsed_data = dispatcher.parser(data)
 
@@ -384,6 +456,53 @@ def select_stmt(db_conn, table, columns=None, joins=None, where=None, order_by=N
         print(err)
 
 
+def select_any_stmt(db_conn, table, column, values, columns=None) -> list:
+    """SQL Select statement matching a column against a list of values.
+    Uses "WHERE column = ANY(values)" so a single query can replace a
+    select_stmt per value.
+
+    Args:
+        table (str): The table name
+        column (str): The column to match against
+        values (iterable): Values to match, passed as an array parameter
+
+    Kwargs:
+        columns (list of str or TableColumns, optional): A list of column
+                                                         names to return
+
+    Returns:
+        list: rows matching any of the values
+    """
+    base_str = pgsql.SQL("SELECT {} FROM {} WHERE {} = ANY({})")
+
+    if columns:
+        # if using TableColumns Enum
+        if isinstance(columns, db_const.TableColumns):
+            columns = columns.value
+
+        columns = pgsql.SQL(', ').join(map(pgsql.Identifier, columns))
+    else:
+        columns = pgsql.SQL('*')
+
+    base_str = base_str.format(
+        columns, pgsql.Identifier(table),
+        pgsql.Identifier(column), pgsql.Placeholder()
+    )
+
+    # psycopg2 adapts a list to a postgres ARRAY
+    values = list(values)
+
+    try:
+        cursor = db_conn.cursor()
+        cursor.execute(base_str, (values,))
+
+        return cursor.fetchall()
+    except pg.Error as err:
+        print(cursor.mogrify(base_str, (values,)))
+        print(base_str, values)
+        print(err)
+
+
 def update_stmt(db_conn, table, params, where=None):
     """SQL Update statement creator and execution.
 
@@ -398,6 +517,10 @@ def update_stmt(db_conn, table, params, where=None):
     data = []
     stmts = []
 
+    # set here rather than by a trigger firing for every row
+    if table in db_const.TIMESTAMPED_TABLES and 'last_updated' not in params:
+        stmts.append(pgsql.SQL("last_updated = LOCALTIMESTAMP"))
+
     table = pgsql.Identifier(table)
 
     for key, val in params.items():
@@ -479,6 +602,47 @@ def insert_stmt(db_conn, table, params):
         print(err)
 
 
+def insert_many_stmt(db_conn, table, rows, on_conflict='DO NOTHING', returning=None):  # noqa
+    """SQL Insert of many rows in a single statement. Does not commit, so
+    inserts into several tables can share one transaction.
+
+    Args:
+        db_conn (psycopg2.Connection): Connection object
+        table (str): The table name
+        rows (list of dict): rows to insert, every row has the same keys
+        on_conflict (str, optional): ON CONFLICT action, None to fail on
+            conflicts. Defaults to 'DO NOTHING'.
+        returning (str, optional): column to return of each inserted row.
+            Defaults to None.
+
+    Returns:
+        list or None: the returning column of the inserted rows in the
+            order of rows, None without returning
+    """
+    if not rows:
+        return [] if returning else None
+
+    cols = list(rows[0].keys())
+
+    base_str = pgsql.SQL("INSERT INTO {}({}) VALUES %s {} {}").format(
+        pgsql.Identifier(table),
+        pgsql.SQL(", ").join(map(pgsql.Identifier, cols)),
+        pgsql.SQL("ON CONFLICT " + on_conflict if on_conflict else ''),
+        pgsql.SQL("RETURNING {}").format(pgsql.Identifier(returning))
+        if returning else pgsql.SQL('')
+    )
+
+    cursor = db_conn.cursor()
+    result = pgext.execute_values(
+        cursor, base_str.as_string(db_conn),
+        [tuple(row[col] for col in cols) for row in rows],
+        fetch=bool(returning)
+    )
+
+    if returning:
+        return [row[0] for row in result]
+
+
 def execute_constant(db_conn, query) -> list:
     cursor = db_conn.cursor()
     cursor.execute(query)
@@ -486,7 +650,14 @@ def execute_constant(db_conn, query) -> list:
     return cursor.fetchall()
 
 
-def connect_db() -> pg.extensions.connection:
+def connect_db(seasons=None) -> pg.extensions.connection:
+    """Connect and bring the schema up to date, creating and populating the
+    tables on first install.
+
+    Args:
+        seasons (list of int, optional): seasons populate_initial_tables
+            downloads if it runs. Defaults to its default.
+    """
     # these keys exist at this poioint
     db_name = os.environ['dbName']
     db_user = os.environ['dbUser']
@@ -495,10 +666,22 @@ def connect_db() -> pg.extensions.connection:
         database=db_name, user=db_user, cursor_factory=pgext.DictCursor
     )
 
+    # a single query on every start once the database is current
+    version = schema_version(db_conn)
+
+    if version == db_const.SCHEMA_VERSION:
+        return db_conn
+
+    if version is not None and version > db_const.SCHEMA_VERSION:
+        sys.exit(
+            f'The database is at schema version {version}, this version of '
+            f'puck only knows {db_const.SCHEMA_VERSION}. Upgrade puck.'
+        )
+
     # use with so we close the cursor after scope is left
     cursor = db_conn.cursor()
 
-    undef_tables = undefined_tables(cursor)
+    undef_tables = undefined_tables(cursor) if version is None else []
 
     if undef_tables:
 
@@ -506,16 +689,73 @@ def connect_db() -> pg.extensions.connection:
 
         create_base_tables(cursor, undef_tables)
         create_base_triggers(cursor)
+        create_game_tables(cursor)
         db_conn.commit()
 
-        asyncio.run(populate_initial_tables(db_conn))
+        # the tables are migrated before they are filled
+        migrate(db_conn, version)
+
+        asyncio.run(populate_initial_tables(db_conn, seasons=seasons))
         db_conn.commit()
+    else:
+        create_game_tables(cursor)
+        db_conn.commit()
+
+        migrate(db_conn, version)
 
     cursor.close()
 
     return db_conn
 
 
+def schema_version(db_conn):
+    """
+    The number of migrations the database has run.
+
+    Returns:
+        int or None: None if it predates the schema_version table or has
+            never been set up
+    """
+    cursor = db_conn.cursor()
+
+    try:
+        cursor.execute(db_const.GET_SCHEMA_VERSION)
+        return cursor.fetchone()[0]
+    except pgerrors.UndefinedTable:
+        return None
+    finally:
+        cursor.close()
+        db_conn.rollback()
+
+
+def migrate(db_conn, version):
+    """
+    Apply the migrations after version in order. Each one commits with
+    the row recording it, an interrupted upgrade resumes where it stopped.
+
+    Args:
+        db_conn (psycopg2.Connection): Database connection
+        version (int or None): current version, see schema_version
+    """
+    cursor = db_conn.cursor()
+    cursor.execute(db_const.SCHEMA_VERSION_TABLE)
+    db_conn.commit()
+
+    start = version or 0
+    migrations = db_const.MIGRATIONS[start:]
+
+    for number, migration in enumerate(migrations, start + 1):
+        try:
+            cursor.execute(migration)
+            cursor.execute(db_const.SET_SCHEMA_VERSION, (number,))
+            db_conn.commit()
+        except pg.Error as err:
+            db_conn.rollback()
+            sys.exit(f'Migration to schema version {number} failed: {err}')
+
+    cursor.close()
+
+
 def simple_conn() -> pg.extensions.connection:
     """Simple database connection with no integrity checks."""
     db_name = os.environ['dbName']
@@ -533,6 +773,7 @@ def _confirm():
         init_tables = input(
             """Puck needs to download large amounts of player and team data
 You can download an SQL dump file from: https://github.com/drsooch/puck.
+A snapshot loads in seconds instead: puck snapshot import FILE
 However if you'd like up-to-date information you can download data directly.
 Would you like to download the data (Note: it may take several minutes)
 y/n
@@ -542,7 +783,7 @@ y/n
         if init_tables.lower() != 'y':
             sys.exit(
                 'If you plan on using the SQL dump file use the command: \
-psql #DBNAME < puck_dump.sql'
+psql #DBNAME < puck_dump.sql, for a snapshot: puck snapshot import FILE'
             )
         else:
             return
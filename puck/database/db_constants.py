@@ -29,6 +29,29 @@ class TableColumns(Enum):
         "shooting_pct"
     ]
 
+    # keys of parser.teams_skater_stats with full_team
+    GAME_TEAM_STATS = [
+        "goals", "pims", "shots", "pp_pct", "pp_goals", "pp_att",
+        "faceoff_pct", "blocked", "takeaways", "giveaways", "hits"
+    ]
+
+    # keys of parser.skater_stats_game
+    SKATER_GAME_STATS = [
+        "time_on_ice", "assists", "goals", "pims", "shots", "hits",
+        "pp_goals", "sh_goals", "ev_goals", "pp_assists", "sh_assists",
+        "ev_assists", "faceoff_pct", "faceoff_wins", "faceoff_taken",
+        "takeaways", "giveaways", "blocked", "plus_minus", "ev_toi", "pp_toi",
+        "sh_toi"
+    ]
+
+    # keys of parser.goalie_stats_game
+    GOALIE_GAME_STATS = [
+        "time_on_ice", "assists", "goals", "pims", "shots_against", "saves",
+        "pp_saves", "sh_saves", "ev_saves", "sh_shots", "ev_shots",
+        "pp_shots", "decision", "save_pct", "pp_save_pct", "sh_save_pct",
+        "ev_save_pct"
+    ]
+
 
 LEAGUE_TABLE = """
 CREATE TABLE IF NOT EXISTS league (
@@ -53,7 +76,7 @@ CREATE TABLE IF NOT EXISTS team (
 PLAYER_TABLE = """
 CREATE TABLE IF NOT EXISTS player (
     player_id     INTEGER NOT NULL PRIMARY KEY,
-    team_id       INTEGER NOT NULL REFERENCES team,
+    team_id       INTEGER REFERENCES team,
     first_name    VARCHAR(30) NOT NULL,
     last_name     VARCHAR(50) NOT NULL,
     number        VARCHAR(2),
@@ -88,6 +111,8 @@ CREATE TABLE IF NOT EXISTS player_season (
 );
 """
 
+# the even strength and assist splits are derived from the points and goals
+# the api sends, as generated columns they cost nothing extra on bulk writes
 SKATER_SEASON_STATS_TABLE = """
 CREATE TABLE IF NOT EXISTS skater_season_stats (
     unique_id     INTEGER NOT NULL PRIMARY KEY REFERENCES player_season,
@@ -100,16 +125,22 @@ CREATE TABLE IF NOT EXISTS skater_season_stats (
     games         SMALLINT,
     hits          SMALLINT,
     pp_goals      SMALLINT,
-    pp_assists    SMALLINT,
+    pp_assists    SMALLINT GENERATED ALWAYS AS (pp_points - pp_goals) STORED,
     pp_points     SMALLINT,
     pp_toi        VARCHAR(15),
     sh_goals      SMALLINT,
-    sh_assists    SMALLINT,
+    sh_assists    SMALLINT GENERATED ALWAYS AS (sh_points - sh_goals) STORED,
     sh_points     SMALLINT,
     sh_toi        VARCHAR(15),
-    ev_goals      SMALLINT,
-    ev_assists    SMALLINT,
-    ev_points     SMALLINT,
+    ev_goals      SMALLINT GENERATED ALWAYS AS (
+        goals - pp_goals - sh_goals
+    ) STORED,
+    ev_assists    SMALLINT GENERATED ALWAYS AS (
+        (points - pp_points - sh_points) - (goals - pp_goals - sh_goals)
+    ) STORED,
+    ev_points     SMALLINT GENERATED ALWAYS AS (
+        points - pp_points - sh_points
+    ) STORED,
     ev_toi        VARCHAR(15),
     faceoff_pct   REAL,
     shooting_pct  REAL,
@@ -203,6 +234,99 @@ CREATE TABLE IF NOT EXISTS team_season_stats (
 );
 """
 
+# a game's result, written once the game is final (see puck.boxscore)
+GAME_TABLE = """
+CREATE TABLE IF NOT EXISTS game (
+    game_id       INTEGER NOT NULL PRIMARY KEY,
+    season        INTEGER NOT NULL,
+    game_date     TIMESTAMPTZ NOT NULL,
+    game_status   SMALLINT NOT NULL,
+    period        VARCHAR(5),
+    time          VARCHAR(10),
+    home_team_id  INTEGER NOT NULL,
+    away_team_id  INTEGER NOT NULL,
+    periods       JSONB NOT NULL,
+    has_shootout  BOOLEAN NOT NULL,
+    last_updated  TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS game_season_idx ON game (season);
+"""
+
+GAME_TEAM_STATS_TABLE = """
+CREATE TABLE IF NOT EXISTS game_team_stats (
+    game_id       INTEGER NOT NULL REFERENCES game ON DELETE CASCADE,
+    team_type     VARCHAR(4) NOT NULL CHECK (
+        team_type IN ('home', 'away')
+        ),
+    team_id       INTEGER NOT NULL,
+    goals         SMALLINT,
+    pims          SMALLINT,
+    shots         SMALLINT,
+    pp_pct        VARCHAR(6),
+    pp_goals      SMALLINT,
+    pp_att        SMALLINT,
+    faceoff_pct   VARCHAR(6),
+    blocked       SMALLINT,
+    takeaways     SMALLINT,
+    giveaways     SMALLINT,
+    hits          SMALLINT,
+    so_goals      SMALLINT,
+    so_attempts   SMALLINT,
+    player_ids    INTEGER[] NOT NULL,
+    PRIMARY KEY (game_id, team_type)
+);
+"""
+
+GAME_PLAYER_STATS_TABLE = """
+CREATE TABLE IF NOT EXISTS game_player_stats (
+    game_id       INTEGER NOT NULL REFERENCES game ON DELETE CASCADE,
+    player_id     INTEGER NOT NULL,
+    team_type     VARCHAR(4) NOT NULL,
+    position      VARCHAR(3),
+    played        BOOLEAN NOT NULL,
+    time_on_ice   VARCHAR(8),
+    assists       SMALLINT,
+    goals         SMALLINT,
+    pims          SMALLINT,
+    shots         SMALLINT,
+    hits          SMALLINT,
+    pp_goals      SMALLINT,
+    sh_goals      SMALLINT,
+    ev_goals      SMALLINT,
+    pp_assists    SMALLINT,
+    sh_assists    SMALLINT,
+    ev_assists    SMALLINT,
+    faceoff_pct   REAL,
+    faceoff_wins  SMALLINT,
+    faceoff_taken SMALLINT,
+    takeaways     SMALLINT,
+    giveaways     SMALLINT,
+    blocked       SMALLINT,
+    plus_minus    SMALLINT,
+    ev_toi        VARCHAR(8),
+    pp_toi        VARCHAR(8),
+    sh_toi        VARCHAR(8),
+    shots_against SMALLINT,
+    saves         SMALLINT,
+    pp_saves      SMALLINT,
+    sh_saves      SMALLINT,
+    ev_saves      SMALLINT,
+    sh_shots      SMALLINT,
+    ev_shots      SMALLINT,
+    pp_shots      SMALLINT,
+    decision      VARCHAR(1),
+    save_pct      REAL,
+    pp_save_pct   REAL,
+    sh_save_pct   REAL,
+    ev_save_pct   REAL,
+    PRIMARY KEY (game_id, player_id)
+);
+
+CREATE INDEX IF NOT EXISTS game_player_stats_player_idx
+    ON game_player_stats (player_id);
+"""
+
 TEAM_RANKED_SELECT = """SELECT
     games_played,
     streak,
@@ -276,99 +400,121 @@ INNER JOIN player_season
 ORDER BY player_id ASC;
 """
 
-UT_PLAYER_FUNC_TRIG = """
-CREATE OR REPLACE FUNCTION update_time_player() RETURNS trigger AS
-    $$
-    BEGIN
-        NEW.last_updated = CURRENT_TIMESTAMP;
-        RETURN NEW;
-    END;
-    $$ LANGUAGE PLPGSQL;
-
-CREATE TRIGGER player_last_update
-AFTER UPDATE ON player
-EXECUTE PROCEDURE update_time_player();
-"""
+BASE_TABLES = {
+    'league': LEAGUE_TABLE, 'team': TEAM_TABLE, 'player': PLAYER_TABLE,
+    'player_season': PLAYER_SEASON_TABLE,
+    'skater_season_stats': SKATER_SEASON_STATS_TABLE,
+    'goalie_season_stats': GOALIE_SEASON_STATS_TABLE,
+    'team_season': TEAM_SEASON_TABLE,
+    'team_season_stats': TEAM_SEASON_STATS_TABLE,
+}
+
+# created whenever missing, they fill up as games are seen final so unlike
+# BASE_TABLES they never need the initial download
+GAME_TABLES = {
+    'game': GAME_TABLE,
+    'game_team_stats': GAME_TEAM_STATS_TABLE,
+    'game_player_stats': GAME_PLAYER_STATS_TABLE,
+}
+
+# points are generated columns (see SKATER_SEASON_STATS_TABLE) and
+# last_updated is set by update_stmt, nothing needs a trigger for now
+BASE_TRIGGERS = []
 
-UT_TS_FUNC_TRIG = """
-CREATE FUNCTION update_time_team_stats() RETURNS trigger AS
-    $$
-    BEGIN
-        NEW.last_updated = CURRENT_TIMESTAMP;
-        RETURN NEW;
-    END;
-    $$ LANGUAGE PLPGSQL;
-
-CREATE TRIGGER ts_stat_last_update
-AFTER UPDATE ON team_season_stats
-EXECUTE PROCEDURE update_time_team_stats();
+# tables whose last_updated update_stmt sets with every update
+TIMESTAMPED_TABLES = {
+    'player', 'skater_season_stats', 'goalie_season_stats',
+    'team_season_stats'
+}
+
+
+SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version       INTEGER NOT NULL PRIMARY KEY,
+    applied       TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
 """
 
-UT_GS_FUNC_TRIG = """
-CREATE FUNCTION update_time_goalie_stats() RETURNS trigger AS
-    $$
-    BEGIN
-        NEW.last_updated = CURRENT_TIMESTAMP;
-        RETURN NEW;
-    END;
-    $$ LANGUAGE PLPGSQL;
-
-CREATE TRIGGER g_stat_last_update
-AFTER UPDATE ON goalie_season_stats
-EXECUTE PROCEDURE update_time_goalie_stats();
+GET_SCHEMA_VERSION = """
+SELECT MAX(version) FROM schema_version;
 """
 
-UT_SS_FUNC_TRIG = """
-CREATE FUNCTION update_time_skater_stats() RETURNS trigger AS
-    $$
-    BEGIN
-        NEW.last_updated = CURRENT_TIMESTAMP;
-        RETURN NEW;
-    END;
-    $$ LANGUAGE PLPGSQL;
-
-CREATE TRIGGER s_stats_last_update
-AFTER UPDATE ON skater_season_stats
-EXECUTE PROCEDURE update_time_skater_stats();
+SET_SCHEMA_VERSION = """
+INSERT INTO schema_version (version) VALUES (%s);
 """
 
+# old databases computed these with triggers that never fired, the columns
+# are replaced by the generated ones of SKATER_SEASON_STATS_TABLE
+MIGRATE_GENERATED_POINTS = """
+DROP FUNCTION IF EXISTS compute_points, update_time_player,
+    update_time_skater_stats, update_time_goalie_stats,
+    update_time_team_stats CASCADE;
+
+ALTER TABLE skater_season_stats
+    DROP COLUMN IF EXISTS pp_assists, DROP COLUMN IF EXISTS sh_assists,
+    DROP COLUMN IF EXISTS ev_goals, DROP COLUMN IF EXISTS ev_assists,
+    DROP COLUMN IF EXISTS ev_points;
+
+ALTER TABLE skater_season_stats
+    ADD COLUMN pp_assists SMALLINT GENERATED ALWAYS AS (
+        pp_points - pp_goals
+    ) STORED,
+    ADD COLUMN sh_assists SMALLINT GENERATED ALWAYS AS (
+        sh_points - sh_goals
+    ) STORED,
+    ADD COLUMN ev_goals SMALLINT GENERATED ALWAYS AS (
+        goals - pp_goals - sh_goals
+    ) STORED,
+    ADD COLUMN ev_assists SMALLINT GENERATED ALWAYS AS (
+        (points - pp_points - sh_points) - (goals - pp_goals - sh_goals)
+    ) STORED,
+    ADD COLUMN ev_points SMALLINT GENERATED ALWAYS AS (
+        points - pp_points - sh_points
+    ) STORED;
+"""
 
-CP_PTS_FUNC_TRIG = """
-CREATE FUNCTION compute_points() RETURNS trigger AS
-    $$
-    BEGIN
-        NEW.ev_points  = (NEW.points - NEW.pp_points - NEW.sh_points);
-        NEW.ev_goals   = (NEW.goals - NEW.pp_goals - NEW.sh_goals);
-        NEW.pp_assists = (NEW.pp_points - NEW.pp_goals);
-        NEW.ev_assists = (NEW.ev_points - NEW.ev_goals);
-        NEW.sh_assists = (NEW.sh_points - NEW.sh_goals);
-        RETURN NEW;
-    END;
-    $$ LANGUAGE PLPGSQL;
-
-CREATE TRIGGER comp_points_ins
-AFTER INSERT ON skater_season_stats
-EXECUTE PROCEDURE compute_points();
-
-CREATE TRIGGER comp_points_upd
-AFTER UPDATE ON skater_season_stats
-EXECUTE PROCEDURE compute_points();
+# the season lookups of handle_player_season and FRESH_SEASON_STATS
+MIGRATE_PLAYER_SEASON_INDEX = """
+CREATE INDEX IF NOT EXISTS player_season_player_id_season
+    ON player_season (player_id, season);
 """
 
-BASE_TABLES = {
-    'league': LEAGUE_TABLE, 'team': TEAM_TABLE, 'player': PLAYER_TABLE,
-    'player_season': PLAYER_SEASON_TABLE,
-    'skater_season_stats': SKATER_SEASON_STATS_TABLE,
-    'goalie_season_stats': GOALIE_SEASON_STATS_TABLE,
-    'team_season': TEAM_SEASON_TABLE,
-    'team_season_stats': TEAM_SEASON_STATS_TABLE,
-}
+# NULL while a player is on no stored team's roster (see puck.sync)
+MIGRATE_PLAYER_TEAM_NULLABLE = """
+ALTER TABLE player ALTER COLUMN team_id DROP NOT NULL;
+"""
 
-BASE_TRIGGERS = [
-    UT_GS_FUNC_TRIG, UT_PLAYER_FUNC_TRIG, UT_SS_FUNC_TRIG,
-    UT_TS_FUNC_TRIG, CP_PTS_FUNC_TRIG
+# Applied in order by connect_db, a database's version is the number of
+# these it has run. BASE_TABLES and GAME_TABLES create the latest layout,
+# these alter the tables of older databases to match in place (i.e.
+# MIGRATE_GENERATED_POINTS replaces columns) so nothing needs downloading
+# again. New databases run every one as well, so each has to leave tables
+# already in the latest layout as they are. Each runs in one transaction
+# and has to work on empty tables as well as full ones.
+MIGRATIONS = [
+    MIGRATE_GENERATED_POINTS,
+    MIGRATE_PLAYER_SEASON_INDEX,
+    MIGRATE_PLAYER_TEAM_NULLABLE,
 ]
 
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+# players of %s with stats of season %s updated in the last %s seconds
+FRESH_SEASON_STATS = """
+SELECT player_season.player_id
+FROM player_season
+LEFT JOIN skater_season_stats
+    ON skater_season_stats.unique_id = player_season.unique_id
+LEFT JOIN goalie_season_stats
+    ON goalie_season_stats.unique_id = player_season.unique_id
+WHERE player_season.player_id = ANY(%s)
+    AND player_season.season = %s
+GROUP BY player_season.player_id
+HAVING MAX(COALESCE(
+    skater_season_stats.last_updated, goalie_season_stats.last_updated
+)) >= LOCALTIMESTAMP - make_interval(secs => %s);
+"""
 
 GET_TABLES = """
 SELECT table_name FROM information_schema.tables
@@ -380,6 +526,9 @@ PRIMARY_DATA = [
 ]
 
 RESET_DATABASE = """
+DROP TABLE IF EXISTS game_player_stats;
+DROP TABLE IF EXISTS game_team_stats;
+DROP TABLE IF EXISTS game;
 DROP TABLE team_season_stats;
 DROP TABLE team_season;
 DROP TABLE skater_season_stats;
@@ -388,10 +537,11 @@ DROP TABLE player_season;
 DROP TABLE player;
 DROP TABLE team;
 DROP TABLE league;
+DROP TABLE IF EXISTS schema_version;
 
-DROP FUNCTION public.compute_points();
-DROP FUNCTION public.update_time_goalie_stats();
-DROP FUNCTION public.update_time_player();
-DROP FUNCTION public.update_time_skater_stats();
-DROP FUNCTION public.update_time_team_stats();
+DROP FUNCTION IF EXISTS public.compute_points();
+DROP FUNCTION IF EXISTS public.update_time_goalie_stats();
+DROP FUNCTION IF EXISTS public.update_time_player();
+DROP FUNCTION IF EXISTS public.update_time_skater_stats();
+DROP FUNCTION IF EXISTS public.update_time_team_stats();
 """
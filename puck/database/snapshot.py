@@ -0,0 +1,218 @@
+"""
+`puck snapshot`, the base tables in one compressed file.
+
+A snapshot is a gzipped tar holding meta.json and one member per base table,
+named TABLE.copy, in COPY's binary format. Loading one into an empty
+database is a COPY per table instead of the several minutes of requests
+populate_initial_tables takes.
+
+meta.json holds the snapshot format, the schema version the tables were
+written with (a snapshot is only loaded into the same version), the row
+count of each table and the seasons covered.
+"""
+import io
+import json
+import tarfile
+import tempfile
+import time
+
+import psycopg2.sql as pgsql
+
+import puck.database.db_constants as db_const
+from puck.database.db import (create_base_tables, create_base_triggers,
+                              create_game_tables, migrate, schema_version,
+                              undefined_tables)
+
+SNAPSHOT_FORMAT = 1
+
+# tables with a SERIAL column, the sequence is moved past the loaded rows
+_SERIAL = {'player_season': 'unique_id', 'team_season': 'unique_id'}
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def export_snapshot(db_conn, path) -> dict:
+    """
+    Write every base table to a snapshot.
+
+    Args:
+        db_conn (psycopg2.Connection): Database connection
+        path (str or Path): file to write
+
+    Returns:
+        dict: the snapshot's metadata
+    """
+    # one consistent view of every table
+    db_conn.rollback()
+    cursor = db_conn.cursor()
+    cursor.execute(
+        'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY'
+    )
+
+    meta = {
+        'format': SNAPSHOT_FORMAT,
+        'schema_version': db_const.SCHEMA_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'tables': {
+            table: _count(cursor, table) for table in db_const.BASE_TABLES
+        },
+        'seasons': {
+            table: _seasons(cursor, table)
+            for table in ('player_season', 'team_season')
+        }
+    }
+
+    with tarfile.open(path, 'w:gz') as tar:
+        # first so read_meta stops at the start of the file
+        data = json.dumps(meta, indent=2).encode()
+        info = tarfile.TarInfo('meta.json')
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+
+        for table in db_const.BASE_TABLES:
+            # a member's size goes before its data, spooled to find it out
+            with tempfile.TemporaryFile() as f:
+                cursor.copy_expert(
+                    pgsql.SQL('COPY {} TO STDOUT (FORMAT binary)').format(
+                        pgsql.Identifier(table)
+                    ).as_string(db_conn), f
+                )
+
+                info = tarfile.TarInfo(f'{table}.copy')
+                info.size = f.tell()
+                f.seek(0)
+                tar.addfile(info, f)
+
+    cursor.close()
+    db_conn.rollback()
+
+    return meta
+
+
+def read_meta(path) -> dict:
+    """The metadata of a snapshot."""
+    with tarfile.open(path, 'r:gz') as tar:
+        return _meta(tar)
+
+
+def import_snapshot(db_conn, path) -> dict:
+    """
+    Load a snapshot into a database whose base tables are missing or empty.
+    Missing tables are created and every table is migrated to the current
+    schema version first, then the rows are loaded in one transaction.
+
+    Args:
+        db_conn (psycopg2.Connection): Database connection
+        path (str or Path): snapshot file
+
+    Returns:
+        dict: the snapshot's metadata
+
+    Raises:
+        SnapshotError: the snapshot does not fit this schema or the tables
+            already hold data
+    """
+    with tarfile.open(path, 'r:gz') as tar:
+        meta = _meta(tar)
+
+        if meta.get('format') != SNAPSHOT_FORMAT:
+            raise SnapshotError(
+                f'Unsupported snapshot format {meta.get("format")}'
+            )
+        if meta.get('schema_version') != db_const.SCHEMA_VERSION:
+            raise SnapshotError(
+                'The snapshot was written with schema version '
+                f'{meta.get("schema_version")}, this database uses '
+                f'{db_const.SCHEMA_VERSION}'
+            )
+
+        version = schema_version(db_conn)
+        if version is not None and version > db_const.SCHEMA_VERSION:
+            raise SnapshotError(
+                f'The database is at schema version {version}, newer than '
+                'this version of puck'
+            )
+
+        cursor = db_conn.cursor()
+
+        try:
+            undefined = undefined_tables(cursor)
+
+            for table in db_const.BASE_TABLES:
+                if table in undefined:
+                    continue
+
+                cursor.execute(pgsql.SQL('SELECT 1 FROM {} LIMIT 1').format(
+                    pgsql.Identifier(table)
+                ))
+                if cursor.fetchone():
+                    raise SnapshotError(
+                        f'Table {table} is not empty, use resetdb first'
+                    )
+
+            if undefined:
+                create_base_tables(cursor, undefined)
+                create_base_triggers(cursor)
+            create_game_tables(cursor)
+            db_conn.commit()
+
+            # the tables have to match the snapshot's before loading it
+            migrate(db_conn, version)
+
+            # parents before children, BASE_TABLES is in that order
+            for table in db_const.BASE_TABLES:
+                cursor.copy_expert(
+                    pgsql.SQL('COPY {} FROM STDIN (FORMAT binary)').format(
+                        pgsql.Identifier(table)
+                    ).as_string(db_conn),
+                    tar.extractfile(f'{table}.copy')
+                )
+
+            for table, column in _SERIAL.items():
+                cursor.execute(
+                    pgsql.SQL(
+                        'SELECT setval(pg_get_serial_sequence(%s, %s), '
+                        'COALESCE(MAX({}), 0) + 1, false) FROM {}'
+                    ).format(
+                        pgsql.Identifier(column), pgsql.Identifier(table)
+                    ), (table, column)
+                )
+
+            db_conn.commit()
+        except Exception:
+            db_conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    return meta
+
+
+def _meta(tar) -> dict:
+    # the first member, the rest of the file is left unread
+    member = tar.next()
+    if member is None or member.name != 'meta.json':
+        raise SnapshotError('Not a puck snapshot')
+
+    try:
+        return json.load(tar.extractfile(member))
+    except ValueError as err:
+        raise SnapshotError(f'Not a puck snapshot: {err}')
+
+
+def _count(cursor, table) -> int:
+    cursor.execute(pgsql.SQL('SELECT COUNT(*) FROM {}').format(
+        pgsql.Identifier(table)
+    ))
+
+    return cursor.fetchone()[0]
+
+
+def _seasons(cursor, table) -> list:
+    cursor.execute(pgsql.SQL(
+        'SELECT DISTINCT season FROM {} ORDER BY season'
+    ).format(pgsql.Identifier(table)))
+
+    return [row[0] for row in cursor.fetchall()]
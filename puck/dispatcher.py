@@ -67,7 +67,3 @@ class Dispatch(object):
     @classmethod
     def roster(cls, _id):
         return Dispatch(_id, 'team_id', parser='roster', url=Url.TEAM_ROSTER)
-
-    @classmethod
-    def empty(cls, name=None):
-        return Dispatch(None, None, name=name)
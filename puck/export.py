@@ -0,0 +1,102 @@
+"""
+Writers for `puck games -o FILE`. Each game is written as soon as it is
+received so an export holds a single game at a time.
+
+Files ending in .jsonl, .ndjson or .json are written as JSON lines, anything
+else as CSV.
+"""
+import csv
+import json
+
+JSON_LINES_EXT = ('.jsonl', '.ndjson', '.json')
+
+GAME_COLUMNS = [
+    'game_id', 'date', 'game_status', 'start_time', 'period', 'time',
+    'is_final'
+]
+
+TEAM_COLUMNS = ['abbreviation', 'goals']
+
+# GameStatsTeam fields, only available on a FullGame (verbose)
+BOX_COLUMNS = [
+    'shots', 'pims', 'pp_goals', 'pp_att', 'pp_pct', 'faceoff_pct',
+    'blocked', 'takeaways', 'giveaways', 'hits'
+]
+
+
+def columns(verbose=False) -> list:
+    """Column names of a game row, see game_row."""
+    team_columns = TEAM_COLUMNS + BOX_COLUMNS if verbose else TEAM_COLUMNS
+
+    return GAME_COLUMNS + [
+        f'{team_type}_{col}'
+        for team_type in ('away', 'home') for col in team_columns
+    ]
+
+
+def game_row(game, verbose=False) -> dict:
+    """
+    Flatten a game into a single row.
+
+    Args:
+        game (BannerGame or FullGame): the game, must be a FullGame
+            when verbose
+        verbose (bool, optional): include the boxscore fields of each
+            team. Defaults to False.
+
+    Returns:
+        dict: column -> value
+    """
+    row = {
+        'game_id': game.game_id,
+        'date': game.game_date.format('YYYY-MM-DD'),
+        'game_status': game.game_status,
+        'start_time': game.start_time,
+        'period': game.period,
+        'time': game.time,
+        'is_final': game.is_final
+    }
+
+    team_columns = TEAM_COLUMNS + BOX_COLUMNS if verbose else TEAM_COLUMNS
+
+    for team_type in ('away', 'home'):
+        team = getattr(game, team_type)
+        for col in team_columns:
+            row[f'{team_type}_{col}'] = getattr(team, col)
+
+    return row
+
+
+class CSVGameWriter(object):
+    def __init__(self, file, verbose=False):
+        self.file = file
+        self.verbose = verbose
+        self.count = 0
+
+        self.writer = csv.DictWriter(file, fieldnames=columns(verbose))
+        self.writer.writeheader()
+
+    def write(self, game):
+        self.writer.writerow(game_row(game, self.verbose))
+        self.file.flush()
+        self.count += 1
+
+
+class JSONLinesGameWriter(object):
+    def __init__(self, file, verbose=False):
+        self.file = file
+        self.verbose = verbose
+        self.count = 0
+
+    def write(self, game):
+        self.file.write(json.dumps(game_row(game, self.verbose)) + '\n')
+        self.file.flush()
+        self.count += 1
+
+
+def game_writer(file, verbose=False):
+    """Writer for file based on its extension."""
+    if getattr(file, 'name', '').lower().endswith(JSON_LINES_EXT):
+        return JSONLinesGameWriter(file, verbose)
+
+    return CSVGameWriter(file, verbose)
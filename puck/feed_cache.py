@@ -0,0 +1,77 @@
+"""
+On disk cache of the game feeds of past days. A day is only stored once
+every game on it is final, those feeds never change again so a cached day
+is served without any request, schedule included.
+
+Each day is a gzipped JSON file named YYYY-MM-DD.json.gz holding a list of
+[game_id, feed] in schedule order. Feeds are trimmed to
+constants.FEED_CACHE_KEYS before they are written.
+"""
+import gzip
+import json
+from pathlib import Path
+
+import puck.constants as const
+
+
+class FeedCache(object):
+    """
+    Attributes:
+        path (Path): directory of the day files
+    """
+
+    def __init__(self, path=const.FEED_CACHE):
+        self.path = Path(path)
+
+    def __contains__(self, date):
+        return self._file(date).exists()
+
+    def day(self, date):
+        """
+        Feeds of every game on date.
+
+        Args:
+            date (str): YYYY-MM-DD
+
+        Returns:
+            list or None: (game_id, feed) in schedule order, None if the day
+                is not cached
+        """
+        try:
+            with gzip.open(self._file(date), 'rt') as f:
+                return [(_id, feed) for _id, feed in json.load(f)]
+        except (OSError, ValueError):
+            # missing, or a partial write of a crashed run
+            return None
+
+    def store(self, date, feeds):
+        """
+        Cache a day. Only call this with every game of the day, all final.
+
+        Args:
+            date (str): YYYY-MM-DD
+            feeds (list): (game_id, feed) in schedule order
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        # written aside then renamed so readers never see half a day
+        tmp = self._file(date).with_suffix('.tmp')
+        with gzip.open(tmp, 'wt') as f:
+            json.dump([[_id, trim_feed(feed)] for _id, feed in feeds], f)
+
+        tmp.replace(self._file(date))
+
+    def _file(self, date) -> Path:
+        return self.path.joinpath(f'{date}.json.gz')
+
+
+def trim_feed(feed) -> dict:
+    """Copy of a Url.GAME feed with only the sections in FEED_CACHE_KEYS."""
+    trimmed = {key: val for key, val in feed.items() if key == 'gamePk'}
+
+    for section, keys in const.FEED_CACHE_KEYS.items():
+        trimmed[section] = {
+            key: feed[section][key] for key in keys if key in feed[section]
+        }
+
+    return trimmed
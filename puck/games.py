@@ -1,12 +1,21 @@
 import asyncio
+import itertools
+from collections import deque
 
+import aiohttp
 import arrow
+import psycopg2 as pg
 
+import puck.boxscore as boxscore
 import puck.constants as const
 import puck.parser as parser
+from puck.feed_cache import trim_feed
+from puck.player import fetch_player_rows, fetch_rosters
 from puck.teams import BannerTeam, GameStatsTeam
 from puck.urls import Url
-from puck.utils import request
+from puck.request_queue import Priority
+from puck.utils import (Change, async_request, attrs_dict, batch_game_feeds,
+                        diff_update, prefix_changes, report_error, request)
 
 
 class GameIDException(Exception):
@@ -24,6 +33,7 @@ class BaseGame(object):
         home (None): Not Implemented
         away (None): Not Implemented
     """
+    __slots__ = ('db_conn', 'game_id', 'home', 'away')
 
     def __init__(self, db_conn, game_id):
         self.db_conn = db_conn
@@ -38,7 +48,7 @@ class BaseGame(object):
         return self.game_id == other.game_id
 
     def __repr__(self):
-        return f'{self.__class__} -> {self.__dict__}'
+        return f'{self.__class__} -> {attrs_dict(self)}'
 
 
 class BannerGame(BaseGame):
@@ -66,8 +76,13 @@ class BannerGame(BaseGame):
         is_final (bool): Boolean indicating if game is final
         is_live (bool): Boolean indicating if game is live
     """
+    # fixed layout, these are the keys returned by parser.game
+    __slots__ = (
+        'game_status', 'start_time', 'game_date', 'period', 'time',
+        'in_intermission', 'is_preview', 'is_final', 'is_live'
+    )
 
-    def __init__(self, db_conn, game_id, data=None, _class=BannerTeam):
+    def __init__(self, db_conn, game_id, data=None, _class=BannerTeam, rows=None):  # noqa
         """
         Args:
             db_conn (psycopg2.Connection): database connection
@@ -75,19 +90,29 @@ class BannerGame(BaseGame):
             data (dict, optional): JSON rep of the game. Defaults to None.
             _class (BaseTeam, optional): Team object to create.
                 Defaults to BannerTeam.
+            rows (GameRows, optional): stored rows of a final game (see
+                boxscore.fetch_game_rows), used instead of data.
+                Defaults to None.
         """
         super().__init__(db_conn, game_id)
 
-        if not data:
-            data = request(Url.GAME, url_mods={'game_id': game_id})
+        if rows is not None:
+            parsed_data = boxscore.game_attrs(rows.game)
+        else:
+            if not data:
+                data = request(Url.GAME, url_mods={'game_id': game_id})
+
+            # the api answers an unknown id with an error message
+            if 'gameData' not in data:
+                raise GameIDException(game_id)
 
-        parsed_data = parser.game(data)
+            parsed_data = parser.game(data)
 
         for key, val in parsed_data.items():
             setattr(self, key, val)
 
-        self.home = _class(self, game_id, 'home', data)
-        self.away = _class(self, game_id, 'away', data)
+        self.home = _class(self, game_id, 'home', data, rows=rows)
+        self.away = _class(self, game_id, 'away', data, rows=rows)
 
     def update_data(self, data=None):
         """
@@ -95,13 +120,15 @@ class BannerGame(BaseGame):
 
         NOTE: Does not use game as we only need to update small
         subset of data.
-        """
 
-        # TODO CLEAN UP UPDATE
+        Returns:
+            list of Change: every field changed by the update. Nested objects
+                are prefixed i.e. 'home.goals'. Empty if nothing changed.
+        """
 
         # If the game is already finished, no need to request info
         if self.is_final:
-            return
+            return []
 
         if not data:
             data = request(Url.GAME, url_mods={'game_id': self.game_id})
@@ -110,23 +137,49 @@ class BannerGame(BaseGame):
 
         # game status hasn't changed
         if _status_code in const.GAME_STATUS['Preview'] and self.is_preview:  # noqa
+            if _status_code == self.game_status:
+                return []
+
+            change = Change('game_status', self.game_status, _status_code)
             self.game_status = _status_code
+            return [change]
+
+        changes = diff_update(self, parser.game(data))
+
+        # this will call update no matter the Team Class type
+        changes.extend(prefix_changes('home', self.home.update_data(data)))
+        changes.extend(prefix_changes('away', self.away.update_data(data)))
+
+        return changes
+
+    def upgrade(self, data=None, rows=None):
+        """
+        Upgrades a BannerGame to a FullGame in place. Any screen holding a
+        reference to this object will see the full detail.
+
+        Args:
+            data (dict, optional): JSON rep of the game. Defaults to None.
+            rows (GameRows, optional): stored rows of a final game, used
+                instead of data. Defaults to None.
+        """
+        if isinstance(self, FullGame):
             return
 
-        parsed_data = parser.game(data)
+        if rows is not None:
+            parsed_data = boxscore.game_attrs(rows.game)
+        else:
+            if not data:
+                data = request(Url.GAME, url_mods={'game_id': self.game_id})
+
+            parsed_data = parser.game(data)
+
+        self.__class__ = FullGame
 
         for key, val in parsed_data.items():
-            if hasattr(self, key):
-                setattr(self, key, val)
-            else:
-                raise AttributeError(
-                    f'Game.update_data received an attribute {key} \
-                    that has not been set.'
-                )
+            setattr(self, key, val)
 
-        # this will call update no matter the Team Class type
-        self.home.update_data(data)
-        self.away.update_data(data)
+        self.home = GameStatsTeam(self, self.game_id, 'home', data, rows)
+        self.away = GameStatsTeam(self, self.game_id, 'away', data, rows)
 
 
 class FullGame(BannerGame):
@@ -146,23 +199,598 @@ class FullGame(BannerGame):
     what kind of player data we can end up with.
 
     """
+    # must stay empty so BannerGame.upgrade can swap the class in place
+    __slots__ = ()
 
-    def __init__(self, db_conn, game_id, data=None):
-        if not data:
+    def __init__(self, db_conn, game_id, data=None, rows=None):
+        if not data and rows is None:
             data = request(Url.GAME, url_mods={'game_id': game_id})
 
-        super().__init__(db_conn=db_conn, game_id=game_id, data=data, _class=GameStatsTeam)  # noqa
+        super().__init__(db_conn=db_conn, game_id=game_id, data=data, _class=GameStatsTeam, rows=rows)  # noqa
 
     def update_data(self, data=None):
-        super().update_data(data)
+        return super().update_data(data)
+
+    async def init_players(self, data=None, player_rows=None, rosters=None):
+        """Wrapper to init both home and away players. See
+        GameRegistry.init_players to create a whole slate at once.
 
-    def init_players(self, data=None):
-        """Wrapper to init both home and away players"""
+        Args:
+            data (dict, optional): JSON rep of the game. Defaults to None.
+            player_rows (dict, optional): player_id -> player table row,
+                from fetch_player_rows. Defaults to None.
+            rosters (dict, optional): team_id -> ids the player table has
+                on the team, from fetch_rosters. Defaults to None.
+        """
 
         # if the internal team object is not GameStatsTeam we ignore the call
         if isinstance(self.home, GameStatsTeam):
-            self.home.init_players(data)
-            self.away.init_players(data)
+            team_ids = [self.home.team_id, self.away.team_id]
+
+            # one query for both rosters
+            if player_rows is None:
+                player_rows = fetch_player_rows(
+                    self.db_conn, self.home.id_list + self.away.id_list
+                )
+            if rosters is None:
+                rosters = fetch_rosters(self.db_conn, team_ids)
+
+            await self.home.init_players(
+                data, player_rows, rosters[self.home.team_id]
+            )
+            await self.away.init_players(
+                data, player_rows, rosters[self.away.team_id]
+            )
+
+
+class GameRegistry(object):
+    """
+    Identity map of game objects keyed by game ID. Every screen requesting
+    a game receives the same object, so each game is requested, stored and
+    updated once no matter how many screens reference it.
+
+    Attributes:
+        db_conn (psycopg2.Connection): Database Connection
+        games (dict): game_id -> BannerGame or FullGame
+        subscribers (list): callbacks receiving the change events of
+            each update
+        source (DaemonClient or None): where game feeds come from, None
+            requests them from the api directly. A source publishes its
+            own updates (see apply_feeds).
+        keep_feeds (bool): hold on to the latest feed of each game
+        feeds (dict): game_id -> latest JSON feed, when keep_feeds
+        on_error (function): called with the message of an error that
+            does not stop the registry i.e. a final game not stored
+        unstored (dict): game_id -> feed of final games the database
+            refused, retried with every fetch and update
+    """
+
+    def __init__(self, db_conn, source=None, keep_feeds=False, on_error=report_error):  # noqa
+        self.db_conn = db_conn
+        self.games = {}
+        self.subscribers = []
+        self.source = source
+        self.keep_feeds = keep_feeds
+        self.feeds = {}
+        self.on_error = on_error
+        self.unstored = {}
+
+    def __contains__(self, game_id):
+        return game_id in self.games
+
+    def __len__(self):
+        return len(self.games)
+
+    def get(self, game_id):
+        """Return the canonical game object or None."""
+        return self.games.get(game_id)
+
+    def subscribe(self, callback):
+        """
+        Register a callback for change events. After every update the
+        callback is passed a dict of game_id -> list of Change containing
+        only the games that changed.
+        """
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def discard(self, game_ids):
+        """Forget games and their feeds, they are never updated again.
+        A later fetch creates them anew."""
+        game_ids = list(game_ids)
+        for _id in game_ids:
+            self.games.pop(_id, None)
+            self.feeds.pop(_id, None)
+
+        # the source stops pushing them, i.e. the daemon stops polling
+        source = self._live_source()
+        if source is not None and game_ids:
+            source.unsubscribe(game_ids)
+
+    async def fetch(self, game_ids, class_type='banner', priority=Priority.INTERACTIVE) -> list:  # noqa
+        """
+        Returns the canonical game objects for game_ids. Games not yet
+        registered are created, banner games are upgraded in place when
+        class_type is 'full'. Final games stored in the database (see
+        puck.boxscore) are built from their rows, the rest are requested
+        and stored if they turn out final.
+
+        Args:
+            game_ids (list of int): Game IDs
+            class_type (str, optional): 'banner' or 'full'.
+                Defaults to 'banner'.
+            priority (Priority, optional): request class.
+                Defaults to Priority.INTERACTIVE.
+
+        Returns:
+            list: game objects in the order of game_ids
+        """
+        # dict keeps order while removing duplicates
+        to_create = list(
+            dict.fromkeys(_id for _id in game_ids if _id not in self.games)
+        )
+
+        # a stored game has no feed to keep
+        stored = {} if self.keep_feeds else \
+            boxscore.fetch_game_rows(self.db_conn, to_create)
+        for _id, rows in stored.items():
+            self.games[_id] = create_game(
+                self.db_conn, _id, class_type, rows=rows
+            )
+
+        to_create = [_id for _id in to_create if _id not in stored]
+
+        feeds = await self.game_feeds(to_create, priority)
+        for _id, feed in zip(to_create, feeds):
+            # an overlapping fetch may have created the game while this one
+            # waited, the object already handed out stays the canonical one
+            if _id not in self.games:
+                self.games[_id] = create_game(
+                    self.db_conn, _id, class_type, feed
+                )
+
+        self._store_finals(dict(zip(to_create, feeds)))
+
+        if class_type == 'full':
+            to_upgrade = [
+                self.games[_id] for _id in dict.fromkeys(game_ids)
+                if not isinstance(self.games[_id], FullGame)
+            ]
+
+            stored = {} if self.keep_feeds else \
+                boxscore.fetch_game_rows(self.db_conn, [
+                    game.game_id for game in to_upgrade if game.is_final
+                ])
+            for game in to_upgrade:
+                if game.game_id in stored:
+                    game.upgrade(rows=stored[game.game_id])
+
+            to_upgrade = [
+                game for game in to_upgrade if game.game_id not in stored
+            ]
+
+            feeds = await self.game_feeds(
+                [game.game_id for game in to_upgrade], priority
+            )
+            for game, feed in zip(to_upgrade, feeds):
+                game.upgrade(feed)
+
+        return [self.games[_id] for _id in game_ids]
+
+    async def init_players(self, games, priority=Priority.INTERACTIVE) -> dict:  # noqa
+        """
+        Create the players of full games, however many are passed one
+        query finds the rosters the database holds, one fetches every
+        player row and the feeds are requested together. Games whose
+        players exist already are skipped.
+
+        Args:
+            games (list of FullGame): the games
+            priority (Priority, optional): request class.
+                Defaults to Priority.INTERACTIVE.
+
+        Returns:
+            dict: game_id -> latest feed of each game that is not final
+        """
+        live = [game.game_id for game in games if not game.is_final]
+        feeds = dict(zip(live, await self.game_feeds(live, priority)))
+
+        games = [
+            game for game in games
+            if isinstance(game.home, GameStatsTeam) and
+            game.home.players is None
+        ]
+        if not games:
+            return feeds
+
+        teams = [team for game in games for team in (game.home, game.away)]
+        rosters = fetch_rosters(
+            self.db_conn, {team.team_id for team in teams}
+        )
+        player_rows = fetch_player_rows(
+            self.db_conn, {_id for team in teams for _id in team.id_list}
+        )
+
+        for game in games:
+            # stored final games have no feed, their stats are read back
+            await game.init_players(
+                feeds.get(game.game_id), player_rows, rosters
+            )
+
+        return feeds
+
+    async def update(self, game_ids=None, priority=Priority.REFRESH) -> dict:
+        """
+        Update registered games once and publish the changes to
+        subscribers. Finished games are never requested again.
+
+        Args:
+            game_ids (list of int, optional): Limit the update to these
+                games. Defaults to all registered games.
+            priority (Priority, optional): request class.
+                Defaults to Priority.REFRESH.
+
+        Returns:
+            dict: game_id -> list of Change, for games that changed
+        """
+        self._store_finals({})
+
+        if self._live_source() is not None:
+            # the source pushes its updates through apply_feeds
+            return {}
+
+        if game_ids is None:
+            game_ids = self.games.keys()
+
+        _ids = [
+            _id for _id in dict.fromkeys(game_ids)
+            if _id in self.games and not self.games[_id].is_final
+        ]
+
+        feeds = await self.game_feeds(_ids, priority)
+
+        return self.apply_feeds(dict(zip(_ids, feeds)))
+
+    def apply_feeds(self, feeds) -> dict:
+        """
+        Update registered games from their feeds and publish the changes
+        to subscribers.
+
+        Args:
+            feeds (dict): game_id -> JSON feed
+
+        Returns:
+            dict: game_id -> list of Change, for games that changed
+        """
+        changes = {}
+        for _id, feed in feeds.items():
+            game = self.games.get(_id)
+
+            if game is None or game.is_final:
+                continue
+
+            changed = game.update_data(feed)
+            if changed:
+                changes[_id] = changed
+
+        # nothing changed, nothing to redraw
+        if changes:
+            for callback in self.subscribers:
+                callback(changes)
+
+        self._store_finals({_id: feeds[_id] for _id in changes})
+
+        return changes
+
+    async def game_feeds(self, game_ids, priority=Priority.REFRESH) -> list:
+        """JSON feed of each game in game_ids from the registry's source."""
+        if not game_ids:
+            return []
+
+        feeds = None
+        if self._live_source() is not None:
+            try:
+                feeds = await self.source.game_feeds(game_ids)
+            except ConnectionError:
+                # the daemon went away, request the api directly from now on
+                self.source = None
+
+        if feeds is None:
+            feeds = await batch_game_feeds(game_ids, priority)
+
+        if self.keep_feeds:
+            self.feeds.update(zip(game_ids, feeds))
+
+        return feeds
+
+    async def game_feed(self, game_id, priority=Priority.INTERACTIVE) -> dict:
+        """JSON feed of a single game, see game_feeds."""
+        feeds = await self.game_feeds([game_id], priority)
+
+        return feeds[0]
+
+    async def schedule_ids(self, url_mods=None, params=None, priority=Priority.INTERACTIVE) -> list:  # noqa
+        """Game ids of a Url.SCHEDULE query from the registry's source.
+        See async_get_game_ids."""
+        if self._live_source() is not None:
+            try:
+                return await self.source.schedule_ids(url_mods, params)
+            except ConnectionError:
+                self.source = None
+
+        return await async_get_game_ids(url_mods, params, priority)
+
+    def _store_finals(self, feeds):
+        # a final game is read from the database from now on, one the
+        # database refused is reported once and retried until it is stored
+        failed = set(self.unstored)
+        self.unstored.update(
+            (_id, feed) for _id, feed in feeds.items()
+            if _id in self.games and self.games[_id].is_final
+        )
+
+        for _id, feed in list(self.unstored.items()):
+            try:
+                boxscore.save_game(self.db_conn, feed)
+            except pg.Error as err:
+                if _id not in failed:
+                    self.on_error(f'Game {_id} could not be stored: {err}')
+            else:
+                del self.unstored[_id]
+
+    def _live_source(self):
+        if self.source is not None and self.source.closed:
+            self.source = None
+
+        return self.source
+
+
+def create_game(db_conn, game_id, class_type, data=None, rows=None):
+    """Create a game object of class_type ('banner' or 'full') from its
+    feed or its stored rows."""
+    if class_type == 'full':
+        return FullGame(db_conn, game_id, data, rows=rows)
+    elif class_type == 'banner':
+        return BannerGame(db_conn, game_id, data, rows=rows)
+
+    raise ValueError(f'{class_type} is not a valid game type.')
+
+
+async def stream_games(db_conn, game_ids, class_type='banner', window=const.STREAM_WINDOW, priority=Priority.INTERACTIVE):  # noqa
+    """
+    Async generator of game objects in the order of game_ids. Games are
+    yielded as soon as they are parsed and are not registered anywhere, at
+    most window games are requested or held at once so memory stays
+    constant no matter how many ids are passed.
+
+    Args:
+        db_conn (psycopg2.Connection): Database connection
+        game_ids (iterable of int): Game IDs
+        class_type (str, optional): 'banner' or 'full'.
+            Defaults to 'banner'.
+        window (int, optional): games in flight.
+            Defaults to const.STREAM_WINDOW.
+        priority (Priority, optional): request class.
+            Defaults to Priority.INTERACTIVE.
+    """
+    async for _id, feed in stream_feeds(game_ids, window, priority):
+        yield create_game(db_conn, _id, class_type, feed)
+
+
+async def stream_feeds(game_ids, window=const.STREAM_WINDOW, priority=Priority.INTERACTIVE):  # noqa
+    """
+    Async generator of (game_id, feed) in the order of game_ids, see
+    stream_games.
+
+    Args:
+        game_ids (iterable of int): Game IDs
+        window (int, optional): feeds in flight.
+            Defaults to const.STREAM_WINDOW.
+        priority (Priority, optional): request class.
+            Defaults to Priority.INTERACTIVE.
+    """
+    async with aiohttp.ClientSession() as session:
+        def get(_id):
+            return asyncio.ensure_future(async_request(
+                Url.GAME, session, url_mods={'game_id': _id},
+                priority=priority
+            ))
+
+        game_ids = iter(game_ids)
+        pending = deque(
+            (_id, get(_id)) for _id in itertools.islice(game_ids, window)
+        )
+
+        try:
+            while pending:
+                _id, task = pending.popleft()
+                feed = await task
+
+                # refill the window before handing the feed out
+                for next_id in itertools.islice(game_ids, 1):
+                    pending.append((next_id, get(next_id)))
+
+                yield _id, feed
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+
+async def stream_date_range(db_conn, start, end, class_type='banner', params=None, cache=None, window=const.STREAM_WINDOW, chunk_days=const.DATE_CHUNK_DAYS, priority=Priority.INTERACTIVE):  # noqa
+    """
+    Async generator of (date, game) for every game from start to end, in
+    date order. The range is requested chunk_days at a time with at
+    most DATE_CHUNK_LOOKAHEAD schedule requests ahead of the output, games
+    are fetched through the same window as stream_games. Memory does not
+    grow with the length of the range.
+
+    Days found in cache are served without a request. Every day passed
+    through with all of its games final is stored in cache, unless params
+    narrowed the schedule down.
+
+    Args:
+        db_conn (psycopg2.Connection): Database connection
+        start (str): first day, YYYY-MM-DD
+        end (str): last day, YYYY-MM-DD
+        class_type (str, optional): 'banner' or 'full'.
+            Defaults to 'banner'.
+        params (dict, optional): extra Url.SCHEDULE parameters i.e. teamId.
+            Defaults to None.
+        cache (FeedCache, optional): feeds of final days. Defaults to None.
+        window (int, optional): games in flight.
+            Defaults to const.STREAM_WINDOW.
+        chunk_days (int, optional): days per schedule request.
+            Defaults to const.DATE_CHUNK_DAYS.
+        priority (Priority, optional): request class.
+            Defaults to Priority.INTERACTIVE.
+    """
+    params = params or {}
+    store = cache is not None and not params
+
+    async with aiohttp.ClientSession() as session:
+        async def build(_id, feed):
+            if feed is None:
+                feed = await async_request(
+                    Url.GAME, session, url_mods={'game_id': _id},
+                    priority=priority
+                )
+            return create_game(db_conn, _id, class_type, feed), feed
+
+        items = _range_items(
+            session, date_chunks(start, end, chunk_days), params, cache, store,
+            priority
+        )
+        pending = deque()
+
+        async def fill():
+            async for date, _id, feed in items:
+                pending.append((
+                    date, feed is not None,
+                    asyncio.ensure_future(build(_id, feed))
+                ))
+                if len(pending) >= window:
+                    break
+
+        # the day being output: (game_id, feed) while every game is final
+        day, day_feeds = None, []
+
+        try:
+            await fill()
+            while pending:
+                date, cached, task = pending.popleft()
+                game, feed = await task
+                await fill()
+
+                if date != day:
+                    if store and day_feeds:
+                        cache.store(day, day_feeds)
+                    day, day_feeds = date, []
+
+                if cached or not game.is_final:
+                    # nothing to store for this day
+                    day_feeds = None
+                elif day_feeds is not None:
+                    # plays are dropped here so a day holds little
+                    day_feeds.append((game.game_id, trim_feed(feed)))
+
+                yield date, game
+
+            if store and day_feeds:
+                cache.store(day, day_feeds)
+        finally:
+            for _, _, task in pending:
+                task.cancel()
+            await items.aclose()
+
+
+async def _range_items(session, chunks, params, cache, store, priority):
+    """
+    Async generator of (date, game_id, feed) for stream_date_range. feed is
+    the cached feed, None if the game has to be requested. Past days
+    without games are stored right away when store is set.
+    """
+    team_id = params.get('teamId')
+
+    async def request_days(days) -> dict:
+        game_info = await async_request(
+            Url.SCHEDULE, session, priority=priority,
+            params={**params, 'startDate': days[0], 'endDate': days[-1]}
+        )
+
+        return dict(_schedule_days(game_info))
+
+    async def schedule(days) -> list:
+        # (date, game ids), ids are None for a cached day
+        missing = [
+            date for date in days if cache is None or date not in cache
+        ]
+        requested = await request_days(missing) if missing else {}
+
+        if store:
+            today = arrow.now().format('YYYY-MM-DD')
+            for date in missing:
+                if date < today and not requested.get(date):
+                    cache.store(date, [])
+
+        return [
+            (date, requested.get(date, []) if date in missing else None)
+            for date in days
+        ]
+
+    chunks = iter(chunks)
+    ahead = deque(
+        asyncio.ensure_future(schedule(days))
+        for days in itertools.islice(chunks, const.DATE_CHUNK_LOOKAHEAD + 1)
+    )
+
+    try:
+        while ahead:
+            days = await ahead.popleft()
+            for next_days in itertools.islice(chunks, 1):
+                ahead.append(asyncio.ensure_future(schedule(next_days)))
+
+            for date, game_ids in days:
+                feeds = None if game_ids is not None else cache.day(date)
+
+                if feeds is not None:
+                    for _id, feed in feeds:
+                        if team_id is None or team_id in _team_ids(feed):
+                            yield date, _id, feed
+                    continue
+
+                if game_ids is None:
+                    # the cached file could not be read
+                    game_ids = (await request_days([date])).get(date, [])
+
+                for _id in game_ids:
+                    yield date, _id, None
+    finally:
+        for task in ahead:
+            task.cancel()
+
+
+def date_chunks(start, end, days=const.DATE_CHUNK_DAYS) -> list:
+    """
+    Split the days from start to end into consecutive chunks.
+
+    Args:
+        start (str): first day, YYYY-MM-DD
+        end (str): last day, YYYY-MM-DD
+        days (int, optional): days per chunk.
+            Defaults to const.DATE_CHUNK_DAYS.
+
+    Returns:
+        list: lists of YYYY-MM-DD, each at most days long
+    """
+    dates = [
+        day.format('YYYY-MM-DD')
+        for day in arrow.Arrow.range('day', arrow.get(start), arrow.get(end))
+    ]
+
+    return [dates[i:i + days] for i in range(0, len(dates), days)]
 
 
 def get_game_ids(url_mods=None, params=None):
@@ -179,6 +807,46 @@ def get_game_ids(url_mods=None, params=None):
 
     game_info = request(Url.SCHEDULE, url_mods=url_mods, params=params)
 
+    return _schedule_ids(game_info)
+
+
+async def async_get_game_ids(url_mods=None, params=None, priority=Priority.INTERACTIVE) -> list:  # noqa
+    """Async version of get_game_ids. Does not block the event loop.
+
+    Args:
+        url_mods (dict, optional): Certain urls are required to be formatted
+        params (dict, optional): Misc. url parameters that alter the query.
+        priority (Priority, optional): request class.
+            Defaults to Priority.INTERACTIVE.
+
+    Returns:
+        list: returns list of game ids for selected query
+    """
+    async with aiohttp.ClientSession() as session:
+        game_info = await async_request(
+            Url.SCHEDULE, session, url_mods=url_mods, params=params,
+            priority=priority
+        )
+
+    return _schedule_ids(game_info)
+
+
+def _schedule_days(game_info) -> list:
+    """(date, game ids) of each day in a Url.SCHEDULE response."""
+    return [
+        (day['date'], [game['gamePk'] for game in day.get('games', [])])
+        for day in game_info.get('dates', [])
+    ]
+
+
+def _team_ids(feed) -> tuple:
+    teams = feed['gameData']['teams']
+
+    return teams['home']['id'], teams['away']['id']
+
+
+def _schedule_ids(game_info) -> list:
+    """Game ids from a Url.SCHEDULE response in schedule order."""
     ids = []
     # dates is a list of all days requested
     # if this key does not exist an empty list will be returned
@@ -1,11 +1,16 @@
 import asyncio
+import sys
 
 import arrow
 import click
 
-from puck.games import BannerGame, FullGame, get_game_ids
-from puck.urls import Url
-from puck.utils import batch_game_create, request, team_to_id
+from puck.daemon import DaemonClient
+from puck.export import game_writer
+from puck.feed_cache import FeedCache
+from puck.games import (GameRegistry, async_get_game_ids, stream_date_range,
+                        stream_games)
+from puck.polling import PollScheduler
+from puck.utils import team_to_id
 
 
 def games_handler(config, cmd_vals):
@@ -22,6 +27,7 @@ def games_handler(config, cmd_vals):
     Returns:
         None
     """
+    watch = cmd_vals.pop('watch', False)
 
     if 'yesterday' in cmd_vals:
         _yesterday(cmd_vals)
@@ -42,8 +48,14 @@ def games_handler(config, cmd_vals):
         team_id = team_to_id(cmd_vals.pop('team'))
         cmd_vals.update({'teamId': team_id})
 
-    if config.verbose:
-        verbose_games_echo()
+    if watch:
+        watch_games_echo(config.conn, cmd_vals)
+    elif config.output_file is not None:
+        export_games(
+            config.conn, cmd_vals, config.output_file, config.verbose
+        )
+    elif config.verbose:
+        verbose_games_echo(config.conn, cmd_vals)
     else:
         normal_games_echo(config.conn, cmd_vals)
 
@@ -124,35 +136,229 @@ def _today(cmd_vals):
     cmd_vals.update({'date': _date})
 
 
-def verbose_games_echo(games):
-    pass
+def export_games(db_conn, params, file, verbose=False):
+    """Stream the games to file (see puck.export), one game at a time."""
+    count = asyncio.run(_export(db_conn, params, file, verbose))
 
+    click.echo(f'{count} game(s) written to {file.name}', err=True)
+
+
+async def _export(db_conn, params, file, verbose=False) -> int:
+    writer = game_writer(file, verbose)
+
+    # boxscore fields only exist on FullGame
+    class_type = 'full' if verbose else 'banner'
+
+    async for _, game in stream_schedule(db_conn, params, class_type):
+        writer.write(game)
+
+    return writer.count
+
+
+def verbose_games_echo(db_conn, params=None):
+    """Print each game followed by the boxscore of both teams."""
+    asyncio.run(_verbose_echo(db_conn, params))
 
-def normal_games_echo(db_conn, params=None):
-    game_ids = get_game_ids(params=params)
 
-    games_list = asyncio.run(
-        batch_game_create(game_ids, 'banner', db_conn)
+async def _verbose_echo(db_conn, params=None):
+    click.echo(NORM_FORMAT.format('Away ', 'Period', 'Home'))
+
+    day = None
+    async for date, game in stream_schedule(db_conn, params, 'full'):
+        if date != day:
+            day = date
+            _echo_day(params, date)
+
+        click.echo(_norm_row(game))
+
+        for team in (game.away, game.home):
+            click.echo(_box_row(team))
+
+
+# (label, GameStatsTeam attribute) of the verbose box score
+BOX_STATS = [
+    ('SOG', 'shots'), ('PIM', 'pims'), ('PPG', 'pp_goals'), ('PPA', 'pp_att'),
+    ('PP%', 'pp_pct'), ('FO%', 'faceoff_pct'), ('BS', 'blocked'),
+    ('TK', 'takeaways'), ('GV', 'giveaways'), ('Hits', 'hits')
+]
+
+
+def _box_row(team) -> str:
+    stats = ' | '.join(
+        f'{label} {getattr(team, attr)}' for label, attr in BOX_STATS
     )
 
+    return f'    {team.abbreviation:<4} {stats}'
+
+
+def normal_games_echo(db_conn, params=None):
+    if params and 'startDate' in params:
+        # a range can be a whole season, output it as it arrives
+        asyncio.run(_range_echo(db_conn, params))
+        return
+
+    games_list = asyncio.run(fetch_games(db_conn, params))
+
     build_norm_output(games_list)
 
 
-def build_norm_output(g_list):
-    gen_format = '{:^10} | {:^15} | {:^10}'
+async def _range_echo(db_conn, params):
+    click.echo(NORM_FORMAT.format('Away ', 'Period', 'Home'))
+
+    day = None
+    async for date, game in stream_schedule(db_conn, params):
+        if date != day:
+            day = date
+            _echo_day(params, date)
+
+        click.echo(_norm_row(game))
+
+
+async def stream_schedule(db_conn, params, class_type='banner'):
+    """
+    Async generator of (date, game) for a Url.SCHEDULE query. A
+    --date-range (startDate/endDate) is streamed a chunk of days at a time
+    and days already final are read from the FeedCache.
+
+    Args:
+        db_conn (psycopg2.Connection): Database connection
+        params (dict): Url.SCHEDULE parameters
+        class_type (str, optional): 'banner' or 'full'.
+            Defaults to 'banner'.
+    """
+    if 'startDate' not in params:
+        _ids = await async_get_game_ids(params=params)
+        async for game in stream_games(db_conn, _ids, class_type):
+            yield params.get('date'), game
+        return
+
+    params = dict(params)
+    start, end = params.pop('startDate'), params.pop('endDate')
+
+    async for date, game in stream_date_range(
+            db_conn, start, end, class_type, params, FeedCache()):
+        yield date, game
+
+
+def _echo_day(params, date):
+    # only a range holds more than one day
+    if 'startDate' in params:
+        click.echo(arrow.get(date).format('dddd, MMMM D YYYY'))
 
-    title = gen_format.format('Away ', 'Period', 'Home')
+
+async def fetch_games(db_conn, params=None, class_type='banner') -> list:
+    """
+    Game objects for a Url.SCHEDULE query. Served by `puck daemon` when it
+    is running, otherwise requested from the api.
+
+    Args:
+        db_conn (psycopg2.Connection): Database connection
+        params (dict, optional): Url.SCHEDULE parameters. Defaults to None.
+        class_type (str, optional): 'banner' or 'full'.
+            Defaults to 'banner'.
+
+    Returns:
+        list: game objects in schedule order
+    """
+    daemon = await DaemonClient.connect()
+    registry = GameRegistry(db_conn, source=daemon)
+
+    try:
+        _ids = await registry.schedule_ids(params=params)
+        return await registry.fetch(_ids, class_type)
+    finally:
+        if daemon is not None:
+            await daemon.close()
+
+
+def watch_games_echo(db_conn, params=None):
+    """Print the games then keep them current until every game is final."""
+    try:
+        asyncio.run(_watch(db_conn, params))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _watch(db_conn, params=None):
+    daemon = await DaemonClient.connect()
+    registry = GameRegistry(db_conn, source=daemon)
+
+    if daemon is not None:
+        # the daemon pushes the updates, polling below is a no-op
+        daemon.subscribe(registry.apply_feeds)
+
+    try:
+        _ids = await registry.schedule_ids(params=params)
+        games_list = await registry.fetch(_ids, 'banner')
+
+        build_norm_output(games_list)
+
+        rows = {game.game_id: i for i, game in enumerate(games_list)}
+        registry.subscribe(
+            lambda changes: echo_changed_rows(games_list, rows, changes)
+        )
+
+        # games are polled based on their state (see PollScheduler)
+        # nothing runs between polls
+        scheduler = PollScheduler(registry)
+        while not all(game.is_final for game in games_list):
+            await scheduler.poll()
+
+            wait = scheduler.time_until_next()
+            if wait is None:
+                break
+
+            await asyncio.sleep(wait)
+    finally:
+        if daemon is not None:
+            await daemon.close()
+
+
+def echo_changed_rows(g_list, rows, changes):
+    """
+    Output the rows of the games that changed. On a terminal the rows
+    printed by build_norm_output are redrawn in place, otherwise the
+    changed rows are printed again.
+
+    Args:
+        g_list (list): games in the order they were printed
+        rows (dict): game_id -> row index in g_list
+        changes (dict): game_id -> list of Change
+    """
+    changed = sorted(rows[_id] for _id in changes if _id in rows)
+
+    if not sys.stdout.isatty():
+        for i in changed:
+            click.echo(_norm_row(g_list[i]))
+        return
+
+    for i in changed:
+        up = len(g_list) - i
+        # move up to the row, clear and redraw it then move back down
+        click.echo(
+            f'\x1b[{up}A\r\x1b[2K{_norm_row(g_list[i])}\x1b[{up}B\r',
+            nl=False
+        )
+
+
+NORM_FORMAT = '{:^10} | {:^15} | {:^10}'
+
+
+def build_norm_output(g_list):
+    title = NORM_FORMAT.format('Away ', 'Period', 'Home')
     click.echo(title)
 
     for g in g_list:
-        _away = g.away.abbreviation + ' ' + str(g.away.goals)
-        _home = g.home.abbreviation + ' ' + str(g.home.goals)
+        click.echo(_norm_row(g))
+
 
-        if g.is_live or g.is_final:
-            _time = g.time + ' - ' + g.period
-        else:
-            _time = g.start_time
+def _norm_row(g) -> str:
+    _away = g.away.abbreviation + ' ' + str(g.away.goals)
+    _home = g.home.abbreviation + ' ' + str(g.home.goals)
 
-        output = gen_format.format(_away, _time, _home)
+    if g.is_live or g.is_final:
+        _time = g.time + ' - ' + g.period
+    else:
+        _time = g.start_time
 
-        click.echo(output)
+    return NORM_FORMAT.format(_away, _time, _home)
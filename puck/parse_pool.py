@@ -0,0 +1,80 @@
+"""
+Feed parsing in worker processes.
+
+Decoding a game feed and parsing it into box score rows (json.loads,
+parser.game, teams_skater_stats, player_stats_game and the arrow date
+conversions) is CPU bound. On the event loop it caps a backfill at one
+core. ParsePool runs it in a process pool instead: the fetchers only move
+bytes, the workers hand back the compact rows and the feed itself never
+comes back to the main process.
+"""
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import puck.boxscore as boxscore
+import puck.constants as const
+
+
+def game_record(raw) -> tuple:
+    """
+    Decode a Url.GAME response and parse it into the rows stored for it.
+    Runs in a worker process, everything it returns is pickled back.
+
+    Args:
+        raw (bytes): Url.GAME response body
+
+    Returns:
+        tuple: (game_id, boxscore.game_rows of the feed), the rows are None
+            when the game is not final
+    """
+    data = json.loads(raw)
+
+    if not boxscore.is_final(data):
+        return data['gamePk'], None
+
+    return data['gamePk'], boxscore.game_rows(data)
+
+
+class ParsePool(object):
+    """
+    Runs parsing functions in worker processes, with no workers they run
+    on the caller's event loop. Use as a context manager, the processes
+    are shut down when it is left.
+
+    Attributes:
+        workers (int): processes in the pool
+    """
+
+    def __init__(self, workers=const.PARSE_WORKERS):
+        self.workers = workers
+        self._executor = None
+        # submitted and not done, cancelled when the pool is left early
+        self._futures = set()
+
+    def __enter__(self):
+        if self.workers:
+            self._executor = ProcessPoolExecutor(self.workers)
+
+        return self
+
+    def __exit__(self, *exc):
+        if self._executor is not None:
+            # shutdown(cancel_futures=True) needs python 3.9
+            for future in list(self._futures):
+                future.cancel()
+
+            self._executor.shutdown()
+            self._executor = None
+
+    async def run(self, func, *args):
+        """func(*args) in a worker process. func and its arguments must be
+        picklable, i.e. module level functions and plain data."""
+        if self._executor is None:
+            return func(*args)
+
+        future = self._executor.submit(func, *args)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+
+        return await asyncio.wrap_future(future)
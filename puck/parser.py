@@ -98,7 +98,8 @@ def player_info(data) -> defaultdict:
     parsed_data = defaultdict(lambda: None)
 
     parsed_data['player_id'] = data_copy['id']
-    parsed_data['team_id'] = data_copy['currentTeam']['id']
+    # players on no roster, i.e. free agents, have no current team
+    parsed_data['team_id'] = data_copy.get('currentTeam', {}).get('id')
     parsed_data['first_name'] = data_copy['firstName']
     parsed_data['last_name'] = data_copy['lastName']
     parsed_data['number'] = data_copy.get('primaryNumber', None)
@@ -0,0 +1,233 @@
+"""
+Staged pipeline for bulk ingestion, i.e. fetch -> parse -> write.
+
+Each Stage has its own pool of workers and a bounded inbox. A handler
+returns the items for the next stage, putting them blocks while that
+stage's inbox is full so a slow stage holds back the ones before it instead
+of letting work pile up in memory.
+
+Handlers can discover more work (a roster's players) and hand it back to
+the first stage with Pipeline.submit, which never blocks. The pipeline
+counts every item until the last stage is done with it, so it knows when
+it is finished without end of data markers and shuts its workers down.
+"""
+import asyncio
+import sys
+import time
+from collections import deque
+
+_END = object()
+
+
+class StageStats(object):
+    """
+    Attributes:
+        processed (int): items handled
+        busy (float): seconds workers spent in the handler
+        idle (float): seconds workers spent waiting for an item
+        blocked (float): seconds workers spent waiting on a full inbox of
+            the next stage (back-pressure)
+        max_depth (int): the most items seen waiting in the inbox
+    """
+    __slots__ = ('processed', 'busy', 'idle', 'blocked', 'max_depth')
+
+    def __init__(self):
+        self.processed = 0
+        self.busy = 0.0
+        self.idle = 0.0
+        self.blocked = 0.0
+        self.max_depth = 0
+
+
+class Stage(object):
+    """
+    One step of a Pipeline.
+
+    Attributes:
+        name (str): shown in the stats
+        handler (coroutine function): item -> list of items for the next
+            stage, the last stage's result is ignored
+        workers (int): handlers running at once
+        queue (asyncio.Queue): inbox, holds at most maxsize items
+        stats (StageStats)
+    """
+
+    def __init__(self, name, handler, workers=1, maxsize=64):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.maxsize = maxsize
+        self.queue = None
+        self.stats = StageStats()
+
+    @property
+    def depth(self) -> int:
+        """Items waiting in the inbox."""
+        return self.queue.qsize() if self.queue is not None else 0
+
+
+class Pipeline(object):
+    """
+    Runs items through stages in order.
+
+    Attributes:
+        stages (list of Stage)
+        elapsed (float): seconds the last run took
+    """
+
+    def __init__(self, stages):
+        self.stages = stages
+        self.elapsed = 0.0
+        # submitted by handlers, fed to the first stage before new items
+        self._followups = deque()
+        # items inside the pipeline, followups included
+        self._in_flight = 0
+        self._wake = None
+        self._feeder = None
+        self._error = None
+
+    def submit(self, item):
+        """Hand more work to the first stage. Never blocks, the work waits
+        here until the first stage has room."""
+        self._in_flight += 1
+        self._followups.append(item)
+        self._wake.set()
+
+    async def run(self, items):
+        """
+        Run items and everything they lead to through the pipeline.
+
+        Args:
+            items (iterable): items for the first stage
+
+        Raises:
+            Exception: the first exception raised by a handler, the
+                pipeline is stopped when it happens
+        """
+        self._wake = asyncio.Event()
+        self._error = None
+        start = time.monotonic()
+
+        for stage in self.stages:
+            stage.queue = asyncio.Queue(stage.maxsize)
+            stage.stats = StageStats()
+
+        workers = [
+            asyncio.ensure_future(self._work(i))
+            for i, stage in enumerate(self.stages)
+            for _ in range(stage.workers)
+        ]
+
+        self._feeder = asyncio.ensure_future(self._feed(iter(items)))
+        try:
+            await self._feeder
+        except asyncio.CancelledError:
+            # stopped by a failing handler, anything else is passed on
+            if self._error is None:
+                raise
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+            self.elapsed = time.monotonic() - start
+
+        if self._error is not None:
+            raise self._error
+
+    def stats(self) -> list:
+        """Per stage dicts of name, workers, processed, rate (items/s),
+        busy, idle and blocked (seconds summed over the stage's workers),
+        depth and max_depth."""
+        return [{
+            'name': stage.name,
+            'workers': stage.workers,
+            'processed': stage.stats.processed,
+            'rate': stage.stats.processed / self.elapsed if self.elapsed else 0.0,  # noqa
+            'busy': stage.stats.busy,
+            'idle': stage.stats.idle,
+            'blocked': stage.stats.blocked,
+            'depth': stage.depth,
+            'max_depth': stage.stats.max_depth,
+        } for stage in self.stages]
+
+    def print_stats(self, file=sys.stderr):
+        """Table of stats(), for tuning workers and queue sizes."""
+        row = '{:<10} | {:>7} | {:>9} | {:>8} | {:>8} | {:>8} | {:>8} | {:>9}'
+        print(row.format(
+            'Stage', 'Workers', 'Processed', 'Items/s', 'Busy s', 'Idle s',
+            'Blocked s', 'Max depth'
+        ), file=file)
+
+        for stage, stat in zip(self.stages, self.stats()):
+            print(row.format(
+                stat['name'], stat['workers'], stat['processed'],
+                f'{stat["rate"]:.1f}', f'{stat["busy"]:.1f}',
+                f'{stat["idle"]:.1f}', f'{stat["blocked"]:.1f}',
+                f'{stat["max_depth"]}/{stage.maxsize}'
+            ), file=file)
+
+    async def _feed(self, items):
+        # the only producer of the first stage, follow ups go first so
+        # work is finished depth first
+        first = self.stages[0].queue
+        seeded = False
+
+        while True:
+            if self._followups:
+                item = self._followups.popleft()
+            elif not seeded:
+                item = next(items, _END)
+                if item is _END:
+                    seeded = True
+                    continue
+                self._in_flight += 1
+            elif self._in_flight == 0:
+                return
+            else:
+                # woken by a submit or the last item finishing
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+
+            await first.put(item)
+
+    async def _work(self, index):
+        stage = self.stages[index]
+        queue = stage.queue
+        nxt = self.stages[index + 1].queue \
+            if index + 1 < len(self.stages) else None
+        stats = stage.stats
+
+        while True:
+            waited = time.monotonic()
+            item = await queue.get()
+            began = time.monotonic()
+            stats.idle += began - waited
+            stats.max_depth = max(stats.max_depth, queue.qsize() + 1)
+
+            try:
+                results = await stage.handler(item)
+            except Exception as err:
+                self._fail(err)
+                return
+
+            stats.busy += time.monotonic() - began
+            stats.processed += 1
+
+            if nxt is not None and results:
+                self._in_flight += len(results)
+                began = time.monotonic()
+                for result in results:
+                    await nxt.put(result)
+                stats.blocked += time.monotonic() - began
+
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._wake.set()
+
+    def _fail(self, err):
+        if self._error is None:
+            self._error = err
+        # the feeder may be waiting on a stage nobody is taking from
+        self._feeder.cancel()
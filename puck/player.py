@@ -1,12 +1,13 @@
-import asyncio
 from collections import UserList
 
+import puck.boxscore as boxscore
 import puck.utils as utils
-from puck.urls import Url
-from puck.database.db import select_stmt, batch_update_db, execute_constant
+from puck.database.db import (select_stmt, select_any_stmt, batch_update_db,
+                              execute_constant)
 import puck.database.db_constants as db_const
 from puck.dispatcher import Dispatch
 import puck.parser as parser
+from puck.request_queue import Priority
 
 
 class BasePlayer(object):
@@ -24,8 +25,12 @@ class BasePlayer(object):
         rookie (bool): Is the player a rookie
         age (int): player's age
     """
+    __slots__ = (
+        'db_conn', 'player_id',
+        *db_const.TableColumns.BASE_PLAYER_CLASS.value
+    )
 
-    def __init__(self, db_conn, player_id, parsed_data=None):
+    def __init__(self, db_conn, player_id, parsed_data=None, player_row=None):
         """
         Args:
             db_conn (psycopg2.Connection): Database connection
@@ -33,15 +38,21 @@ class BasePlayer(object):
             parsed_data (dict or defaultdict, optional):
                 dictionary of data retrieved from parser function.
                 Defaults to None.
+            player_row (DictRow, optional): row of the player table already
+                fetched (see fetch_player_rows). Defaults to None.
         """
         self.db_conn = db_conn
         self.player_id = player_id
 
-        # get info from player_info table
-        resp = select_stmt(
-            self.db_conn, 'player', db_const.TableColumns.BASE_PLAYER_CLASS,
-            where=('player_id', self.player_id)
-        )[0]
+        if player_row is not None:
+            resp = player_row
+        else:
+            # get info from player_info table
+            resp = select_stmt(
+                self.db_conn, 'player',
+                db_const.TableColumns.BASE_PLAYER_CLASS,
+                where=('player_id', self.player_id)
+            )[0]
 
         # set the attributes from the keys
         for key in resp.keys():
@@ -56,7 +67,7 @@ class BasePlayer(object):
         raise NotImplementedError()
 
     def __repr__(self):
-        return f'{self.__class__} -> {self.__dict__}'
+        return f'{self.__class__} -> {utils.attrs_dict(self)}'
 
 
 class GamePlayer(BasePlayer):
@@ -88,48 +99,66 @@ class GamePlayer(BasePlayer):
         ev_toi (str)
         pp_toi (str)
         sh_toi (str)
-    """
 
-    def __init__(self, db_conn, player_id, parsed_data):
+    Goalies hold the goalie_stats_game keys instead of the skater only ones.
+    """
+    # union of the keys returned by parser.skater_stats_game
+    # and parser.goalie_stats_game
+    __slots__ = (
+        'time_on_ice', 'assists', 'goals', 'pims', 'shots', 'hits',
+        'pp_goals', 'sh_goals', 'ev_goals', 'pp_assists', 'sh_assists',
+        'ev_assists', 'faceoff_pct', 'faceoff_wins', 'faceoff_taken',
+        'takeaways', 'giveaways', 'blocked', 'plus_minus', 'ev_toi', 'pp_toi',
+        'sh_toi', 'shots_against', 'saves', 'pp_saves', 'sh_saves',
+        'ev_saves', 'sh_shots', 'ev_shots', 'pp_shots', 'decision',
+        'save_pct', 'pp_save_pct', 'sh_save_pct', 'ev_save_pct'
+    )
+
+    def __init__(self, db_conn, player_id, parsed_data, player_row=None):
         """
         Args:
             db_conn (psycopg2.Connection): Database connection
             player_id (int): Player ID
             parsed_data (dict or defaultdict):
                 dictionary of data retrieved from parser function.
+            player_row (DictRow, optional): pre-fetched player table row.
         """
 
-        super().__init__(db_conn, player_id=player_id, parsed_data=parsed_data)
+        super().__init__(
+            db_conn, player_id=player_id, parsed_data=parsed_data,
+            player_row=player_row
+        )
 
     def update_data(self, data):
+        """Returns the list of Change made by the update."""
         pd = parser.player_stats_game(data)
 
-        for key, val in pd.items():
-            if hasattr(self, key):
-                setattr(self, key, val)
-            else:
-                raise AttributeError(
-                    f'Player Update received an attribute {key} of type \
-                    {type(key)} that has not been set. {dir(self)} \
-                    ID = {self.player_id}'
-                )
+        # scratched players have no stats to update
+        if pd is None:
+            return []
+
+        return utils.diff_update(self, pd)
 
 
 class FullPlayer(BasePlayer):
     """Holds Career and Season Stats."""
 
-    def __init__(self, db_conn, player_id, parsed_data=None):
+    def __init__(self, db_conn, player_id, parsed_data=None, player_row=None):
         """
         Args:
             db_conn (psycopg2.Connection): Database connection
             player_id (int): Player ID
             parsed_data (dict or defaultdict):
                 dictionary of data retrieved from parser function.
+            player_row (DictRow, optional): pre-fetched player table row.
         """
-        super().__init__(db_conn, player_id=player_id, parsed_data=parsed_data)
+        super().__init__(
+            db_conn, player_id=player_id, parsed_data=parsed_data,
+            player_row=player_row
+        )
 
     def update_data(self, data):
-        pass
+        return []
 
 
 class PlayerCollection(object):
@@ -141,46 +170,46 @@ class PlayerCollection(object):
         need_to_update (list): list of ID's of players who are no longer
                                on the team
         _class (BasePlayer): PlayerClass to instantiate
-        players (list of BasePlayer): The actual holder of player objects
-        forwards (list of int): A list holding indexes of self.players to
-                                which are forwards
-        defense (list of int): see forwards
-        goalies (list of int): see forwards
-        not_playing (list of int): see forwards
-        player_ids (list of int): list of player ID's
+        players (dict): player_id -> BasePlayer, the actual holder of
+                        player objects
+        forwards (list of BasePlayer): players who are forwards
+        defense (list of BasePlayer): see forwards
+        goalie_list (list of BasePlayer): see forwards
+        not_playing (list of BasePlayer): see forwards
+        player_ids (set of int): set of player ID's
+        box_keys (dict): player_id -> key of the player in the boxscore
 
     NOTE: player_ids, need_to_update will be empty when the player class
     is actually created.
     """
 
-    def __init__(self, team, id_list, _class=BasePlayer):
+    def __init__(self, team, id_list, _class=BasePlayer, roster=None):
         """
         Args:
             team (BaseTeam): Team Object
             id_list (list of int): list of player ids
             _class (BasePlayer, optional): Player class to instantiate.
                 Defaults to BasePlayer.
+            roster (iterable of int, optional): ids the player table has on
+                the team, from fetch_rosters. Queried when None.
         """
         self.db_conn = team.game.db_conn  # db_conn
         self.team = team    # team object associated with collection
         self.need_to_update = []  # list of players who need to be updated
         self._class = _class      # Player class type
-        self.players = []         # Player objs list
-        self.forwards = []        # list of indexes that points to self.players
+        self.players = {}         # player_id -> Player obj
+        self.forwards = []        # position buckets of Player objs
         self.defense = []
-        self.goalies = []
+        self.goalie_list = []
         self.not_playing = []
 
-        team_roster = select_stmt(
-            self.db_conn, 'player', columns=['player_id'],
-            where=('team_id', team.team_id)
-        )
+        if roster is None:
+            roster = fetch_rosters(self.db_conn, [team.team_id])[team.team_id]
 
         id_set = set(id_list)
         db_set = set()
-        for row in team_roster:
-            # for each row returned from database check if they are on the team
-            player = int(row['player_id'])
+        for player in roster:
+            # for each player in the database check if they are on the team
 
             if player not in id_set:
                 # this player is no longer on the team or in the AHL
@@ -197,77 +226,105 @@ class PlayerCollection(object):
         # to populate all games players
         self.player_ids = id_set
 
-    def get_player(self, player_id) -> BasePlayer:
-        """Return a player object based on player_id passed"""
-        # if we havent created players
-        if not self.players:
-            self.create_players()
+        # boxscore keys are built once instead of on every update
+        self.box_keys = {_id: 'ID' + str(_id) for _id in id_set}
 
-        for player in self.players:
-            if player.player_id == player_id:
-                return player
-
-        raise KeyError('No player id' + str(player_id))
+    def get_player(self, player_id) -> BasePlayer:
+        """Return a player object based on player_id passed. The players
+        have to be created first, see create_players."""
+        try:
+            return self.players[player_id]
+        except KeyError:
+            raise KeyError('No player id' + str(player_id))
 
     def skaters(self):
         """Iterable of skaters in a collection"""
         # combine forwards and defense
-        skaters = self.forwards + self.defense
-        for skater in skaters:
-            yield self.players[skater]
+        yield from self.forwards
+        yield from self.defense
 
     def goalies(self):
         """Iterable of goalies in Collection"""
-        for goalie in self.goalies:
-            yield self.players[goalie]
+        yield from self.goalie_list
 
-    def create_players(self, data=None):
+    async def create_players(self, data=None, player_rows=None):
         """Utility method so we can have control on when to call
-        the expensive create logic."""
+        the expensive create logic. Awaited on the caller's event loop,
+        roster replacements are requested without blocking it.
+
+        Args:
+            data (dict, optional): JSON rep of the game. Defaults to None.
+                A stored final game (see puck.boxscore) is read from the
+                database instead of requested.
+            player_rows (dict, optional): player_id -> player table row,
+                from fetch_player_rows. Allows one query to serve several
+                rosters. Any player not found is fetched in a single query.
+        """
 
         if self.players:
             return
 
-        if not data:
-            data = utils.request(
-                Url.GAME, {'game_id': self.team.game.game_id}
+        stat_rows = None
+        if not data and self._class == GamePlayer and self.team.game.is_final:
+            stat_rows = boxscore.fetch_player_stat_rows(
+                self.db_conn, self.team.game.game_id, self.team.team_type
             )
 
+        if not data and not stat_rows:
+            data = await utils.async_game_request(self.team.game.game_id)
+
         # cant use isinstance of.
-        if self._class == GamePlayer:
+        if stat_rows:
+            data_copy = None
+        elif self._class == GamePlayer:
             data_copy = data['liveData']['boxscore']['teams'][self.team.team_type]['players']  # noqa
         else:
             data_copy = data
 
+        # rows of replaced players are stale once the update has run
+        stale = set(self.need_to_update)
+
         # this should always hit
         # unless no changes were deemed necessary at init
         if self.need_to_update:
-            self.replace_players()
+            await self.replace_players()
 
-        index = 0
-        for player in self.player_ids:
-            # strip off the ID part
-            player_data = data_copy['ID' + str(player)]
+        if player_rows is None:
+            player_rows = {}
+
+        # one query for every player we don't already have a row for
+        missing = (self.player_ids - player_rows.keys()) | \
+            (stale & self.player_ids)
+        if missing:
+            player_rows = {
+                **player_rows, **fetch_player_rows(self.db_conn, missing)
+            }
 
+        for player in self.player_ids:
             # parse and create player
-            pd = parser.player_stats_game(player_data)
-            player_obj = self._class(self.db_conn, player, pd)
+            if stat_rows:
+                row = stat_rows.get(player)
+                pd = boxscore.player_stats(row) if row else None
+            else:
+                player_data = data_copy[self.box_keys[player]]
+                pd = parser.player_stats_game(player_data)
+            player_obj = self._class(
+                self.db_conn, player, pd, player_row=player_rows[player]
+            )
 
             # if a player is scratched parser returns None
             if pd is not None:
-                # keep index pointers for each player object in self.players
+                # bucket each player object by position
                 if player_obj.position == 'G':
-                    self.goalies.append(index)
+                    self.goalie_list.append(player_obj)
                 elif player_obj.position == 'D':
-                    self.defense.append(index)
+                    self.defense.append(player_obj)
                 else:
-                    self.forwards.append(index)
+                    self.forwards.append(player_obj)
             else:
-                self.not_playing.append(index)
+                self.not_playing.append(player_obj)
 
-            # increment index and add the player_obj
-            index += 1
-            self.players.append(player_obj)
+            self.players[player] = player_obj
 
     def top_scorers(self):
         ts = execute_constant(
@@ -305,36 +362,82 @@ class PlayerCollection(object):
         }
 
     def update_data(self, data):
+        """Returns the list of Change, prefixed by player_id."""
 
         if self._class == GamePlayer:
             data_copy = data['liveData']['boxscore']['teams'][self.team.team_type]['players']  # noqa
         else:
             data_copy = data
 
-        # this should never be true but just in case
-        if self.need_to_update:
-            self.replace_players()
+        changes = []
+        # basically a noop if players is empty.
+        for player_id, player in self.players.items():
+            changes.extend(utils.prefix_changes(
+                player_id,
+                player.update_data(data_copy[self.box_keys[player_id]])
+            ))
 
-        # basically a noop if players is empty list.
-        if self.players:
-            for player in self.players:
-                player_data = data_copy['ID' + str(player.player_id)]
-                player.update_data(player_data)
+        return changes
 
-    def replace_players(self):
+    async def replace_players(self, priority=Priority.INTERACTIVE):
         """
-        Since we cannot effectively update players in an async loop
-        Have a designated function to do so. This should be called as soon
-        as possible.
+        Update the database rows of the players in need_to_update. Awaited
+        on the caller's event loop, blocking it instead would hold on to
+        the REQUEST_QUEUE slots its own tasks need to finish.
         """
         if not self.need_to_update:
             return
 
-        # update the database
-        asyncio.run(
-            batch_update_db(
-                self.need_to_update, self.db_conn,
-                Dispatch.player_info
-            )
+        await batch_update_db(
+            self.need_to_update, self.db_conn, Dispatch.player_info, priority
         )
         self.need_to_update = []
+
+
+def fetch_player_rows(db_conn, player_ids) -> dict:
+    """Bulk fetch of player table rows. Used to create many player objects
+    without a query per player.
+
+    Args:
+        db_conn (psycopg2.Connection): Database connection
+        player_ids (iterable of int): Player IDs to fetch
+
+    Returns:
+        dict: player_id -> DictRow of TableColumns.BASE_PLAYER_CLASS
+    """
+    player_ids = list(player_ids)
+    if not player_ids:
+        return {}
+
+    rows = select_any_stmt(
+        db_conn, 'player', 'player_id', player_ids,
+        columns=['player_id', *db_const.TableColumns.BASE_PLAYER_CLASS.value]
+    ) or []
+
+    return {row['player_id']: row for row in rows}
+
+
+def fetch_rosters(db_conn, team_ids) -> dict:
+    """Bulk fetch of the players the player table has on each team. Used to
+    build several PlayerCollections with one query.
+
+    Args:
+        db_conn (psycopg2.Connection): Database connection
+        team_ids (iterable of int): Team IDs to fetch
+
+    Returns:
+        dict: team_id -> set of player ids, empty for a team without any
+    """
+    rosters = {team_id: set() for team_id in team_ids}
+    if not rosters:
+        return rosters
+
+    rows = select_any_stmt(
+        db_conn, 'player', 'team_id', rosters,
+        columns=['player_id', 'team_id']
+    )
+
+    for row in rows or []:
+        rosters[row['team_id']].add(int(row['player_id']))
+
+    return rosters
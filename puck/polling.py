@@ -0,0 +1,175 @@
+"""
+Adaptive polling for game objects. Each game is assigned a poll interval
+based on its state so the amount of requests follows what is actually
+happening: live games are polled often, intermissions less, previews
+slow down the further they are from puck drop. Finals, postponed games and
+games that did not start within PRE_GAME_MAX of their start time are never
+polled.
+"""
+import asyncio
+import sys
+import time
+
+import arrow
+
+import puck.constants as const
+
+
+class PollScheduler(object):
+    """
+    Schedules updates for every game held by a GameRegistry.
+
+    Attributes:
+        registry (GameRegistry): holder of the game objects
+        next_poll (dict): game_id -> monotonic time the game is due,
+            None if the game is never polled again
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.next_poll = {}
+
+    @staticmethod
+    def state(game) -> str:
+        """The polling state of a game."""
+        if game.is_final:
+            return 'final'
+        elif game.game_status in const.GAME_STATUS['Postponed']:
+            return 'postponed'
+        elif game.is_live:
+            if game.in_intermission:
+                return 'intermission'
+            return 'live'
+        elif arrow.now() >= game.game_date:
+            late = (arrow.now() - game.game_date).total_seconds()
+            if late > const.PRE_GAME_MAX:
+                return 'delayed'
+            return 'pre_game'
+        else:
+            return 'preview'
+
+    @classmethod
+    def interval(cls, game):
+        """Seconds until a game should be polled again or None for never."""
+        state = cls.state(game)
+
+        if state == 'preview':
+            to_start = (game.game_date - arrow.now()).total_seconds()
+            return min(
+                max(to_start / 2, const.POLL_INTERVAL['preview_min']),
+                const.POLL_INTERVAL['preview_max']
+            )
+
+        return const.POLL_INTERVAL[state]
+
+    def schedule(self, game, now=None):
+        """(Re)schedule a game relative to now."""
+        if now is None:
+            now = time.monotonic()
+
+        interval = self.interval(game)
+
+        if interval is None:
+            self.next_poll[game.game_id] = None
+        else:
+            self.next_poll[game.game_id] = now + interval
+
+    def discard(self, game_ids):
+        """Stop polling games, i.e. once the registry dropped them."""
+        for _id in game_ids:
+            self.next_poll.pop(_id, None)
+
+    def due(self, now=None) -> list:
+        """Game ids that are due to be polled. Games registered since the
+        last call are scheduled first."""
+        if now is None:
+            now = time.monotonic()
+
+        for game_id, game in self.registry.games.items():
+            if game_id not in self.next_poll:
+                self.schedule(game, now)
+
+        return [
+            game_id for game_id, due in self.next_poll.items()
+            if due is not None and due <= now
+        ]
+
+    def time_until_next(self, now=None):
+        """Seconds until the next game is due or None if nothing is left."""
+        if now is None:
+            now = time.monotonic()
+
+        # make sure newly registered games are counted
+        self.due(now)
+
+        pending = [due for due in self.next_poll.values() if due is not None]
+        if not pending:
+            return None
+
+        return max(min(pending) - now, 0)
+
+    async def poll(self, now=None) -> dict:
+        """
+        Update every due game in one fetch cycle and reschedule them.
+
+        Returns:
+            dict: game_id -> list of Change for games that changed
+        """
+        if now is None:
+            now = time.monotonic()
+
+        due = self.due(now)
+        if not due:
+            return {}
+
+        changes = await self.registry.update(due)
+
+        # games discarded while the update was in flight are not polled
+        for game_id in due:
+            if game_id in self.registry:
+                self.schedule(self.registry.get(game_id))
+
+        return changes
+
+    def snapshot(self, now=None) -> list:
+        """Current schedule for inspection.
+
+        Returns:
+            list of dict: game_id, state, interval and seconds until due
+                (None when never polled again), soonest first.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        self.due(now)
+
+        rows = []
+        for game_id, due in self.next_poll.items():
+            game = self.registry.get(game_id)
+            rows.append({
+                'game_id': game_id,
+                'state': self.state(game),
+                'interval': self.interval(game),
+                'due_in': None if due is None else max(due - now, 0)
+            })
+
+        return sorted(
+            rows,
+            key=lambda r: float('inf') if r['due_in'] is None else r['due_in']
+        )
+
+
+async def poll_forever(scheduler):
+    """Poll the scheduler's due games until cancelled. Used by the long
+    running commands (daemon, serve), failed polls are retried."""
+    while True:
+        try:
+            await scheduler.poll()
+        except Exception as err:
+            print(f'Poll failed: {err}', file=sys.stderr)
+
+        wait = scheduler.time_until_next()
+        if wait is None or wait > const.POLL_INTERVAL['live']:
+            wait = const.POLL_INTERVAL['live']
+
+        await asyncio.sleep(wait)
@@ -0,0 +1,167 @@
+"""
+Priority scheduling for API requests. Every async request waits for a slot
+in the shared REQUEST_QUEUE, the request the user is waiting on is granted
+the next free slot ahead of refreshes, prefetches and bulk ingestion.
+Bulk ingestion is never given every slot so it always yields to the others.
+"""
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+
+import puck.constants as const
+
+
+class Priority(IntEnum):
+    """Request classes, lowest value is served first.
+
+    INTERACTIVE: the user is waiting on the result (i.e. opening a game)
+    REFRESH: polling of data already on screen
+    PREFETCH: data fetched before it is shown (i.e. roster replacements)
+    BULK: database ingestion
+    """
+    INTERACTIVE = 0
+    REFRESH = 1
+    PREFETCH = 2
+    BULK = 3
+
+
+class _Waiter(object):
+    __slots__ = (
+        'priority', 'loop', 'future', 'queued', 'granted', 'cancelled'
+    )
+
+    def __init__(self, priority, loop, future):
+        self.priority = priority
+        self.loop = loop
+        self.future = future
+        self.queued = time.monotonic()
+        self.granted = False
+        self.cancelled = False
+
+
+class RequestQueue(object):
+    """
+    Limits the number of requests in flight and grants free slots by
+    priority then arrival. Safe to share between event loops running in
+    different threads, a waiter is woken on its own loop.
+
+    Attributes:
+        max_active (int): requests allowed in flight
+        bulk_max (int): requests in flight allowed for Priority.BULK
+        active (int): requests in flight
+        active_bulk (int): Priority.BULK requests in flight
+        waiting (list): heap of (priority, arrival, _Waiter)
+        latency (dict): Priority -> [count, total seconds, max seconds]
+            spent waiting for a slot
+    """
+
+    def __init__(self, max_active=const.REQUEST_SLOTS['max_active'],
+                 bulk_max=const.REQUEST_SLOTS['bulk_max']):
+        self.max_active = max_active
+        self.bulk_max = min(bulk_max, max_active)
+        self.active = 0
+        self.active_bulk = 0
+        self.waiting = []
+        self.latency = {p: [0, 0.0, 0.0] for p in Priority}
+
+        self._arrival = itertools.count()
+        self._lock = threading.Lock()
+
+    @asynccontextmanager
+    async def slot(self, priority=Priority.REFRESH):
+        """Hold a request slot for the duration of the block."""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    async def acquire(self, priority=Priority.REFRESH):
+        """Wait until a slot is granted to priority."""
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority, loop, loop.create_future())
+
+        with self._lock:
+            heapq.heappush(
+                self.waiting, (priority, next(self._arrival), waiter)
+            )
+            self._grant()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    # granted as the task was cancelled, give the slot back
+                    self._release(priority)
+                else:
+                    waiter.cancelled = True
+            raise
+
+    def release(self, priority=Priority.REFRESH):
+        with self._lock:
+            self._release(priority)
+
+    def stats(self) -> dict:
+        """Time spent waiting for a slot per class.
+
+        Returns:
+            dict: class name -> dict of count, mean and max in seconds
+        """
+        with self._lock:
+            return {
+                p.name.lower(): {
+                    'count': count,
+                    'mean': total / count if count else 0.0,
+                    'max': _max
+                }
+                for p, (count, total, _max) in self.latency.items()
+            }
+
+    def _release(self, priority):
+        self.active -= 1
+        if priority == Priority.BULK:
+            self.active_bulk -= 1
+
+        self._grant()
+
+    def _grant(self):
+        # caller holds the lock
+        while self.waiting and self.active < self.max_active:
+            priority, _, waiter = self.waiting[0]
+
+            if waiter.cancelled:
+                heapq.heappop(self.waiting)
+                continue
+
+            # everything else is served first, bulk waits for its share
+            if priority == Priority.BULK and \
+                    self.active_bulk >= self.bulk_max:
+                return
+
+            heapq.heappop(self.waiting)
+            self.active += 1
+            if priority == Priority.BULK:
+                self.active_bulk += 1
+
+            waited = time.monotonic() - waiter.queued
+            stat = self.latency[priority]
+            stat[0] += 1
+            stat[1] += waited
+            stat[2] = max(stat[2], waited)
+
+            waiter.granted = True
+            waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+# shared by every request the app makes
+REQUEST_QUEUE = RequestQueue()
@@ -0,0 +1,395 @@
+"""
+`puck serve`, a local HTTP JSON API over the game registry and database.
+
+Endpoints
+    GET /games?date=YYYY-MM-DD          banner state of a day's games
+    GET /games/{game_id}                full state of a game
+    GET /games/{game_id}/changes        long-poll, see PuckServer.changes
+    GET /teams/{team_id}/ranks          team season stats and league ranks
+    GET /teams/{team_id}/top-scorers    team's season leaders
+
+Responses are rendered once and kept in memory with a strong ETag. Game
+responses are dropped as soon as the registry reports a change, the rest
+expire (see constants.SERVE_TTL). A request with a matching If-None-Match
+receives a 304 without a body.
+
+Games are dropped from the registry, and no longer polled, once they are
+the least recently requested past SERVE_GAMES['max_games'] or have not
+been requested for SERVE_GAMES['ttl'] seconds.
+"""
+import asyncio
+import datetime
+import decimal
+import hashlib
+import json
+import time
+from collections import OrderedDict
+
+import arrow
+from aiohttp import web
+
+import puck.constants as const
+import puck.database.db_constants as db_const
+from puck.daemon import DaemonClient
+from puck.database.db import execute_constant
+from puck.games import GameIDException, GameRegistry
+from puck.polling import PollScheduler, poll_forever
+from puck.teams import TeamSeasonStats
+from puck.utils import attrs_dict, get_season_number
+
+# back references and database backed objects are not part of the response
+EXCLUDED = ('db_conn', 'game', 'players')
+
+
+class CachedResponse(object):
+    """Pre-rendered response body.
+
+    Attributes:
+        body (bytes): JSON body
+        etag (str): strong ETag of body
+        game_ids (set): games the body was rendered from
+        expires (float or None): monotonic expiry, None if only dropped
+            by a change to one of game_ids
+    """
+    __slots__ = ('body', 'etag', 'game_ids', 'expires')
+
+    def __init__(self, data, game_ids=(), ttl=None):
+        self.body = json.dumps(
+            data, sort_keys=True, default=_default
+        ).encode()
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest() + '"'
+        self.game_ids = set(game_ids)
+        self.expires = None if ttl is None else time.monotonic() + ttl
+
+    @property
+    def expired(self) -> bool:
+        return self.expires is not None and time.monotonic() >= self.expires
+
+
+class PuckServer(object):
+    """
+    Attributes:
+        db_conn (psycopg2.Connection): Database connection
+        registry (GameRegistry): games served, polled by scheduler
+        scheduler (PollScheduler): keeps the registry's games current
+        cache (dict): request key -> CachedResponse
+        requested (OrderedDict): game_id -> monotonic time of the last
+            request for it, least recent first
+    """
+
+    def __init__(self, db_conn, source=None):
+        """
+        Args:
+            db_conn (psycopg2.Connection): Database connection
+            source (DaemonClient, optional): a running daemon's client,
+                updates are pushed instead of polled. Defaults to None.
+        """
+        self.db_conn = db_conn
+        self.registry = GameRegistry(db_conn, source=source)
+        self.registry.subscribe(self.on_game_changes)
+        self.scheduler = PollScheduler(self.registry)
+        self.cache = {}
+        self.requested = OrderedDict()
+        # request key -> render in progress, concurrent misses share it
+        self._rendering = {}
+
+        if source is not None:
+            source.subscribe(self.registry.apply_feeds)
+
+        # set and replaced on every change, wakes the long-polls
+        self._changed = asyncio.Event()
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.get('/games', self.games),
+            web.get('/games/{game_id}', self.game),
+            web.get('/games/{game_id}/changes', self.changes),
+            web.get('/teams/{team_id}/ranks', self.team_ranks),
+            web.get('/teams/{team_id}/top-scorers', self.top_scorers),
+        ])
+        app.on_startup.append(self._start_polling)
+        app.on_cleanup.append(self._stop_polling)
+
+        return app
+
+    def on_game_changes(self, changes):
+        """Drop every response rendered from a changed game."""
+        for key in [
+            key for key, resp in self.cache.items()
+            if not resp.game_ids.isdisjoint(changes)
+        ]:
+            del self.cache[key]
+
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+# -------------------------- Handlers --------------------------#
+    async def games(self, request):
+        date = request.query.get('date', arrow.now().format('YYYY-MM-DD'))
+
+        async def render():
+            _ids = await self.registry.schedule_ids(params={'date': date})
+            games = await self.registry.fetch(_ids, 'banner')
+            self._touch(_ids)
+
+            # the day's list changes as the schedule does
+            return CachedResponse(
+                [game_json(game) for game in games], _ids,
+                const.SERVE_TTL['schedule']
+            )
+
+        resp = await self._cached(('games', date), render)
+        self._touch(resp.game_ids)
+
+        return _respond(request, resp)
+
+    async def game(self, request):
+        resp = await self._game_response(_int_param(request, 'game_id'))
+
+        return _respond(request, resp)
+
+    async def changes(self, request):
+        """
+        Long-poll of a game. Held until the game's ETag differs from
+        If-None-Match or ?timeout= seconds (max SERVE_LONG_POLL) pass,
+        in which case a 304 is returned.
+        """
+        game_id = _int_param(request, 'game_id')
+        etag = request.headers.get('If-None-Match')
+
+        try:
+            timeout = min(
+                float(request.query.get('timeout', const.SERVE_LONG_POLL)),
+                const.SERVE_LONG_POLL
+            )
+        except ValueError:
+            raise web.HTTPBadRequest(text='timeout must be a number')
+
+        deadline = time.monotonic() + timeout
+
+        resp = await self._game_response(game_id)
+        while resp.etag == etag and not self.registry.get(game_id).is_final:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+
+            resp = await self._game_response(game_id)
+
+        return _respond(request, resp)
+
+    async def team_ranks(self, request):
+        team_id = _team_param(request)
+
+        async def render():
+            stats = execute_constant(
+                self.db_conn, db_const.TEAM_RANKED_SELECT.format(
+                    get_season_number(arrow.now())
+                )
+            )
+            team = TeamSeasonStats(
+                team_id, self.db_conn, stats[const.TEAM_INDEX[team_id]]
+            )
+
+            return CachedResponse(
+                {
+                    'team_id': team_id,
+                    'abbreviation': team.abbreviation,
+                    'stats': {
+                        stat.name: {'value': stat.value, 'rank': stat.rank}
+                        for stat in team.all_items()
+                    }
+                },
+                ttl=const.SERVE_TTL['team']
+            )
+
+        return _respond(
+            request, await self._cached(('ranks', team_id), render)
+        )
+
+    async def top_scorers(self, request):
+        team_id = _team_param(request)
+
+        async def render():
+            rows = execute_constant(
+                self.db_conn, db_const.TOP_SCORER_TEAM.format(
+                    team_id, get_season_number(arrow.now())
+                )
+            )
+
+            leaders = {}
+            for stat in ('goals', 'assists', 'points'):
+                leaders[stat] = [
+                    {'player_id': row['player_id'], 'value': row[stat]}
+                    for row in rows if row[stat + '_rank'] == 1
+                ]
+
+            return CachedResponse(
+                {'team_id': team_id, 'leaders': leaders},
+                ttl=const.SERVE_TTL['team']
+            )
+
+        return _respond(
+            request, await self._cached(('top_scorers', team_id), render)
+        )
+
+# -------------------------- Helper Methods --------------------------#
+    async def _cached(self, key, render) -> CachedResponse:
+        resp = self.cache.get(key)
+        if resp is not None and not resp.expired:
+            return resp
+
+        task = self._rendering.get(key)
+        if task is None:
+            task = asyncio.ensure_future(render())
+            self._rendering[key] = task
+
+            def done(task):
+                del self._rendering[key]
+                if not task.cancelled() and task.exception() is None:
+                    self.cache[key] = task.result()
+
+            task.add_done_callback(done)
+
+        # a client going away must not cancel the render others wait on
+        return await asyncio.shield(task)
+
+    async def _game_response(self, game_id) -> CachedResponse:
+        async def render():
+            try:
+                game, = await self.registry.fetch([game_id], 'full')
+            except GameIDException as err:
+                raise web.HTTPNotFound(text=str(err))
+
+            return CachedResponse(game_json(game), [game_id])
+
+        resp = await self._cached(('game', game_id), render)
+        self._touch([game_id])
+
+        return resp
+
+    def _touch(self, game_ids):
+        """Mark games as just requested and drop the stale ones."""
+        now = time.monotonic()
+        for _id in game_ids:
+            self.requested[_id] = now
+            self.requested.move_to_end(_id)
+
+        self._evict(now)
+
+    def _evict(self, now=None):
+        if now is None:
+            now = time.monotonic()
+
+        expired = now - const.SERVE_GAMES['ttl']
+        dropped = []
+        while self.requested:
+            _id, last = next(iter(self.requested.items()))
+            if last > expired and \
+                    len(self.requested) <= const.SERVE_GAMES['max_games']:
+                break
+
+            del self.requested[_id]
+            dropped.append(_id)
+
+        if not dropped:
+            return
+
+        self.registry.discard(dropped)
+        self.scheduler.discard(dropped)
+        # the games are fetched anew by the next request rendering them
+        for key in [
+            key for key, resp in self.cache.items()
+            if not resp.game_ids.isdisjoint(dropped)
+        ]:
+            del self.cache[key]
+
+    async def _evict_forever(self):
+        # an idle server stops polling the games nobody requests anymore
+        while True:
+            await asyncio.sleep(const.SERVE_TTL['schedule'])
+            self._evict()
+
+    async def _start_polling(self, app):
+        loop = asyncio.get_event_loop()
+        self._poller = loop.create_task(poll_forever(self.scheduler))
+        self._evictor = loop.create_task(self._evict_forever())
+
+    async def _stop_polling(self, app):
+        self._poller.cancel()
+        self._evictor.cancel()
+
+
+def game_json(game) -> dict:
+    """JSON representation of a BannerGame or FullGame."""
+    return {
+        key: val for key, val in attrs_dict(game).items()
+        if key not in EXCLUDED
+    }
+
+
+def _default(obj):
+    # json.dumps fallback for everything below the game object
+    if isinstance(obj, (arrow.Arrow, datetime.date)):
+        return obj.isoformat()
+    elif isinstance(obj, decimal.Decimal):
+        # numeric columns from the database
+        return float(obj)
+
+    return {
+        key: val for key, val in attrs_dict(obj).items()
+        if key not in EXCLUDED
+    }
+
+
+def _respond(request, resp) -> web.Response:
+    headers = {'ETag': resp.etag, 'Cache-Control': 'no-cache'}
+
+    if request.headers.get('If-None-Match') == resp.etag:
+        return web.Response(status=304, headers=headers)
+
+    return web.Response(
+        body=resp.body, headers=headers, content_type='application/json'
+    )
+
+
+def _int_param(request, name) -> int:
+    try:
+        return int(request.match_info[name])
+    except ValueError:
+        raise web.HTTPBadRequest(text=f'{name} must be an integer')
+
+
+def _team_param(request) -> int:
+    team_id = _int_param(request, 'team_id')
+
+    if team_id not in const.TEAM_INDEX:
+        raise web.HTTPNotFound(text=f'No team with id {team_id}')
+
+    return team_id
+
+
+async def run_server(db_conn, host, port):
+    """Serve until cancelled. Game updates come from `puck daemon` when it
+    is running."""
+    daemon = await DaemonClient.connect()
+    server = PuckServer(db_conn, source=daemon)
+
+    runner = web.AppRunner(server.app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+
+    try:
+        # handlers and polling run on their own tasks
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+        if daemon is not None:
+            await daemon.close()
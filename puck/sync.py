@@ -0,0 +1,178 @@
+"""
+`puck sync`, brings the player table up to date with the current rosters.
+
+Every roster is requested and diffed against player.team_id in one query.
+Only players that are new, moved to another team or no longer on any
+roster have their info requested again, and only players whose current
+season stats are older than SYNC_STATS_TTL have their stats requested
+again. Everything else is skipped.
+"""
+import asyncio
+
+import aiohttp
+
+import puck.constants as const
+import puck.database.db_constants as db_const
+from puck.database.db import (InitialIngest, handle_player_season,
+                              insert_stmt, select_any_stmt, update_stmt)
+from puck.dispatcher import Dispatch
+from puck.request_queue import Priority
+from puck.utils import ProgressBar, async_request, get_season_number
+
+
+async def sync_rosters(db_conn, ttl=const.SYNC_STATS_TTL, stages=const.INGEST_STAGES) -> dict:  # noqa
+    """
+    Update the players of every current roster.
+
+    Args:
+        db_conn (psycopg2.Connection): Database connection
+        ttl (int, optional): seconds a player's season stats are kept before
+            they are refreshed. Defaults to const.SYNC_STATS_TTL.
+        stages (dict, optional): stage name -> workers and queue size.
+            Defaults to const.INGEST_STAGES.
+
+    Returns:
+        dict: number of players 'rostered', 'new', 'moved' and 'unchanged'
+            (info skipped), 'released' (stored on a team, on no roster),
+            then 'stats_refreshed' and 'stats_skipped'
+    """
+    async with aiohttp.ClientSession() as session:
+        rosters = await fetch_rosters(session)
+
+        # player_id -> row of the player as stored
+        stored = {
+            row['player_id']: row for row in select_any_stmt(
+                db_conn, 'player', 'player_id', rosters,
+                columns=['player_id', 'team_id', 'position']
+            ) or []
+        }
+
+        new = [_id for _id in rosters if _id not in stored]
+        moved = [
+            _id for _id in rosters
+            if _id in stored and stored[_id]['team_id'] != rosters[_id]
+        ]
+
+        # stored with a team but off every roster i.e. released or sent
+        # down, their info has their current team if any
+        released = [
+            row['player_id'] for row in select_any_stmt(
+                db_conn, 'player', 'team_id', list(const.TEAM_ID.values()),
+                columns=['player_id']
+            ) or [] if row['player_id'] not in rosters
+        ]
+
+        # new, moved and released players get their stats with their info
+        changed = set(new) | set(moved) | set(released)
+        fresh = fresh_stats(db_conn, rosters, ttl)
+        stale = [
+            _id for _id in rosters if _id not in changed and _id not in fresh
+        ]
+
+        unchanged = len(rosters) - len(new) - len(moved)
+        counts = {
+            'rostered': len(rosters), 'new': len(new), 'moved': len(moved),
+            'unchanged': unchanged, 'released': len(released),
+            'stats_refreshed': len(changed) + len(stale),
+            'stats_skipped': unchanged - len(stale)
+        }
+
+        progress_bar = ProgressBar(
+            end=len(changed) + counts['stats_refreshed'], prefix='Sync:',
+            suffix='', unit='records'
+        )
+
+        sync = RosterSync(
+            db_conn, session, progress_bar, set(moved) | set(released),
+            stages
+        )
+
+        await sync.pipeline.run([
+            *(Dispatch.player_info(_id) for _id in new + moved + released),
+            *(stats_dispatch(_id, stored[_id]['position']) for _id in stale)
+        ])
+
+    progress_bar.completed()
+
+    return counts
+
+
+async def fetch_rosters(session) -> dict:
+    """Every current roster, player_id -> team_id."""
+    dispatchers = [Dispatch.roster(_id) for _id in const.TEAM_ID.values()]
+
+    rosters = await asyncio.gather(*[
+        async_request(
+            disp.url, session, {disp.id_type: disp.id},
+            priority=Priority.BULK
+        ) for disp in dispatchers
+    ])
+
+    return {
+        player_id: disp.id
+        for disp, data in zip(dispatchers, rosters)
+        for player_id in disp.parser(data)
+    }
+
+
+def fresh_stats(db_conn, player_ids, ttl) -> set:
+    """Players of player_ids whose current season stats were updated in
+    the last ttl seconds, one query."""
+    cursor = db_conn.cursor()
+    cursor.execute(
+        db_const.FRESH_SEASON_STATS,
+        (list(player_ids), get_season_number(), ttl)
+    )
+
+    return {row[0] for row in cursor.fetchall()}
+
+
+def stats_dispatch(player_id, position) -> Dispatch:
+    if position == 'G':
+        return Dispatch.goalie_stats(player_id)
+
+    return Dispatch.skater_stats(player_id)
+
+
+class RosterSync(InitialIngest):
+    """
+    The stages of sync_rosters, InitialIngest with writes that update rows
+    that are already stored.
+
+    Attributes:
+        moved (set of int): players stored with another team or released,
+            their row is updated instead of inserted
+    """
+
+    def __init__(self, db_conn, session, progress_bar, moved, stages=const.INGEST_STAGES):  # noqa
+        super().__init__(db_conn, session, progress_bar, stages)
+        self.moved = moved
+
+    async def write(self, item):
+        dispatcher, parsed_data = item
+
+        if dispatcher.name == 'player_info':
+            # the player table only references the teams stored
+            if parsed_data['team_id'] not in self.known.ids['team']:
+                parsed_data['team_id'] = None
+
+            if dispatcher.id in self.moved:
+                update_stmt(
+                    self.db_conn, dispatcher.table, parsed_data,
+                    where=(dispatcher.id_type, dispatcher.id)
+                )
+            else:
+                insert_stmt(self.db_conn, dispatcher.table, parsed_data)
+
+            self.pipeline.submit(
+                stats_dispatch(dispatcher.id, parsed_data['position'])
+            )
+        else:
+            handle_player_season(
+                self.db_conn, dispatcher, parsed_data, refresh=True,
+                known=self.known
+            )
+
+        self.pb.increment()
+
+        return []
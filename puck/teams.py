@@ -1,12 +1,14 @@
 from collections import UserDict, UserList
 
+import puck.boxscore as boxscore
 import puck.constants as const
 import puck.database.db_constants as db_const
 import puck.parser as parser
 from puck.database.db import select_stmt
 from puck.player import GamePlayer, PlayerCollection
 from puck.urls import Url
-from puck.utils import request, get_precision
+from puck.utils import (Change, attrs_dict, diff_update, get_precision,
+                        prefix_changes, request)
 
 
 class TeamIDException(Exception):
@@ -35,6 +37,7 @@ class BaseTeam(object):
     Raises:
         InvalidTeamType: Creation fails when an invalid team type is passed
     """
+    __slots__ = tuple(db_const.TableColumns.BASE_TEAM_CLASS.value)
 
     def __init__(self, team_id, db_conn):
         """Constructor for BaseTeam.
@@ -58,7 +61,7 @@ class BaseTeam(object):
         raise NotImplementedError()
 
     def __repr__(self):
-        return f'{self.__class__} -> {self.__dict__}'
+        return f'{self.__class__} -> {attrs_dict(self)}'
 
 
 class BannerTeam(BaseTeam):
@@ -77,8 +80,9 @@ class BannerTeam(BaseTeam):
         InvalidTeamType: If 'home' or 'away' is not supplied
         creation will fail.
     """
+    __slots__ = ('team_type', 'game', 'game_id', 'goals')
 
-    def __init__(self, game, game_id, team_type, game_info=None):
+    def __init__(self, game, game_id, team_type, game_info=None, rows=None):
         """Constructor for BannerTeam
 
         Args:
@@ -87,6 +91,8 @@ class BannerTeam(BaseTeam):
             team_type (str): Either "home" or "away"
             game_info (dict, optional): JSON API response represented as a
                 dictionary. Defaults to None.
+            rows (GameRows, optional): stored rows of a final game, used
+                instead of game_info. Defaults to None.
 
         Raises:
             InvalidTeamType: If 'home' or 'away' is not supplied
@@ -100,12 +106,21 @@ class BannerTeam(BaseTeam):
         else:
             raise InvalidTeamType
 
-        # check if game data was passed
-        if not game_info:
-            game_info = request(Url.GAME, url_mods={'game_id': game_id})
+        if rows is not None:
+            team_id = rows.teams[team_type]['team_id']
+            parsed_data = boxscore.team_attrs(rows.teams[team_type])
+        else:
+            # check if game data was passed
+            if not game_info:
+                game_info = request(Url.GAME, url_mods={'game_id': game_id})
 
-        # get the teams id number
-        team_id = game_info['gameData']['teams'][team_type]['id']
+            # get the teams id number
+            team_id = game_info['gameData']['teams'][team_type]['id']
+
+            # parse the game data
+            parsed_data = parser.teams_skater_stats(
+                game_info, self.team_type, False
+            )
 
         # call parent class constructor
         super().__init__(team_id, game.db_conn)
@@ -113,31 +128,20 @@ class BannerTeam(BaseTeam):
         self.game = game
         self.game_id = game_id
 
-        # parse the game data
-        parsed_data = parser.teams_skater_stats(
-            game_info, self.team_type, False
-        )
-
         # set attributes (goals in this case)
         for key, val in parsed_data.items():
             setattr(self, key, val)
 
     def update_data(self, game_info=None):
+        """Returns the list of Change made by the update."""
         if not game_info:
-            game_info = request(Url.GAME, url_mods={'game_id': game_id})
+            game_info = request(Url.GAME, url_mods={'game_id': self.game_id})
 
         parsed_data = parser.teams_skater_stats(
             game_info, self.team_type, False
         )
 
-        for key, val in parsed_data.items():
-            if hasattr(self, key):
-                setattr(self, key, val)
-            else:
-                raise AttributeError(
-                    f'Update received an attribute {key} \
-                    that has not been set.'
-                )
+        return diff_update(self, parsed_data)
 
 
 class GameStatsTeam(BaseTeam):
@@ -175,6 +179,12 @@ class GameStatsTeam(BaseTeam):
         InvalidTeamType: If 'home' or 'away' is not supplied
         creation will fail.
     """
+    __slots__ = (
+        'team_type', 'game', 'game_id', 'goals', 'pims', 'shots', 'pp_pct',
+        'pp_goals', 'pp_att', 'faceoff_pct', 'blocked', 'takeaways',
+        'giveaways', 'hits', 'periods', 'shootout', 'id_list', 'players'
+    )
+
     class PeriodStats(UserList):
         """
         Inner Class.
@@ -198,6 +208,7 @@ class GameStatsTeam(BaseTeam):
                 goals (int): Number of goals in the period
                 shots (int): Number of shots in the period
             """
+            __slots__ = ('name', 'goals', 'shots')
 
             def __init__(self, name, data):
                 """
@@ -213,19 +224,10 @@ class GameStatsTeam(BaseTeam):
                     setattr(self, key, val)
 
             def update_data(self, data):
-                parsed_data = parser.period(data)
-
-                for key, val in parsed_data.items():
-                    if hasattr(self, key):
-                        setattr(self, key, val)
-                    else:
-                        AttributeError(
-                            f'Period update received an attribute {key} \
-                            that has not been set.'
-                        )
+                return diff_update(self, parser.period(data))
 
             def __repr__(self):
-                return f'{self.__class__} -> {self.__dict__}'
+                return f'{self.__class__} -> {attrs_dict(self)}'
 
         def __init__(self, periods, team_type):
             """
@@ -248,20 +250,34 @@ class GameStatsTeam(BaseTeam):
             self.total_shots = sum([x.shots for x in self.data])
 
         def update_data(self, periods, team_type):
+            """Returns the list of Change, fields are prefixed by the
+            period index i.e. '2.goals'. New periods are a single Change."""
             _range = len(periods)
             old_count = self.num_per
+            changes = []
 
             if self.num_per < _range:
                 self.num_per = _range
 
             for i in range(self.num_per):
                 if i < old_count:
-                    self.data[i].update_data(periods[i][team_type])
+                    changes.extend(prefix_changes(
+                        i, self.data[i].update_data(periods[i][team_type])
+                    ))
                 else:
                     name = periods[i]['ordinalNum']
-                    self.data.append(self.Period(name, periods[i][team_type]))
+                    period = self.Period(name, periods[i][team_type])
+                    self.data.append(period)
+                    changes.append(Change(str(i), None, period))
+
+            total_shots = sum([x.shots for x in self.data])
+            if total_shots != self.total_shots:
+                changes.append(
+                    Change('total_shots', self.total_shots, total_shots)
+                )
+                self.total_shots = total_shots
 
-            self.total_shots = sum([x.shots for x in self.data])
+            return changes
 
         def __repr__(self):
             return f'{self.__class__} -> {self.__dict__}'
@@ -273,15 +289,16 @@ class GameStatsTeam(BaseTeam):
             goals (int)
             attempts (int): shot attempts
         """
+        __slots__ = ('goals', 'attempts')
 
         def __init__(self, goals=None, attempts=None):
             self.goals = goals
             self.attempts = attempts
 
         def __repr__(self):
-            return f'{self.__class__} -> {self.__dict__}'
+            return f'{self.__class__} -> {attrs_dict(self)}'
 
-    def __init__(self, game, game_id, team_type, data=None):
+    def __init__(self, game, game_id, team_type, data=None, rows=None):
         """Constructor for GameStatsTeam
 
         Args:
@@ -291,6 +308,8 @@ class GameStatsTeam(BaseTeam):
             team_type (str): Either 'home' or 'away'
             data (dict, optional): JSON API response represented as
                                         a dictionary
+            rows (GameRows, optional): stored rows of a final game, used
+                                       instead of data
 
         Raises:
             InvalidTeamType: If 'home' or 'away' is not supplied
@@ -304,6 +323,10 @@ class GameStatsTeam(BaseTeam):
         else:
             raise InvalidTeamType
 
+        if rows is not None:
+            self._init_from_rows(game, game_id, rows)
+            return
+
         # if the game data was passed to the constructor use that
         if not data:
             # request the game data
@@ -342,25 +365,51 @@ class GameStatsTeam(BaseTeam):
         else:
             self.shootout = self.ShootoutStats()
 
-        # collect all player ids
-        self.id_list = data['liveData']['boxscore']['teams'][team_type]['goalies']  # noqa
+        # collect all player ids, copied so the feed's lists stay intact
+        self.id_list = list(data['liveData']['boxscore']['teams'][team_type]['goalies'])  # noqa
         self.id_list.extend(data['liveData']['boxscore']['teams'][team_type]['skaters'])  # noqa
         self.id_list.extend(data['liveData']['boxscore']['teams'][team_type]['scratches'])  # noqa
 
         # wait to create the actual player objects
         self.players = None
 
-    def init_players(self, data=None):
+    def _init_from_rows(self, game, game_id, rows):
+        row = rows.teams[self.team_type]
+
+        super().__init__(row['team_id'], game.db_conn)
+
+        self.game = game
+        self.game_id = game_id
+
+        for key, val in boxscore.team_attrs(row, True).items():
+            setattr(self, key, val)
+
+        self.periods = self.PeriodStats(rows.game['periods'], self.team_type)
+        self.shootout = self.ShootoutStats(
+            goals=row['so_goals'], attempts=row['so_attempts']
+        )
+        self.id_list = list(row['player_ids'])
+        self.players = None
+
+    async def init_players(self, data=None, player_rows=None, roster=None):
         """Utility function for explicit control of expensive logic.
+
+        Args:
+            data (dict, optional): JSON API response represented as
+                                        a dictionary. Defaults to None.
+            player_rows (dict, optional): pre-fetched player table rows
+                                          keyed by player_id.
+            roster (set of int, optional): pre-fetched ids the player
+                                           table has on the team.
         """
         if self.players:
             return
 
         self.players = PlayerCollection(
-            self, self.id_list, GamePlayer
+            self, self.id_list, GamePlayer, roster
         )
 
-        self.players.create_players(data)
+        await self.players.create_players(data, player_rows)
 
     def update_data(self, data=None):
         """Updates an object using fresh data.
@@ -368,44 +417,50 @@ class GameStatsTeam(BaseTeam):
         Args:
             data (dict, optional): JSON API response represented as
                                         a dictionary. Defaults to None.
+
+        Returns:
+            list of Change: every field changed, nested objects are
+                prefixed i.e. 'players.8478402.goals'.
         """
 
         if not data:
-            data = request(Url.GAME, url_mods={'game_id': game_id})
+            data = request(Url.GAME, url_mods={'game_id': self.game_id})
 
         _status_code = int(data['gameData']['status']['statusCode'])
 
         # NOTE: This check could fail if the game status code
         #       is updated before this.
         if _status_code in const.GAME_STATUS['Preview'] and self.game.game_status in const.GAME_STATUS['Preview']:  # noqa
-            return
+            return []
 
         parsed_data = parser.teams_skater_stats(
             data, self.team_type, True
         )
 
-        for key, val in parsed_data.items():
-            if hasattr(self, key):
-                setattr(self, key, val)
-            else:
-                raise AttributeError(
-                    f'Update received an attribute {key} \
-                    that has not been set.'
-                )
+        changes = diff_update(self, parsed_data)
 
         # we protect against this case in players.update_data
         # but no need to waste computation
         if self.players:
-            self.players.update_data(data)
+            changes.extend(prefix_changes(
+                'players', self.players.update_data(data)
+            ))
 
-        self.periods.update_data(
+        changes.extend(prefix_changes('periods', self.periods.update_data(
             data['liveData']['linescore']['periods'],
             self.team_type
-        )
+        )))
 
         if data['liveData']['linescore']['hasShootout']:
-            self.shootout.goals = data['liveData']['linescore']['shootoutInfo'][team_type]['scores']  # noqa
-            self.shootout.attempts = data['liveData']['linescore']['shootoutInfo'][team_type]['attempts']  # noqa
+            shootout = data['liveData']['linescore']['shootoutInfo'][self.team_type]  # noqa
+            changes.extend(prefix_changes('shootout', diff_update(
+                self.shootout, {
+                    'goals': shootout['scores'],
+                    'attempts': shootout['attempts']
+                }
+            )))
+
+        return changes
 
     def top_scorers(self):
         return self.players.top_scorers()
@@ -417,6 +472,7 @@ class TeamSeasonStats(BaseTeam):
     """
     class ValueRank():
         """Helper class for team stats."""
+        __slots__ = ('name', 'value', 'rank')
 
         def __init__(self, name, value, rank=None):
             self.name = name
@@ -1,4 +1,3 @@
-import asyncio
 from collections import defaultdict
 
 import urwid
@@ -10,13 +9,13 @@ import puck.utils as utils
 from additional_urwid_widgets import IndicativeListBox
 from puck.database.db import batch_update_db, execute_constant
 from puck.dispatcher import Dispatch
-from puck.games import BaseGame, get_game_ids
+from puck.games import BaseGame
 from puck.teams import TeamSeasonStats
 from puck.tui.tui_utils import (LEFT_ARROW, RIGHT_ARROW, BaseContext,
-                                BaseDisplay, BoldText, MainDivider,
-                                SelectableText, Text, box_wrap,
-                                gametime_text_widget, long_strf)
-from puck.urls import Url
+                                BaseDisplay, BoldText, LoadingDisplay,
+                                MainDivider, SelectableText, Text, box_wrap,
+                                gametime_text_widget, loading_widget,
+                                long_strf)
 
 BOX_STATS = [
     ('Team', 'abbreviation'),
@@ -60,18 +59,13 @@ class GamesContext(BaseContext):
             if type(self.display) is GameDisplay:
                 self.display.today()
             else:
-                self.display = GameDisplay(self.app, self, self._rows)
+                self.set_display(GameDisplay(self.app, self, self._rows))
         elif btn.label == 'Select Date':
             self.app._date_picker(btn=btn, caller=self)
         elif isinstance(btn.data, BaseGame):
-            #     self.display = SingleGamePreviewDisplay(
-            #         self.app, self, self._rows, btn.data
-            #     )
-            self.display = SingleGameLiveDisplay(
-                self.app, self, self._rows, btn.data
-            )
+            self.open_game(btn.data)
         elif btn.label == 'Schedule':
-            self.display = ScheduleDisplay(self.app, self, self._rows)
+            self.set_display(ScheduleDisplay(self.app, self, self._rows))
         else:
             self.app.error_message(
                 f'Something horrible went wrong or that function is not \
@@ -81,12 +75,44 @@ class GamesContext(BaseContext):
         # must be called to tell the screen to update
         self.app._reload_maindisplay()
 
+    def open_game(self, game):
+        """Show a loading display while the game's data is requested and
+        its players are created."""
+        def show(_):
+            #     self.display = SingleGamePreviewDisplay(
+            #         self.app, self, self._rows, game
+            #     )
+            self.set_display(SingleGameLiveDisplay(
+                self.app, self, self._rows, game
+            ))
+            self.app._reload_maindisplay()
+
+        self.set_display(LoadingDisplay(self.app, self, self._rows))
+        # opening another game supersedes this one
+        self.app.run_task(
+            self._load_game(game), show, key=(self, 'open_game')
+        )
+
+    async def _load_game(self, game):
+        # awaited here, replacing players reaches the api. Nothing is left
+        # to update in a final game, its players come from the database
+        feeds = await self.app.games.init_players([game])
+
+        # through the registry so every screen sees the update and a game
+        # that turned final is stored
+        self.app.games.apply_feeds(feeds)
+
+    def set_display(self, display):
+        # a game still loading is no longer wanted once the user moves on
+        self.app.cancel_task((self, 'open_game'))
+        BaseContext.set_display(self, display)
+
     def change_date(self, btn):
         # this function should only be called with GameDisplay
         # Possible force an early return
         # if the current display is not a GameDisplay
         if type(self.display) is not GameDisplay:
-            self.display = GameDisplay(self.app, self, self._rows)
+            self.set_display(GameDisplay(self.app, self, self._rows))
         # Read: GameDisplay.change_date()
         self.display.change_date(btn)
 
@@ -103,39 +129,49 @@ class GameDisplay(urwid.WidgetWrap, BaseDisplay):
 
     def __init__(self, app, ctx, rows):
         BaseDisplay.__init__(self, app, ctx, rows)
-        _ids = get_game_ids()
+        self.todays_ids = []
         # number of games
-        self.size = len(_ids)
+        self.size = 0
 
-        # list of game objects
-        self.full_games = asyncio.run(
-            utils.batch_game_create(_ids, 'full', self.app.db_conn)
-        )
+        # list of game objects, shared with the rest of the app
+        self.full_games = []
 
         # date of games on display
         self.display_date = arrow.now().date()
 
-        widget = self.main_display()
+        # game_id -> card placeholder, lets a single card be redrawn
+        self.cards = {}
 
-        # Cannot copy full_games because of connection data.
-        # Until a workaround is found just request data twice.
-        self.todays_games = asyncio.run(
-            utils.batch_game_create(_ids, 'full', self.app.db_conn)
+        # games are requested in the background
+        urwid.WidgetWrap.__init__(self, loading_widget(self._rows))
+        self.app.run_task(
+            self._request_games(), self._show_todays_games,
+            key=(self, 'games')
         )
 
-        urwid.WidgetWrap.__init__(self, widget)
-
 # -------------------------- Top Level Methods --------------------------#
     def update(self):
         """Update all data encompassed by object."""
-        # TODO: create logic to remove updating both unneccessarily
-        asyncio.run(utils.batch_game_update(self.full_games))
-        asyncio.run(utils.batch_game_update(self.todays_games))
+        self.app.run_task(
+            self.app.games.update([game.game_id for game in self.full_games]),
+            key=(self, 'update')
+        )
 
     def _update_in_place(self):
         # this method is purely for readability
         self._w = self.main_display()
 
+    def on_game_changes(self, changes):
+        """Redraw only the box scores of games that changed."""
+        for game_id in changes:
+            if game_id in self.cards:
+                self.cards[game_id].original_widget = self._create_game_card(
+                    self.app.games.get(game_id)
+                )
+
+    def shown_ids(self) -> set:
+        return {game.game_id for game in self.full_games}
+
 # -------------------------- Button Methods --------------------------#
     def today(self):
         """show today's box scores"""
@@ -145,9 +181,11 @@ class GameDisplay(urwid.WidgetWrap, BaseDisplay):
         else:
             self.display_date = arrow.now().date()
 
-        self.full_games = self.todays_games
-        self.size = len(self.full_games)
-        self._update_in_place()
+        # registered games are returned without a request
+        self.app.run_task(
+            self.app.games.fetch(self.todays_ids, 'full'), self._show_games,
+            key=(self, 'games')
+        )
 
     def change_date(self, btn):
         """Change the box score display to the provided date."""
@@ -159,16 +197,34 @@ class GameDisplay(urwid.WidgetWrap, BaseDisplay):
         else:
             self.display_date = date
 
-        _ids = get_game_ids(params={'date': str(date)})
-        self.size = len(_ids)
-        self.full_games = asyncio.run(
-            utils.batch_game_create(_ids, 'full', self.app.db_conn)
+        self._w = loading_widget(self._rows)
+        # a date picked before the last one loaded supersedes it
+        self.app.run_task(
+            self._request_games(params={'date': str(date)}), self._show_games,
+            key=(self, 'games')
         )
-
-        self._update_in_place()
         self.app.destroy()
 
 # -------------------------- Helper Methods --------------------------#
+    async def _request_games(self, params=None) -> list:
+        _ids = await self.app.games.schedule_ids(params=params)
+
+        return await self.app.games.fetch(_ids, 'full')
+
+    def _show_games(self, games):
+        shown = self.shown_ids()
+
+        self.full_games = games
+        self.size = len(self.full_games)
+        self._update_in_place()
+
+        # the previous date's games are no longer polled
+        self.app.release_games(shown)
+
+    def _show_todays_games(self, games):
+        self.todays_ids = [game.game_id for game in games]
+        self._show_games(games)
+
     def _create_game_card(self, game):
 
         if self.app.sizing.game_display == 1 and self.app.cols <= 100:
@@ -244,13 +300,19 @@ class GameDisplay(urwid.WidgetWrap, BaseDisplay):
 
         cards = [urwid.Divider('-'), date_text, urwid.Divider('-')]
 
+        self.cards = {}
+        for game in self.full_games:
+            self.cards[game.game_id] = urwid.WidgetPlaceholder(
+                self._create_game_card(game)
+            )
+
         if self.app.sizing.game_display == 2:
             # put game box scores side by side
             for i, game in enumerate(self.full_games):
                 if i % 2 == 0:  # when even its the "first" column
-                    prev = self._create_game_card(game)
+                    prev = self.cards[game.game_id]
                 else:  # else it needs to be paired with the prev column
-                    curr = self._create_game_card(game)
+                    curr = self.cards[game.game_id]
                     col = urwid.Columns([prev, curr], dividechars=1)
                     cards.append(col)
 
@@ -259,7 +321,7 @@ class GameDisplay(urwid.WidgetWrap, BaseDisplay):
                 cards.append(urwid.Columns([prev]))
         else:
             for game in self.full_games:
-                cards.append(self._create_game_card(game))
+                cards.append(self.cards[game.game_id])
 
         lw = urwid.SimpleFocusListWalker(cards)
         idlb = IndicativeListBox(lw)
@@ -278,9 +340,9 @@ class GameDisplay(urwid.WidgetWrap, BaseDisplay):
             game.home.players.need_to_update = []
             game.away.players.need_to_update = []
 
-        asyncio.run(
+        self.app.run_task(
             batch_update_db(
-                replacement, self.app.db_conn, Dispatch.player_info()
+                replacement, self.app.db_conn, Dispatch.player_info
             )
         )
 
@@ -303,16 +365,28 @@ class ScheduleDisplay(urwid.WidgetWrap, BaseDisplay):
         # holds BaseGame objects for each day in the current week
         self.current_week_games = defaultdict(lambda: [])
 
-        # populate the current_weeks_games
-        self._request_games()
-        widget = self.build_display()
+        urwid.WidgetWrap.__init__(self, loading_widget(self._rows))
 
-        urwid.WidgetWrap.__init__(self, widget)
+        # populate the current_weeks_games in the background
+        self._request_games()
 
 # -------------------------- Top Level Methods --------------------------#
     def update(self):
         pass
 
+    def on_game_changes(self, changes):
+        """Rebuild the schedule only if one of the week's games changed."""
+        for games in self.current_week_games.values():
+            if any(game.game_id in changes for game in games):
+                self._w = self.build_display()
+                return
+
+    def shown_ids(self) -> set:
+        return {
+            game.game_id
+            for games in self.current_week_games.values() for game in games
+        }
+
 # -------------------------- Button Methods --------------------------#
 
     def previous_page(self, btn, data=None):
@@ -322,8 +396,6 @@ class ScheduleDisplay(urwid.WidgetWrap, BaseDisplay):
 
         self._request_games()
 
-        self._w = self.build_schedule()
-
     def next_page(self, btn, data=None):
         """cycle to the next week"""
         self.current_week_start = self.current_week_start.shift(days=+7)
@@ -331,8 +403,6 @@ class ScheduleDisplay(urwid.WidgetWrap, BaseDisplay):
 
         self._request_games()
 
-        self._w = self.build_schedule()
-
 # -------------------------- Helper Methods --------------------------#
     def build_display(self):
         """Main logic for building the schedule widget."""
@@ -377,30 +447,44 @@ class ScheduleDisplay(urwid.WidgetWrap, BaseDisplay):
         return urwid.LineBox(box)
 
     def _request_games(self):
-        """Request the current weeks games."""
-        # clear the dictionary to start fresh
-        self.current_week_games.clear()
+        """Request the current weeks games in the background."""
+        self._w = loading_widget(self._rows)
 
         start = self.current_week_start.date()
         end = self.current_week_end.date()
 
+        # paging again before the week loads cancels the stale request
+        self.app.run_task(
+            self._fetch_week(start, end), self._show_week, key=(self, 'week')
+        )
+
+    async def _fetch_week(self, start, end) -> list:
         # NOTE: a batch request for ALL dates is chosen because the speed
         # gain is much better than individual requesting each day of the week
-        _ids = get_game_ids(
+        _ids = await self.app.games.schedule_ids(
             params={
                 'startDate': str(start),
                 'endDate': str(end)
             }
         )
 
-        games = asyncio.run(
-            utils.batch_game_create(_ids, 'banner', self.app.db_conn)
-        )
+        return await self.app.games.fetch(_ids, 'banner')
+
+    def _show_week(self, games):
+        shown = self.shown_ids()
+
+        # clear the dictionary to start fresh
+        self.current_week_games.clear()
 
         # this partitions games by their date
         for game in games:
             self.current_week_games[game.game_date].append(game)
 
+        self._w = self.build_display()
+
+        # the previous week's games are no longer polled
+        self.app.release_games(shown)
+
 
 class SingleGamePreviewDisplay(urwid.WidgetWrap, BaseDisplay):
     """Displays a single game's full stats."""
@@ -408,18 +492,10 @@ class SingleGamePreviewDisplay(urwid.WidgetWrap, BaseDisplay):
     def __init__(self, app, ctx, row, game):
         BaseDisplay.__init__(self, app, ctx, row)
 
+        # GamesContext.open_game has updated the game and created its
+        # players in the background
         self.game = game
 
-        data = utils.request(
-            Url.GAME, {'game_id': self.game.game_id}
-        )
-
-        # This display requires players to initialized.
-        self.game.init_players(data)
-
-        # call to update
-        self.game.update_data(data)
-
         team_stats = execute_constant(
             self.app.db_conn, db_const.TEAM_RANKED_SELECT.format(
                 utils.get_season_number(arrow.now())
@@ -439,14 +515,17 @@ class SingleGamePreviewDisplay(urwid.WidgetWrap, BaseDisplay):
 
 # -------------------------- Top Level Methods --------------------------#
     def update(self):
-        data = utils.request(
-            Url.GAME, {'game_id': self.game.game_id}
+        # the registry publishes the changes, see on_game_changes
+        self.app.run_task(
+            self.app.games.update([self.game.game_id]), key=(self, 'update')
         )
 
-        self.game.update_data(data)
+    def on_game_changes(self, changes):
+        if self.game.game_id in changes:
+            self._w = self.build_display()
 
-        # this is the internal attribute widget
-        self._w = self.build_display()
+    def shown_ids(self) -> set:
+        return {self.game.game_id}
 
 # -------------------------- Helper Methods --------------------------#
     def fetch_top_scorers(self):
@@ -679,34 +758,27 @@ class SingleGameLiveDisplay(urwid.WidgetWrap, BaseDisplay):
     def __init__(self, app, ctx, row, game):
         BaseDisplay.__init__(self, app, ctx, row)
 
+        # GamesContext.open_game has updated the game and created its
+        # players in the background
         self.game = game
 
-        data = utils.request(
-            Url.GAME, {'game_id': self.game.game_id}
-        )
-
-        # This display requires players to initialized.
-        # if this display is swapped with SingleGamePreviewDisplay,
-        # the game object has it's player's initialized
-        self.game.init_players(data)
-
-        # call to update
-        self.game.update_data(data)
-
         widget = self.build_display()
 
         urwid.WidgetWrap.__init__(self, widget)
 
 # -------------------------- Top Level Methods --------------------------#
     def update(self):
-        data = utils.request(
-            Url.GAME, {'game_id': self.game.game_id}
+        # the registry publishes the changes, see on_game_changes
+        self.app.run_task(
+            self.app.games.update([self.game.game_id]), key=(self, 'update')
         )
 
-        self.game.update_data(data)
+    def on_game_changes(self, changes):
+        if self.game.game_id in changes:
+            self._w = self.build_display()
 
-        # this is the internal attribute widget
-        self._w = self.build_display()
+    def shown_ids(self) -> set:
+        return {self.game.game_id}
 
 # -------------------------- Builder Methods --------------------------#
     def build_display(self) -> urwid.LineBox:
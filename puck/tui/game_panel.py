@@ -1,20 +1,17 @@
-import asyncio
-from copy import copy
-
 import urwid
 
 import arrow
 from additional_urwid_widgets import DatePicker, MessageDialog
-from puck.games import get_game_ids
 from puck.tui.tui_utils import (SelectableText, Text, box_wrap,
-                                gametime_text_widget)
-from puck.utils import batch_game_create, batch_game_update
+                                gametime_text_widget, loading_widget)
 
 
 class GamePanel(urwid.WidgetWrap):
     def __init__(self, app, rows):
         self.app = app
         self._rows = rows
+        # game_id -> card placeholder, lets a single card be redrawn
+        self.cards = {}
         widget = self._create_game_panel()
         super().__init__(widget)
 
@@ -23,6 +20,14 @@ class GamePanel(urwid.WidgetWrap):
         self._w = self._create_game_panel(date)
         self.app._reload_topbar()
 
+    def on_game_changes(self, changes):
+        """Redraw only the cards of games that changed."""
+        for game_id in changes:
+            if game_id in self.cards:
+                self.cards[game_id].original_widget = self._create_game_card(
+                    self.app.games.get(game_id)
+                )
+
 # -------------------------- Button Methods --------------------------#
     def cycle_games(self, btn, data=None):
         # when popping and pushing elements onto the widget and  hidden lists,
@@ -41,8 +46,8 @@ class GamePanel(urwid.WidgetWrap):
 
         if btn.label == 'Prev':
             if self.app.hidden_prev:
-                # copy the last game that will be popped off
-                rem = copy(wl[self.app.max_games - 1])
+                # the last game that will be popped off
+                rem = wl[self.app.max_games - 1]
                 # pop off the new game from the hidden queue
                 new = self.app.hidden_prev.pop()
                 # add the removed game to the hidden queue
@@ -55,8 +60,8 @@ class GamePanel(urwid.WidgetWrap):
                 pass
         else:
             if self.app.hidden_next:
-                # copy first game
-                rem = copy(wl[0])
+                # first game
+                rem = wl[0]
                 # pop off the new game from hidden queue
                 new = self.app.hidden_next.pop()
                 # add removed node to first queue
@@ -69,21 +74,35 @@ class GamePanel(urwid.WidgetWrap):
                 pass
 
     def change_date(self, btn):
-        def destroy():
-            # removes pop-up
-            self.app.loop.widget = self.app.frame
+        # removes pop-up
+        self.app.destroy()
+
+        # games are requested in the background
+        self._w = loading_widget(self._rows)
+        # a date picked before the last one loaded supersedes it
+        self.app.run_task(
+            self._request_games(btn.data.get_date()),
+            lambda games: self._show_games(games, btn.data),
+            key=(self, 'games')
+        )
 
+    async def _request_games(self, date) -> list:
         # get the ids for given day
-        _ids = get_game_ids(params={'date': str(btn.data.get_date())})
-        self.app.banner_games = asyncio.run(
-            batch_game_create(_ids, 'banner', self.app.db_conn)
-        )
+        _ids = await self.app.games.schedule_ids(params={'date': str(date)})
+
+        return await self.app.games.fetch(_ids, 'banner')
+
+    def _show_games(self, games, date):
+        shown = [game.game_id for game in self.app.banner_games]
+        self.app.banner_games = games
 
         self.app.size = len(self.app.banner_games)
         # populates deques
         self.app._populate_hidden()
-        self._update_in_place(btn.data)
-        destroy()
+        self._update_in_place(date)
+
+        # the previous date's games are no longer polled
+        self.app.release_games(shown)
 
     def date_picker(self, btn):
         self.app._date_picker(btn, self)
@@ -136,8 +155,11 @@ class GamePanel(urwid.WidgetWrap):
         else:
             count = self.app.size
 
+        self.cards = {}
         for game in self.app.banner_games:
-            self.app.hidden_next.appendleft(self._create_game_card(game))
+            card = urwid.WidgetPlaceholder(self._create_game_card(game))
+            self.cards[game.game_id] = card
+            self.app.hidden_next.appendleft(card)
 
         for i in range(count):
             cards.append(('weight', 3, self.app.hidden_next.pop()))
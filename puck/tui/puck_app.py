@@ -1,18 +1,20 @@
 import asyncio
+import sys
 from collections import deque
-from copy import copy
 
 import urwid
 import urwid.raw_display
 from additional_urwid_widgets import (DatePicker, IndicativeListBox,
                                       MessageDialog)
 
+import puck.constants as const
 from puck.database.db import connect_db
-from puck.games import get_game_ids
+from puck.daemon import DaemonClient
+from puck.games import GameRegistry
+from puck.polling import PollScheduler
 from puck.tui.game_context import GamesContext
 from puck.tui.game_panel import GamePanel
 from puck.tui.tui_utils import SelectableText, Text
-from puck.utils import batch_game_create, batch_game_update
 
 VERSION = '0.1'
 ROW_SPACE = 5
@@ -36,10 +38,36 @@ class PuckApp(object):
     def __init__(self):
         self.db_conn = connect_db()
 
-        _ids = get_game_ids()
+        # single event loop shared by urwid and every request made by the app
+        self.aloop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.aloop)
+        # background tasks in flight
+        self.tasks = set()
+        # (owner, name) -> task, a newer task with the same key supersedes
+        # the older one i.e. the user navigated before it finished
+        self.keyed_tasks = {}
+
+        # urwid is not running yet, safe to wait on the loop here
+        # a running `puck daemon` polls for us, None if there is none
+        self.daemon = self.aloop.run_until_complete(DaemonClient.connect())
+
+        # every screen gets its game objects from the registry
+        self.games = GameRegistry(
+            self.db_conn, source=self.daemon, on_error=self.report_error
+        )
+        self.games.subscribe(self.on_game_changes)
+        # decides which games are refreshed and when
+        # idle while the daemon pushes the updates
+        self.scheduler = PollScheduler(self.games)
+
+        if self.daemon is not None:
+            self.daemon.on_error = self.report_error
+            self.daemon.subscribe(self.on_daemon_feeds)
+
+        _ids = self.aloop.run_until_complete(self.games.schedule_ids())
         self.size = len(_ids)
-        self.banner_games = asyncio.run(
-            batch_game_create(_ids, 'banner', self.db_conn)
+        self.banner_games = self.aloop.run_until_complete(
+            self.games.fetch(_ids, 'banner')
         )
 
         # sizing
@@ -84,15 +112,112 @@ class PuckApp(object):
         )
 
         self.loop = urwid.MainLoop(
-            self.frame, palette=PALETTE, screen=self.screen, pop_ups=True
+            self.frame, palette=PALETTE, screen=self.screen, pop_ups=True,
+            event_loop=urwid.AsyncioEventLoop(loop=self.aloop)
         )
 
     # -------------------------- Top Level Methods -------------------------#
     def run(self):
+        self._set_poll_alarm()
         self.loop.run()
 
-    def update(self):
-        asyncio.run(batch_game_update(self.banner_games))
+    def update(self, loop=None, user_data=None):
+        """Refresh the games that are due in the background.
+        Used as an urwid alarm callback."""
+        self.run_task(self._poll())
+
+    async def _poll(self):
+        try:
+            # one update per game, shared by every screen referencing it
+            await self.scheduler.poll()
+        finally:
+            self._set_poll_alarm()
+
+    def run_task(self, coro, callback=None, key=None) -> asyncio.Task:
+        """
+        Run a coroutine in the background on the app's event loop so input
+        is never blocked by a request.
+
+        Args:
+            coro (coroutine): the work to run
+            callback (function, optional): called with the result of coro
+                once it finishes, then the screen is redrawn.
+            key (tuple, optional): (owner, name) of the request. A task
+                already running under the same key is stale and is
+                cancelled, its callback never runs. Defaults to None.
+
+        Returns:
+            asyncio.Task: the scheduled task
+        """
+        if key is not None:
+            self.cancel_task(key)
+
+        task = self.aloop.create_task(coro)
+        self.tasks.add(task)
+
+        if key is not None:
+            self.keyed_tasks[key] = task
+
+        def done(task):
+            self.tasks.discard(task)
+
+            # only forget the key if it has not been taken by a newer task
+            if key is not None and self.keyed_tasks.get(key) is task:
+                del self.keyed_tasks[key]
+
+            if task.cancelled():
+                return
+
+            if task.exception() is not None:
+                self.error_message(str(task.exception()))
+            elif callback is not None:
+                callback(task.result())
+
+            self.redraw()
+
+        task.add_done_callback(done)
+
+        return task
+
+    def cancel_task(self, key):
+        """Cancel the task running under key, if any."""
+        task = self.keyed_tasks.pop(key, None)
+
+        if task is not None:
+            task.cancel()
+
+    def cancel_tasks(self, owner):
+        """Cancel every keyed task of a widget that is leaving the screen."""
+        for key in [key for key in self.keyed_tasks if key[0] is owner]:
+            self.cancel_task(key)
+
+    def redraw(self):
+        """Draw the screen outside of an input event i.e. after a task."""
+        if self.loop.screen.started:
+            self.loop.draw_screen()
+
+    def on_daemon_feeds(self, feeds):
+        """Apply the game feeds pushed by the daemon."""
+        if self.games.apply_feeds(feeds):
+            self.redraw()
+
+    def release_games(self, game_ids):
+        """Drop games that left the screen from the registry and the poll
+        schedule, unless another screen still shows them."""
+        shown = {game.game_id for game in self.banner_games}
+        if self.context is not None:
+            shown |= self.context.display.shown_ids()
+
+        dropped = [_id for _id in game_ids if _id not in shown]
+        self.games.discard(dropped)
+        self.scheduler.discard(dropped)
+
+    def on_game_changes(self, changes):
+        """Forward registry change events to the widgets on screen."""
+        self.game_panel.on_game_changes(changes)
+
+        if self.context is not None:
+            self.context.on_game_changes(changes)
 
     # -------------------------- Button Methods --------------------------#
     def destroy(self, btn=None):
@@ -106,10 +231,26 @@ class PuckApp(object):
             [msg], [ok], size, background=self.frame, contents_align='center'
         )
 
+    def report_error(self, msg):
+        """Show an error raised outside of a task, i.e. by the registry.
+        Printed until the screen is up."""
+        if getattr(self, 'loop', None) is None or \
+                not self.loop.screen.started:
+            print(msg, file=sys.stderr)
+            return
+
+        self.error_message(msg)
+        self.redraw()
+
     def switch_context(self, btn, data=None):
         # originally implemented using widgetPlaceholder however,
         # the listbox would not update resulting in context menu being
         # unselectable. Re-Render a whole new main display to work around
+        if self.context is not None:
+            # nothing the old context requested is needed anymore
+            self.cancel_tasks(self.context)
+            self.cancel_tasks(self.context.display)
+
         self.context = GamesContext(self, self.main_rows)
         self.display = self.context.display
         self.context_menu = self.context.menu
@@ -172,6 +313,16 @@ class PuckApp(object):
             self.max_games = 5
             self.sizing = Sizing(8, 30, True, 2)
 
+    def _set_poll_alarm(self):
+        # games registered by navigation may be due sooner than the current
+        # schedule, wake up at least as often as a live game is polled
+        # a wake up with nothing due does not make a request
+        wait = self.scheduler.time_until_next()
+        if wait is None or wait > const.POLL_INTERVAL['live']:
+            wait = const.POLL_INTERVAL['live']
+
+        self.loop.set_alarm_in(wait, self.update)
+
     def _populate_hidden(self):
         self.hidden_prev = deque([], self.size)
         self.hidden_next = deque([], self.size)
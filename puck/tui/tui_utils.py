@@ -40,6 +40,11 @@ def box_wrap(widget, rows) -> urwid.BoxAdapter:
     )
 
 
+def loading_widget(rows, msg=u'Loading...') -> urwid.LineBox:
+    """Placeholder shown while a display's data is requested."""
+    return urwid.LineBox(box_wrap(Text(msg), rows))
+
+
 def long_strf(date) -> str:
     return date.strftime('%A %B %d, %Y')
 
@@ -119,6 +124,19 @@ class BaseContext(object):
     def update(self):
         raise NotImplementedError('Implement an update method for the context')
 
+    def on_game_changes(self, changes):
+        """Pass GameRegistry change events to the context's display."""
+        if self.display is not None:
+            self.display.on_game_changes(changes)
+
+    def set_display(self, display):
+        """Swap the context's display, cancelling whatever the old one
+        still has in flight."""
+        if self.display is not None:
+            self.app.cancel_tasks(self.display)
+
+        self.display = display
+
     def context_menu(self):
         raise NotImplementedError(
             'Implement a context_menu method for the context'
@@ -147,6 +165,18 @@ class BaseDisplay(object):
     def update(self):
         raise NotImplementedError('Implement an update method for the display')
 
+    def on_game_changes(self, changes):
+        """Redraw whatever is affected by a GameRegistry update.
+
+        Args:
+            changes (dict): game_id -> list of Change
+        """
+        pass
+
+    def shown_ids(self) -> set:
+        """Ids of the games on display, the app keeps them registered."""
+        return set()
+
     def build_display(self):
         raise NotImplementedError('Implement an update method for the display')
 
@@ -154,5 +184,16 @@ class BaseDisplay(object):
         return f'{self.__class__} -> {self.__dict__}'
 
 
+class LoadingDisplay(urwid.WidgetWrap, BaseDisplay):
+    """Display shown in a context until the real display is ready."""
+
+    def __init__(self, app, ctx, rows, msg=u'Loading...'):
+        BaseDisplay.__init__(self, app, ctx, rows)
+        urwid.WidgetWrap.__init__(self, loading_widget(rows, msg))
+
+    def update(self):
+        pass
+
+
 LEFT_ARROW = Text('\u25C0')
 RIGHT_ARROW = Text('\u25B6')
@@ -1,6 +1,7 @@
 import asyncio
-import json
 import sys
+import time
+from collections import namedtuple
 
 import aiohttp
 import arrow
@@ -8,11 +9,14 @@ import click
 import requests
 
 import puck.constants as const
-import puck.parser as parser
-from puck.dispatcher import Dispatch
+from puck.request_queue import REQUEST_QUEUE, Priority
 from puck.urls import Url, URLException
 
 
+# a single field changed by an update_data call
+Change = namedtuple('Change', ['field', 'old', 'new'])
+
+
 class TeamException(Exception):
     pass
 
@@ -54,7 +58,7 @@ def request(url, url_mods=None, params=None):
         print(e)
 
 
-async def async_request(url, session, url_mods=None, params=None) -> dict:  # noqa
+async def async_request(url, session, url_mods=None, params=None, priority=Priority.REFRESH, raw=False) -> dict:  # noqa
     """Base async request for polling one endpoint.
 
     Args:
@@ -62,25 +66,44 @@ async def async_request(url, session, url_mods=None, params=None) -> dict:  # no
         session (ClientSession): AIOHTTP ClientSession Object
         url_mods (dict): modifications to the Url passed
         params (dict): url parameters for the Url passed
+        priority (Priority): request class, decides the order requests are
+            let through REQUEST_QUEUE. Defaults to Priority.REFRESH.
+        raw (bool): return the body undecoded, for parsing elsewhere
+            (see parse_pool). Defaults to False.
 
     Kwargs:
         kwargs to be passed to the function supplied
 
     Returns:
-        dict or None: dict object representing a JSON response
+        dict or None: dict object representing a JSON response, bytes
+            when raw
     """
     if url_mods:
         url = _generate_url(url, url_mods)
     else:
         url = url.value
 
-    async with session.request(method='GET', url=url, params=params) as resp:  # noqa
-        data = await resp.json()
+    async with REQUEST_QUEUE.slot(priority):
+        async with session.request(method='GET', url=url, params=params) as resp:  # noqa
+            if raw:
+                return await resp.read()
+
+            data = await resp.json()
 
-        return data
+            return data
 
 
-async def batch_game_create(game_ids, class_type, db_conn) -> list:
+async def async_game_request(game_id, priority=Priority.INTERACTIVE) -> dict:  # noqa
+    """Single async request of a game's feed (Url.GAME), for code already
+    running on an event loop."""
+    async with aiohttp.ClientSession() as session:
+        return await async_request(
+            Url.GAME, session, url_mods={'game_id': game_id},
+            priority=priority
+        )
+
+
+async def batch_game_create(game_ids, class_type, db_conn, priority=Priority.INTERACTIVE) -> list:  # noqa
     """Batch creation for Game objects. This drastically improves performance
         when creating multiple game objects.
 
@@ -88,6 +111,7 @@ async def batch_game_create(game_ids, class_type, db_conn) -> list:
         db_conn (sqlite3.Connection): Database connection
         game_ids (List of Ints): List of game ids to create game objects
         class_type (BaseGame): Game object type to create.
+        priority (Priority): request class. Defaults to Priority.INTERACTIVE.
     Raises:
         URLException: NotImplemented
 
@@ -99,28 +123,55 @@ async def batch_game_create(game_ids, class_type, db_conn) -> list:
         workers = []
         for _id in game_ids:
             workers.append(
-                _create_game(Url.GAME, _id, class_type, session, db_conn)
+                _create_game(
+                    Url.GAME, _id, class_type, session, db_conn, priority
+                )
             )
 
         games = await asyncio.gather(*workers)
     return games
 
 
-async def batch_game_update(games):
-    """Batch update for Game objects."""
+async def batch_game_update(games, priority=Priority.REFRESH) -> list:
+    """Batch update for Game objects.
+
+    Returns:
+        list: the change set of each game, in the order of games
+    """
     async with aiohttp.ClientSession() as session:
         workers = []
         for game in games:
             workers.append(
-                _update_game(Url.GAME, game, session)
+                _update_game(Url.GAME, game, session, priority)
+            )
+
+        return await asyncio.gather(*workers)
+
+
+async def batch_game_feeds(game_ids, priority=Priority.REFRESH) -> list:
+    """Batch request of game feeds (Url.GAME).
+
+    Returns:
+        list: JSON of each game, in the order of game_ids
+    """
+    async with aiohttp.ClientSession() as session:
+        workers = []
+        for _id in game_ids:
+            workers.append(
+                async_request(
+                    Url.GAME, session, url_mods={'game_id': _id},
+                    priority=priority
+                )
             )
 
-        await asyncio.gather(*workers)
+        return await asyncio.gather(*workers)
 
 
-async def _create_game(url, _id, class_type, session, db_conn):
+async def _create_game(url, _id, class_type, session, db_conn, priority=Priority.INTERACTIVE):  # noqa
     """Internal wrapper to create a Game Object"""
-    json = await async_request(url, session, url_mods={'game_id': _id})
+    json = await async_request(
+        url, session, url_mods={'game_id': _id}, priority=priority
+    )
 
     if class_type == 'full':
         from .games import FullGame
@@ -134,11 +185,13 @@ async def _create_game(url, _id, class_type, session, db_conn):
     return game
 
 
-async def _update_game(url, game, session):
+async def _update_game(url, game, session, priority=Priority.REFRESH):
     """Internal wrapper to update a Game object"""
-    json = await async_request(url, session, url_mods={'game_id': game.game_id})  # noqa
+    json = await async_request(
+        url, session, url_mods={'game_id': game.game_id}, priority=priority
+    )
 
-    game.update_data(json)
+    return game.update_data(json)
 
 
 def _generate_url(url, url_mods) -> str:
@@ -192,6 +245,79 @@ def get_season_number(date=None) -> int:
     return season
 
 
+def season_range(first, last) -> list:
+    """Seasons from first to last, both included i.e. 20212022, 20222023."""
+    return list(range(first, last + 1, 10001))
+
+
+def recent_seasons(count) -> list:
+    """The current season and the count - 1 seasons before it, oldest
+    first."""
+    current = get_season_number()
+
+    return season_range(current - 10001 * (count - 1), current)
+
+
+def diff_update(obj, parsed_data) -> list:
+    """Set the attributes of obj from parsed data, only touching the values
+    that differ.
+
+    Args:
+        obj (object): object being updated
+        parsed_data (dict): attribute name -> new value from a parser
+
+    Raises:
+        AttributeError: if a key was never set on obj
+
+    Returns:
+        list of Change: (field, old, new) for every attribute changed
+    """
+    changes = []
+    for key, val in parsed_data.items():
+        if not hasattr(obj, key):
+            raise AttributeError(
+                f'{obj.__class__.__name__} update received an attribute \
+{key} that has not been set.'
+            )
+
+        old = getattr(obj, key)
+        if old != val:
+            setattr(obj, key, val)
+            changes.append(Change(key, old, val))
+
+    return changes
+
+
+def prefix_changes(prefix, changes) -> list:
+    """Nest a child's change set under prefix i.e. 'home' -> 'home.goals'"""
+    return [
+        Change(f'{prefix}.{field}', old, new) for field, old, new in changes
+    ]
+
+
+def slot_names(cls) -> list:
+    """Every __slots__ entry declared by a class and its parents."""
+    names = []
+    for klass in reversed(cls.__mro__):
+        for name in klass.__dict__.get('__slots__', ()):
+            if name not in names:
+                names.append(name)
+
+    return names
+
+
+def attrs_dict(obj) -> dict:
+    """Attributes of an object whether held in __slots__ or __dict__.
+    Used in place of obj.__dict__ for the slotted classes."""
+    attrs = {
+        name: getattr(obj, name) for name in slot_names(type(obj))
+        if name != '__dict__' and hasattr(obj, name)
+    }
+    attrs.update(getattr(obj, '__dict__', {}))
+
+    return attrs
+
+
 def humanize_name(name, short=False) -> str:
     """A function to humanize certain names. Mostly database columns.
 
@@ -262,14 +388,26 @@ def shorten_tname(team):
 
 
 class ProgressBar(object):
+    """
+    Progress of a long running job with its throughput and estimated time
+    left. The total may grow while the job runs (see add_total), i.e. when
+    each roster adds its players.
+
+    Output is written to stderr at most every REDRAW seconds so stdout
+    stays usable.
+    """
+    REDRAW = 0.2
+
     def __init__(
             self, start=0, end=100, prefix='Progress:', suffix='Complete',
-            decimals=1, length=75, fill='█', print_end="\r"
+            decimals=1, length=40, fill='█', print_end="\r", unit='items'
     ):
         # start time of event
-        self.start_time = arrow.now()
+        self.start_time = time.monotonic()
         # current progress
         self.curr = start
+        # where this run started, the rate only counts this run's work
+        self.first = start
         # end progress number
         self.end = end
         # prefix of pb
@@ -284,8 +422,11 @@ class ProgressBar(object):
         self.fill = fill
         # print end char
         self.print_end = print_end
+        # what is counted, shown with the rate
+        self.unit = unit
         # complete flag
         self.complete = False
+        self._drawn = 0
 
         self.print_bar()
 
@@ -294,32 +435,84 @@ class ProgressBar(object):
         self.curr += amt
         self.print_bar()
 
+    def add_total(self, amt):
+        """More work was discovered."""
+        self.end += amt
+        self.print_bar()
+
     def completed(self):
         # must be called by caller unfortunately
         self.complete = True
-        self.curr = self.end
+        self.end = max(self.end, self.curr)
         self.print_bar()
 
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start_time
+
+    @property
+    def rate(self) -> float:
+        """Items per second since the start."""
+        elapsed = self.elapsed
+        return (self.curr - self.first) / elapsed if elapsed else 0.0
+
+    def eta(self):
+        """Seconds left at the current rate, None until there is a rate."""
+        rate = self.rate
+        if not rate:
+            return None
+
+        return max(self.end - self.curr, 0) / rate
+
     def print_results(self):
         # print the time taken
-        result = arrow.now() - self.start_time
-        print()
-        print(f'Took: {result.total_seconds()} seconds')
+        print(file=sys.stderr)
+        print(
+            f'Took: {self.elapsed:.1f} seconds '
+            f'({self.rate:.1f} {self.unit}/s)', file=sys.stderr
+        )
 
     def print_bar(self):
+        now = time.monotonic()
+        if not self.complete and now - self._drawn < self.REDRAW:
+            return
+        self._drawn = now
+
+        # a total that grows can fall behind for a moment
+        end = max(self.end, self.curr, 1)
         percent = ("{0:." + str(self.decimals) + "f}").format(
-            100 * (self.curr / float(self.end))
+            100 * (self.curr / float(end))
         )
-        filledLength = int(self.length * self.curr // self.end)
+        filledLength = int(self.length * self.curr // end)
         bar = self.fill * filledLength + '-' * (self.length - filledLength)
-        print('\r%s |%s| %s%% %s' %
-              (self.prefix, bar, percent, self.suffix), end=self.print_end)
+
+        eta = self.eta()
+        eta = '--:--' if eta is None else _clock(eta)
+
+        print(
+            '\r%s |%s| %s%% %s/%s %.1f %s/s ETA %s %s' % (
+                self.prefix, bar, percent, self.curr, end, self.rate,
+                self.unit, eta, self.suffix
+            ), end=self.print_end, file=sys.stderr
+        )
         # if we have complete called end
         if self.complete:
             self.print_results()
-        # if end == curr and not complete, just increment end by 1
-        elif self.end == self.curr:
-            self.end += 1
+
+
+def report_error(msg):
+    """Default error handler of the long lived objects (GameRegistry,
+    DaemonClient), their errors must not end the work in progress."""
+    print(msg, file=sys.stderr)
+
+
+def _clock(seconds) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    if hours:
+        return f'{hours}:{minutes:02}:{seconds:02}'
+    return f'{minutes}:{seconds:02}'
 
 
 def style(msg, format):
@@ -0,0 +1,53 @@
+"""
+Database fixtures. The tests using them need a Postgres database to write
+to, set PUCK_TEST_DSN (i.e. "dbname=puck_test user=puck") to run them.
+Its public schema is dropped before every test, never point it at the
+database puck uses.
+"""
+import os
+
+import psycopg2 as pg
+import psycopg2.extras as pgext
+import pytest
+
+import puck.database.db_constants as db_const
+from puck.database.db import (create_base_tables, create_base_triggers,
+                              create_game_tables, migrate)
+
+TEST_DSN = os.environ.get('PUCK_TEST_DSN')
+
+
+def reset_schema(db_conn):
+    """Drop every table, function and sequence of the public schema."""
+    db_conn.rollback()
+    cursor = db_conn.cursor()
+    cursor.execute('DROP SCHEMA public CASCADE; CREATE SCHEMA public;')
+    db_conn.commit()
+    cursor.close()
+
+
+def create_schema(db_conn):
+    """Every table at the latest schema version, as connect_db leaves a
+    new database before populating it."""
+    cursor = db_conn.cursor()
+    create_base_tables(cursor, db_const.BASE_TABLES)
+    create_base_triggers(cursor)
+    create_game_tables(cursor)
+    db_conn.commit()
+    cursor.close()
+
+    migrate(db_conn, None)
+
+
+@pytest.fixture
+def db_conn():
+    """Connection to an empty PUCK_TEST_DSN database."""
+    if not TEST_DSN:
+        pytest.skip('PUCK_TEST_DSN is not set')
+
+    conn = pg.connect(TEST_DSN, cursor_factory=pgext.DictCursor)
+    reset_schema(conn)
+
+    yield conn
+
+    conn.close()
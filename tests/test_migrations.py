@@ -0,0 +1,155 @@
+import psycopg2 as pg
+
+import puck.database.db_constants as db_const
+from puck.database.db import (connect_db, migrate, schema_version,
+                              undefined_tables, update_stmt)
+
+from tests.conftest import TEST_DSN, create_schema
+
+GENERATED = ('pp_assists', 'sh_assists', 'ev_goals', 'ev_assists', 'ev_points')
+
+# a database set up before the schema was versioned, without the game
+# tables and with the splits as plain columns filled by a trigger
+VERSION_0 = """
+DROP TABLE schema_version;
+DROP TABLE game_player_stats, game_team_stats, game;
+DROP INDEX player_season_player_id_season;
+ALTER TABLE player ALTER COLUMN team_id SET NOT NULL;
+
+ALTER TABLE skater_season_stats
+    DROP COLUMN pp_assists, DROP COLUMN sh_assists, DROP COLUMN ev_goals,
+    DROP COLUMN ev_assists, DROP COLUMN ev_points;
+
+ALTER TABLE skater_season_stats
+    ADD COLUMN pp_assists SMALLINT, ADD COLUMN sh_assists SMALLINT,
+    ADD COLUMN ev_goals SMALLINT, ADD COLUMN ev_assists SMALLINT,
+    ADD COLUMN ev_points SMALLINT;
+
+CREATE FUNCTION compute_points() RETURNS trigger AS
+$BODY$
+    BEGIN
+        RETURN NEW;
+    END;
+$BODY$ LANGUAGE plpgsql;
+
+CREATE TRIGGER comp_points_ins
+    BEFORE INSERT ON skater_season_stats
+    FOR EACH ROW EXECUTE PROCEDURE compute_points();
+"""
+
+ROWS = """
+INSERT INTO league (league_id, league_name)
+    VALUES (133, 'National Hockey League');
+INSERT INTO team (team_id, full_name, league_id)
+    VALUES (3, 'New York Rangers', 133);
+INSERT INTO player (player_id, team_id, first_name, last_name, position,
+    handedness)
+    VALUES (8476459, 3, 'Mika', 'Zibanejad', 'C', 'L');
+INSERT INTO player_season (player_id, season, league_id, league_name,
+    team_id, team_name)
+    VALUES (8476459, 20192020, 133, 'National Hockey League', 3,
+            'New York Rangers');
+"""
+
+
+def create_version_0(db_conn):
+    create_schema(db_conn)
+
+    cursor = db_conn.cursor()
+    cursor.execute(VERSION_0)
+    cursor.execute(ROWS)
+    # the trigger never filled the splits in
+    cursor.execute(
+        """INSERT INTO skater_season_stats (unique_id, goals, assists,
+            points, pp_goals, pp_points, sh_goals, sh_points)
+            VALUES (1, 41, 34, 75, 15, 24, 2, 3);"""
+    )
+    db_conn.commit()
+    cursor.close()
+
+
+def splits(db_conn) -> dict:
+    cursor = db_conn.cursor()
+    cursor.execute(
+        f'SELECT {", ".join(GENERATED)} FROM skater_season_stats '
+        'WHERE unique_id = 1;'
+    )
+    row = dict(cursor.fetchone())
+    db_conn.rollback()
+
+    return row
+
+
+def test_migrate_generates_points(db_conn):
+    create_version_0(db_conn)
+    assert schema_version(db_conn) is None
+
+    migrate(db_conn, None)
+
+    assert schema_version(db_conn) == db_const.SCHEMA_VERSION
+    # existing rows are computed as the columns are added
+    assert splits(db_conn) == {
+        'pp_assists': 9, 'sh_assists': 1, 'ev_goals': 24,
+        'ev_assists': 24, 'ev_points': 48
+    }
+
+    cursor = db_conn.cursor()
+    cursor.execute(
+        "SELECT 1 FROM pg_proc WHERE proname = 'compute_points';"
+    )
+    assert cursor.fetchone() is None
+    db_conn.rollback()
+
+
+def test_update_sets_points_and_last_updated(db_conn):
+    create_schema(db_conn)
+
+    cursor = db_conn.cursor()
+    cursor.execute(ROWS)
+    cursor.execute(
+        """INSERT INTO skater_season_stats (unique_id, goals, assists,
+            points, pp_goals, pp_points, sh_goals, sh_points, last_updated)
+            VALUES (1, 41, 34, 75, 15, 24, 2, 3, '2000-01-01');"""
+    )
+    db_conn.commit()
+
+    update_stmt(
+        db_conn, 'skater_season_stats', {'goals': 42, 'points': 76},
+        where=('unique_id', 1)
+    )
+
+    assert splits(db_conn)['ev_goals'] == 25
+    assert splits(db_conn)['ev_points'] == 49
+
+    cursor.execute(
+        "SELECT last_updated > '2000-01-01' FROM skater_season_stats;"
+    )
+    assert cursor.fetchone()[0]
+    db_conn.rollback()
+    cursor.close()
+
+
+def test_connect_db_migrates_version_0(db_conn, monkeypatch):
+    create_version_0(db_conn)
+
+    connect = pg.connect
+    monkeypatch.setenv('dbName', 'puck_test')
+    monkeypatch.setenv('dbUser', 'puck')
+    monkeypatch.setattr(pg, 'connect', lambda **kwargs: connect(
+        TEST_DSN, cursor_factory=kwargs['cursor_factory']
+    ))
+
+    conn = connect_db()
+
+    try:
+        assert schema_version(conn) == db_const.SCHEMA_VERSION
+        assert splits(conn)['ev_points'] == 48
+
+        cursor = conn.cursor()
+        assert undefined_tables(cursor) == []
+        cursor.execute(db_const.GET_TABLES)
+        tables = {row[0] for row in cursor.fetchall()}
+        assert set(db_const.GAME_TABLES) <= tables
+        cursor.close()
+    finally:
+        conn.close()
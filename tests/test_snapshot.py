@@ -0,0 +1,114 @@
+import psycopg2.sql as pgsql
+import pytest
+
+import puck.database.db_constants as db_const
+from puck.database.db import schema_version
+from puck.database.snapshot import (SnapshotError, export_snapshot,
+                                    import_snapshot, read_meta)
+
+from tests.conftest import create_schema, reset_schema
+
+SEASON = 20192020
+
+ROWS = [
+    """INSERT INTO league (league_id, league_name)
+        VALUES (133, 'National Hockey League');""",
+    """INSERT INTO team (team_id, full_name, abbreviation, division,
+        conference, active, franchise_id, league_id)
+        VALUES (3, 'New York Rangers', 'NYR', 18, 6, true, 10, 133);""",
+    """INSERT INTO player (player_id, team_id, first_name, last_name, number,
+        position, handedness, rookie, age)
+        VALUES (8476459, 3, 'Mika', 'Zibanejad', '93', 'C', 'L', false, 27),
+               (8478048, 3, 'Igor', 'Shesterkin', '31', 'G', 'L', true,
+                24);""",
+    f"""INSERT INTO player_season (player_id, season, league_id, league_name,
+        team_id, team_name)
+        VALUES (8476459, {SEASON}, 133, 'National Hockey League', 3,
+                'New York Rangers'),
+               (8478048, {SEASON}, 133, 'National Hockey League', 3,
+                'New York Rangers');""",
+    """INSERT INTO skater_season_stats (unique_id, goals, assists, points,
+        pp_goals, pp_points, sh_goals, sh_points, games)
+        VALUES (1, 41, 34, 75, 15, 24, 2, 3, 57);""",
+    """INSERT INTO goalie_season_stats (unique_id, wins, losses, saves,
+        save_pct, games)
+        VALUES (2, 10, 2, 412, 0.932, 12);""",
+    f"""INSERT INTO team_season (team_id, season, franchise_id, division_id,
+        conference_id)
+        VALUES (3, {SEASON}, 10, 18, 6);""",
+    """INSERT INTO team_season_stats (unique_id, games_played, wins, losses,
+        points)
+        VALUES (1, 70, 37, 28, 79);""",
+]
+
+
+def fill(db_conn):
+    cursor = db_conn.cursor()
+    for row in ROWS:
+        cursor.execute(row)
+    db_conn.commit()
+    cursor.close()
+
+
+def table_rows(db_conn) -> dict:
+    cursor = db_conn.cursor()
+    rows = {}
+    for table in db_const.BASE_TABLES:
+        cursor.execute(pgsql.SQL('SELECT * FROM {} ORDER BY 1').format(
+            pgsql.Identifier(table)
+        ))
+        rows[table] = [tuple(row) for row in cursor.fetchall()]
+    cursor.close()
+
+    return rows
+
+
+def test_round_trip(db_conn, tmp_path):
+    create_schema(db_conn)
+    fill(db_conn)
+    before = table_rows(db_conn)
+
+    path = tmp_path / 'puck.snapshot'
+    meta = export_snapshot(db_conn, path)
+
+    assert read_meta(path) == meta
+    assert meta['schema_version'] == db_const.SCHEMA_VERSION
+    assert meta['tables'] == {
+        table: len(rows) for table, rows in before.items()
+    }
+    assert meta['seasons'] == {
+        'player_season': [SEASON], 'team_season': [SEASON]
+    }
+
+    # a new install, nothing but the snapshot
+    reset_schema(db_conn)
+    import_snapshot(db_conn, path)
+
+    assert schema_version(db_conn) == db_const.SCHEMA_VERSION
+    assert table_rows(db_conn) == before
+
+    # the serial columns continue after the loaded rows
+    cursor = db_conn.cursor()
+    cursor.execute(
+        """INSERT INTO player_season (player_id, season, league_id,
+            league_name, team_id, team_name)
+            VALUES (8476459, %s, 133, 'National Hockey League', 3,
+                    'New York Rangers') RETURNING unique_id;""",
+        (SEASON + 10001,)
+    )
+    assert cursor.fetchone()[0] == len(before['player_season']) + 1
+    db_conn.rollback()
+
+
+def test_import_refuses_filled_tables(db_conn, tmp_path):
+    create_schema(db_conn)
+    fill(db_conn)
+    before = table_rows(db_conn)
+
+    path = tmp_path / 'puck.snapshot'
+    export_snapshot(db_conn, path)
+
+    with pytest.raises(SnapshotError):
+        import_snapshot(db_conn, path)
+
+    assert table_rows(db_conn) == before